@@ -25,6 +25,7 @@ from blend.easing import EasingFunc
 from blend.parameter_setter import ParameterSetter
 from blend.stop import BlendStop
 from blend.types import BlendInputProtocol, EnrichedDiffMap
+from modalapi.websocket_bridge import PRIORITY_BACKGROUND
 
 
 class InputController:
@@ -86,7 +87,7 @@ class InputController:
             for symbol, value in params.items():
                 if instance_id in diff_map and symbol in diff_map[instance_id]:
                     continue
-                if self.parameter_setter.send_parameter(instance_id, symbol, value):
+                if self.parameter_setter.send_parameter(instance_id, symbol, value, PRIORITY_BACKGROUND):
                     const_sent += 1
                 else:
                     logging.debug(f"Skipped constant param {instance_id}/{symbol} = {value:.3f}")
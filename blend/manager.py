@@ -252,9 +252,7 @@ class BlendMode:
 
     def _get_parameter_type(self, instance_id: InstanceId, symbol: Symbol) -> ParameterType:
         assert self.handler.current is not None
-        for plugin in self.handler.current.pedalboard.plugins:
-            if plugin.instance_id == instance_id:
-                param = plugin.parameters.get(symbol)
-                if param:
-                    return param.type
+        param = self.handler.current.pedalboard.get_parameter(instance_id, symbol)
+        if param:
+            return param.type
         return ParameterType.DEFAULT
@@ -20,6 +20,7 @@
 import logging
 
 from blend.types import ParameterKey, WebSocketBridgeProtocol
+from modalapi.websocket_bridge import PRIORITY_CONTINUOUS
 
 
 class ParameterSetter:
@@ -36,7 +37,7 @@ class ParameterSetter:
         self.bridge = bridge
         self.last_sent_midi_values: dict[ParameterKey, float] = {}
 
-    def send_parameter(self, instance_id: str, symbol: str, value: float) -> bool:
+    def send_parameter(self, instance_id: str, symbol: str, value: float, priority: int = PRIORITY_CONTINUOUS) -> bool:
         """
         Send single parameter via WebSocket with de-duplication (non-blocking).
 
@@ -44,6 +45,9 @@ class ParameterSetter:
         This prevents flooding the WebSocket with redundant messages during smooth
         pedal movements.
 
+        Interpolated values from pedal movement go in the continuous lane (the default);
+        sync_current_position sends its constants in the background lane.
+
         Returns True if message was sent, False if skipped due de-duplication or backpressure.
         """
         key = ParameterKey(instance_id, symbol)
@@ -52,7 +56,7 @@ class ParameterSetter:
         if last_value is not None and abs(last_value - value) < self.TOLERANCE:
             return False
 
-        if self.bridge.send_parameter(instance_id, symbol, value):
+        if self.bridge.send_parameter(instance_id, symbol, value, priority):
             self.last_sent_midi_values[key] = value
             return True
 
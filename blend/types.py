@@ -78,7 +78,7 @@ class BlendInputProtocol(Protocol):
 
 
 class WebSocketBridgeProtocol(Protocol):
-    def send_parameter(self, instance_id: InstanceId, symbol: Symbol, value: float) -> bool: ...
+    def send_parameter(self, instance_id: InstanceId, symbol: Symbol, value: float, priority: int = ...) -> bool: ...
     def clear_queue(self) -> int: ...
 
 
@@ -76,6 +76,11 @@ class Parameter:
             ret.append((util.DICT_GET(v,'label'), util.DICT_GET(v,'value')))
         return ret
 
+    @property
+    def is_discrete(self):
+        # Switched, not swept: a change is a single user action rather than part of a stream
+        return self.type in (Type.TOGGLED, Type.ENUMERATION) or self.symbol == ":bypass"
+
     def get_taper(self):
         return 2 if self.type == Type.LOGARITHMIC else 1
 
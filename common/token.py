@@ -27,15 +27,20 @@ CHANNEL = 'channel'
 COLON_BYPASS = ':bypass'
 COLOR = 'color'
 CONTROL = 'control'
+CURVE = 'curve'
 DEBOUNCE_INPUT = 'debounce_input'
 DISABLE = 'disable'
 DOWN = 'DOWN'
+EMA = 'ema'
+ENCODER_ACCELERATION = 'encoder_acceleration'
 ENCODERS = 'encoders'
 EXPRESSION = 'EXPRESSION'
+FILTER = 'filter'
 FOOTSWITCHES = 'footswitches'
 GPIO_INPUT = 'gpio_input'
 GPIO_OUTPUT = 'gpio_output'
 HARDWARE = 'hardware'
+HYSTERESIS = 'hysteresis'
 ID = 'id'
 INPUT = 'input'
 KNOB = 'KNOB'
@@ -43,9 +48,13 @@ LEDSTRIP_POSITION = 'ledstrip_position'
 LEFT = 'LEFT'
 LEFT_RIGHT = 'LEFT_RIGHT'
 LONGPRESS = 'longpress'
+MAX_MULTIPLIER = 'max_multiplier'
+MAX_SPEED = 'max_speed'
 MAXIMUM = 'maximum'
+MEDIAN = 'median'
 MIDI = 'midi'
 MIDI_CC = 'midi_CC'
+MIN_SPEED = 'min_speed'
 MINIMUM = 'minimum'
 NAME = 'name'
 NONE = 'None'
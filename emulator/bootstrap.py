@@ -23,7 +23,7 @@ from rtmidi.midiutil import open_midioutput
 
 import pistomp.config as config
 import pistomp.settings as Settings_module
-from pistomp.tuner.source import ToneSweepSource
+from pistomp.startup_trace import StartupTracer
 
 EmulatorVersion = Literal["emulator_v1", "emulator_v2", "emulator_v3"]
 
@@ -35,61 +35,82 @@ _CONFIG_TEMPLATES = {
 }
 
 
-def bootstrap_emulator(version: EmulatorVersion, cwd: str):
-    """Initialize pygame, build the emulator handler/hardware, and return (handler, midiout)."""
-    import pygame
-    import pygame._freetype as _freetype
-    from emulator.window import EmulatorWindow
-
-    match version:
-        case "emulator_v1":
-            from emulator.hardware_v1 import EmulatorHardwareV1 as EmuHW
-            from emulator.mod import EmulatorMod as EmuHandler
-        case "emulator_v2":
-            from emulator.hardware_v2 import EmulatorHardwareV2 as EmuHW
-            from emulator.modhandler import EmulatorModhandler as EmuHandler
-        case "emulator_v3":
-            from emulator.hardware_v3 import EmulatorHardwareV3 as EmuHW
-            from emulator.modhandler import EmulatorModhandler as EmuHandler
-
-    pygame.init()
-    _freetype.init()
-
-    try:
-        midiout, _port_name = open_midioutput(0)
-    except Exception:
-        logging.warning("Disabled: MIDI output unavailable in emulator mode")
-        midiout = None
-
-    cfg = config.load_cfg_from_file(_CONFIG_TEMPLATES[version])
-
-    if version != "emulator_v1":
-        emu_cfg_dir = os.path.join(os.path.expanduser("~"), ".pistomp_emulator", "config")
-        os.makedirs(emu_cfg_dir, exist_ok=True)
-        Settings_module.DATA_DIR = emu_cfg_dir
-
-    handler = EmuHandler(cwd)
-    hw = EmuHW(cfg, handler, midiout, refresh_callback=handler.update_lcd_fs)
-    handler.add_hardware(hw)
-
-    window = EmulatorWindow(hw)
-    handler.set_window(window)
-
-    handler.load_banks()
-    handler.load_pedalboards()
-
-    current_bundle = handler.get_current_pedalboard_bundle_path()
-    if current_bundle and current_bundle in handler.pedalboards:
-        handler.set_current_pedalboard(handler.pedalboards[current_bundle])
-    elif handler.pedalboard_list:
-        from modalapi.pedalboard_monitor import write_last_json
-        pb = handler.pedalboard_list[0]
-        write_last_json(handler.last_json_monitor.path, pb.bundle)
-        handler.pedalboard_change(pb)
-        handler.set_current_pedalboard(pb)
-
-    handler.system_info_load()
-
-    handler.set_tuner_source_factory(lambda port, *, name: ToneSweepSource())
+def bootstrap_emulator(version: EmulatorVersion, cwd: str, trace: StartupTracer | None = None):
+    """Initialize pygame, build the emulator handler/hardware, and return (handler, midiout).
+
+    Startup phases are recorded on trace, if given (see pistomp.startup_trace).
+    """
+    if trace is None:
+        trace = StartupTracer()
+
+    with trace.phase("pygame init"):
+        import pygame
+        import pygame._freetype as _freetype
+        from emulator.window import EmulatorWindow
+
+        match version:
+            case "emulator_v1":
+                from emulator.hardware_v1 import EmulatorHardwareV1 as EmuHW
+                from emulator.mod import EmulatorMod as EmuHandler
+            case "emulator_v2":
+                from emulator.hardware_v2 import EmulatorHardwareV2 as EmuHW
+                from emulator.modhandler import EmulatorModhandler as EmuHandler
+            case "emulator_v3":
+                from emulator.hardware_v3 import EmulatorHardwareV3 as EmuHW
+                from emulator.modhandler import EmulatorModhandler as EmuHandler
+
+        pygame.init()
+        _freetype.init()
+
+    with trace.phase("midi open"):
+        try:
+            midiout, _port_name = open_midioutput(0)
+        except Exception:
+            logging.warning("Disabled: MIDI output unavailable in emulator mode")
+            midiout = None
+
+    with trace.phase("config load"):
+        cfg = config.load_cfg_from_file(_CONFIG_TEMPLATES[version])
+
+        if version != "emulator_v1":
+            emu_cfg_dir = os.path.join(os.path.expanduser("~"), ".pistomp_emulator", "config")
+            os.makedirs(emu_cfg_dir, exist_ok=True)
+            Settings_module.DATA_DIR = emu_cfg_dir
+
+    with trace.phase("handler create"):
+        handler = EmuHandler(cwd)
+
+    with trace.phase("hardware init"):
+        hw = EmuHW(cfg, handler, midiout, refresh_callback=handler.update_lcd_fs)
+        handler.add_hardware(hw)
+
+        window = EmulatorWindow(hw)
+        handler.set_window(window)
+
+    with trace.phase("load_banks"):
+        handler.load_banks()
+    with trace.phase("load_pedalboards"):
+        handler.load_pedalboards()
+
+    with trace.phase("set current pedalboard"):
+        current_bundle = handler.get_current_pedalboard_bundle_path()
+        if current_bundle and current_bundle in handler.pedalboards:
+            handler.set_current_pedalboard(handler.pedalboards[current_bundle])
+        elif handler.pedalboard_list:
+            from modalapi.pedalboard_monitor import write_last_json
+            pb = handler.pedalboard_list[0]
+            write_last_json(handler.last_json_monitor.path, pb.bundle)
+            handler.pedalboard_change(pb)
+            handler.set_current_pedalboard(pb)
+
+    with trace.phase("system_info_load"):
+        handler.system_info_load()
+
+    def tone_sweep(port, *, name):
+        from pistomp.tuner.source import ToneSweepSource
+
+        return ToneSweepSource()
+
+    handler.set_tuner_source_factory(tone_sweep)
 
     return handler, midiout
@@ -25,6 +25,7 @@ import pistomp.analogcontrol as analogcontrol
 import pistomp.encoder as encoder
 import pistomp.encodermidicontrol as encodermidicontrol
 import pistomp.footswitch as footswitch
+import pistomp.gpioswitch as gpioswitch
 
 try:
     from rtmidi.midiconstants import CONTROL_CHANGE
@@ -118,6 +119,32 @@ class MockFootswitch(footswitch.Footswitch):
         self.refresh_callback(footswitch=self)
 
 
+class MockButton:
+    """Stands in for gpiozero.Button: press() fires when_pressed like the GPIO edge thread does."""
+
+    def __init__(self):
+        self.is_pressed = False
+        self.when_pressed = None
+
+    def press(self):
+        self.is_pressed = True
+        if self.when_pressed:
+            self.when_pressed(self)
+
+    def release(self):
+        self.is_pressed = False
+
+    def close(self):
+        pass
+
+
+class MockGpioSwitch(gpioswitch.GpioSwitch):
+    """GpioSwitch on a MockButton: the real edge timestamping and press/longpress polling, no GPIO."""
+
+    def __init__(self, callback, longpress_callback=None, gpio_input=0):
+        super().__init__(gpio_input, None, None, callback, longpress_callback, button=MockButton())
+
+
 class MockAnalogControl(analogcontrol.AnalogControl):
     """Expression pedal / knob with no SPI/ADC.  Value set externally."""
 
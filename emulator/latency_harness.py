@@ -0,0 +1,78 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Footswitch latency harness for the emulator.
+
+Puts a MockGpioSwitch in front of each MIDI footswitch and presses them from a
+separate thread, as gpiozero's edge callbacks would. Meanwhile the main-loop
+scheduler polls controls and the LCD. Each press goes through the real path
+(GpioSwitch edge and poll -> Footswitch.pressed -> MIDI send -> LCD redraw),
+and pistomp.latency records every hop.
+"""
+
+import random
+import threading
+import time
+
+import pistomp.latency as latency
+from emulator.controls import MockGpioSwitch
+from pistomp.scheduler import PRIORITY_CONTROLS, PRIORITY_NORMAL, Scheduler
+
+# p99 from switch edge, ms. The edge waits up to one 10 ms controls poll; the rest is handling
+BUDGET_MS = {"pressed": 25.0, "midi": 30.0, "lcd": 80.0}
+
+
+def drive_presses(handler, presses=40, hold=0.005, gap=(0.01, 0.03), seed=0):
+    """Press the handler's MIDI footswitches `presses` times; return latency.stats()."""
+    footswitches = [fs for fs in handler.hardware.footswitches
+                    if fs.midi_CC is not None and fs.preset_callback is None]
+    if not footswitches:
+        raise ValueError("No MIDI footswitches to press")
+    switches = [MockGpioSwitch(fs.pressed) for fs in footswitches]
+    rng = random.Random(seed)
+
+    scheduler = Scheduler()
+    scheduler.add("controls", lambda: [sw.poll() for sw in switches], handler.CONTROLS_POLL_PERIOD,
+                  PRIORITY_CONTROLS)
+    scheduler.add("lcd", handler.poll_lcd_updates, handler.lcd_poll_period, PRIORITY_NORMAL)
+    done = threading.Event()
+    scheduler.add("done", lambda: scheduler.stop() if done.is_set() else None, 0.05)
+
+    def press_thread():
+        try:
+            for i in range(presses):
+                time.sleep(rng.uniform(*gap))
+                button = switches[i % len(switches)].button
+                button.press()
+                time.sleep(hold)
+                button.release()
+            time.sleep(0.05)  # let the last release be polled
+        finally:
+            done.set()
+
+    latency.reset()
+    thread = threading.Thread(target=press_thread, daemon=True, name="LatencyHarnessPresses")
+    thread.start()
+    scheduler.run_forever()
+    thread.join()
+    return latency.stats()
+
+
+def over_budget(stats, budget_ms=BUDGET_MS, percentile="p99_ms"):
+    """Hops whose percentile exceeds their budget, as {hop: (measured, budget)}."""
+    return {hop: (stats[hop][percentile], limit) for hop, limit in budget_ms.items()
+            if stats[hop]["count"] and stats[hop][percentile] > limit}
@@ -28,7 +28,10 @@ import logging
 import os
 
 from modalapi.mod import Mod
+from modalapi.pedalboard_cache import CACHE_FILE, PedalboardCache
+import modalapi.plugin_cache as PluginCache
 from modalapi.websocket_bridge import AsyncWebSocketBridge
+import pistomp.settings as Settings
 from emulator.stubs import VirtualAudiocard, StubWifiManager
 
 
@@ -44,8 +47,17 @@ class EmulatorMod(Mod):
             _wifi_module.WifiManager = _orig_wm
 
         emu_data_dir = os.path.join(os.path.expanduser("~"), ".pistomp_emulator")
+        self.data_dir = emu_data_dir
         self.pedalboard_modification_file = os.path.join(emu_data_dir, "last.json")
         self.pedalboard_change_timestamp = 0
+        os.makedirs(emu_data_dir, exist_ok=True)
+        self.pedalboard_cache = PedalboardCache(os.path.join(emu_data_dir, CACHE_FILE))
+        self.plugin_cache = PluginCache.PluginCache(os.path.join(emu_data_dir, PluginCache.CACHE_FILE))
+
+        # Repoint Settings at the emulator's config dir so changes persist across restarts.
+        emu_cfg_dir = os.path.join(emu_data_dir, "config")
+        os.makedirs(emu_cfg_dir, exist_ok=True)
+        self.settings = Settings.Settings(data_dir=emu_cfg_dir)
 
         self.root_uri = "http://127.0.0.1:18181/"
         assert self.wifi_manager is not None
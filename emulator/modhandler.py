@@ -28,6 +28,8 @@ import logging
 import os
 
 from modalapi.modhandler import Modhandler
+from modalapi.pedalboard_cache import CACHE_FILE, PedalboardCache
+import modalapi.plugin_cache as PluginCache
 from modalapi.websocket_bridge import AsyncWebSocketBridge
 import pistomp.settings as Settings
 from emulator.stubs import VirtualAudiocard, StubWifiManager
@@ -45,6 +47,8 @@ class EmulatorModhandler(Modhandler):
         self.pedalboard_modification_file = os.path.join(emu_data_dir, "last.json")
         self.pedalboard_change_timestamp = 0
         self.banks_file_timestamp = 0
+        self.pedalboard_cache = PedalboardCache(os.path.join(emu_data_dir, CACHE_FILE))
+        self.plugin_cache = PluginCache.PluginCache(os.path.join(emu_data_dir, PluginCache.CACHE_FILE))
 
         # Repoint Settings at the emulator's config dir so changes persist across restarts.
         emu_cfg_dir = os.path.join(emu_data_dir, "config")
@@ -26,18 +26,23 @@ from typing import Any
 
 import common.token as Token
 import common.util as util
+import pistomp.settings as Settings
 import pistomp.switchstate as switchstate
 import modalapi.pedalboard as Pedalboard
+from modalapi.pedalboard_cache import CACHE_FILE, PedalboardCache
+import modalapi.plugin_cache as PluginCache
+from modalapi.pedalboard_loader import PedalboardLoader
 import common.parameter as Parameter
 import modalapi.wifi as Wifi
 
 from blend.snapshot import SnapshotManager
-from modalapi.websocket_bridge import AsyncWebSocketBridge
-from modalapi.ws_protocol import parse_message, LoadingEndMessage, LoadingStartMessage, PedalSnapshotMessage, PluginBypassMessage, TransportMessage, AddPluginMessage, ParamSetMessage, MidiMapMessage, WebSocketMessage
+from modalapi.rest_worker import RestWorker
+from modalapi.websocket_bridge import PRIORITY_CONTINUOUS, PRIORITY_DISCRETE, AsyncWebSocketBridge
+from modalapi.ws_protocol import LoadingEndMessage, LoadingStartMessage, PedalSnapshotMessage, PluginBypassMessage, TransportMessage, AddPluginMessage, ParamSetMessage, MidiMapMessage, WebSocketMessage
 from modalapi.pedalboard_monitor import FileChangeMonitor, read_pedalboard_bundle
 
 from pistomp.footswitch import Footswitch
-from pistomp.handler import Handler
+from pistomp.handler import Handler, WsRedraws
 from enum import Enum
 from pathlib import Path
 
@@ -111,6 +116,7 @@ class Mod(Handler):
         self.lcd = None
         self.homedir = homedir
         self.root_uri = "http://localhost:80/"
+        self.settings = Settings.Settings()
 
         self.pedalboards = {}
         self.pedalboard_list = []  # TODO LAME to have two lists
@@ -147,6 +153,11 @@ class Mod(Handler):
 
         self.data_dir = "/home/pistomp/data"
         self.last_json_monitor = FileChangeMonitor(os.path.join(self.data_dir, "last.json"))
+
+        # Parsed bundle data persisted across boots, so unchanged pedalboards skip lilv
+        self.pedalboard_cache = PedalboardCache(os.path.join(self.data_dir, CACHE_FILE))
+        self.plugin_cache = PluginCache.PluginCache(os.path.join(self.data_dir, PluginCache.CACHE_FILE))
+        self.pedalboard_loader = None
         self.wifi_manager = Wifi.WifiManager(on_status_change=self._on_wifi_status_change)
 
         # WebSocket bridge for MOD-UI communication
@@ -160,6 +171,9 @@ class Mod(Handler):
         # Suppress outbound WebSocket messages while a pedalboard change is in flight.
         self._is_pedalboard_loading: bool = False
 
+        # Pedalboard and snapshot loads run here so the main loop keeps polling while mod-host loads
+        self.rest_worker = RestWorker()
+
         # Callback function map.  Key is the user specified name, value is function from this handler
         # Used for calling handler callbacks pointed to by names which may be user set in the config file
         self.callbacks = {"set_mod_tap_tempo": self.set_mod_tap_tempo,
@@ -177,10 +191,15 @@ class Mod(Handler):
             del self.wifi_manager
 
     def cleanup(self):
+        if self.pedalboard_loader is not None:
+            self.pedalboard_loader.stop()
+        if self.hardware is not None:
+            self.hardware.stop_adc_sampler()
         if self.lcd is not None:
             self.lcd.cleanup()
         self.ws_bridge.stop()
         logging.info("WebSocket bridge stopped")
+        self.rest_worker.shutdown()
 
     # Container for dynamic data which is unique to the "current" pedalboard
     # The self.current pointed above will point to this object which gets
@@ -480,7 +499,7 @@ class Mod(Handler):
     def poll_system_info(self):
         pass
 
-    def _handle_ws_message(self, msg: WebSocketMessage):
+    def _apply_ws_message(self, msg: WebSocketMessage, redraws: WsRedraws):
         """Handle incoming WebSocket message from MOD-UI"""
         if isinstance(msg, LoadingStartMessage):
             self._is_pedalboard_loading = True
@@ -504,47 +523,47 @@ class Mod(Handler):
                     self.current.presets[msg.snapshot_id] = msg.snapshot_name
 
                 self.current.preset_index = msg.snapshot_id
-                self.update_lcd_title()
+                redraws.title = True
 
         elif isinstance(msg, (PluginBypassMessage, AddPluginMessage)):
             # PluginBypassMessage: live delta. AddPluginMessage: (re)connect dump
-            if self.current is not None:
-                for plugin in self.current.pedalboard.plugins:
-                    if plugin.instance_id == msg.instance:
-                        logging.debug(f"WebSocket: Plugin {msg.instance} bypass -> {msg.bypassed}")
-                        plugin.set_bypass(msg.bypassed)
-                        self.lcd.refresh_plugins()
-                        break
+            plugin = self.current.pedalboard.get_plugin(msg.instance) if self.current is not None else None
+            if plugin is not None:
+                logging.debug(f"WebSocket: Plugin {msg.instance} bypass -> {msg.bypassed}")
+                plugin.set_bypass(msg.bypassed)
+                redraws.plugins[plugin.instance_id] = plugin
 
         elif isinstance(msg, TransportMessage):
             if self.hardware and self.hardware.taptempo:
                 self.hardware.taptempo.set_bpm(msg.bpm)
                 if self.hardware.taptempo.is_enabled():
-                    fs = next((f for f in self.hardware.footswitches if f.taptempo is self.hardware.taptempo), None)
-                    self.update_lcd_fs(footswitch=fs)
+                    redraws.tempo = True
 
         elif isinstance(msg, ParamSetMessage):
             # Mirror mod-ui's live value: refresh the cache (so a later edit opens
             # at the current value) and sync any bound control. The connect-dump
             # delivers the real mod-ui state here — :bypass aside, nothing else
             # repaints a non-bypass footswitch.
-            if self.current is not None:
-                for plugin in self.current.pedalboard.plugins:
-                    if plugin.instance_id == msg.instance:
-                        plugin.set_param_value(msg.symbol, msg.value)
-                        break
+            plugin = self.current.pedalboard.get_plugin(msg.instance) if self.current is not None else None
+            if plugin is not None:
+                plugin.set_param_value(msg.symbol, msg.value)
 
         elif isinstance(msg, MidiMapMessage):
             # MIDI learn in mod-ui assigned a hardware control to a parameter.
             self._apply_midi_binding(msg.instance, msg.symbol, msg.binding)
 
+    def _draw_ws_redraws(self, redraws: WsRedraws):
+        if redraws.title:
+            self.update_lcd_title()
+        if redraws.plugins:
+            self.lcd.refresh_plugins()
+        if redraws.tempo:
+            fs = next((f for f in self.hardware.footswitches if f.taptempo is self.hardware.taptempo), None)
+            self.update_lcd_fs(footswitch=fs)
+
     def poll_ws_messages(self):
         """Drain and dispatch inbound WebSocket messages (fast ~10ms cadence)."""
-        for msg in self.ws_bridge.get_received_messages():
-            try:
-                self._handle_ws_message(parse_message(msg))
-            except Exception as e:
-                logging.error(f"Error handling WebSocket message '{msg}': {e}")
+        self._drain_ws_messages()
 
     def poll_modui_changes(self):
         """Poll for changes from MOD-UI: websockets and file watching"""
@@ -594,15 +613,26 @@ class Mod(Handler):
             sys.exit()
 
         pbs = json.loads(resp.text)
-        for pb in pbs:
-            logging.info("Loading pedalboard info: %s" % pb[Token.TITLE])
-            bundle = pb[Token.BUNDLE]
-            title = pb[Token.TITLE]
-            pedalboard = Pedalboard.Pedalboard(title, bundle, root_uri=self.root_uri)
-            pedalboard.load_bundle(bundle, self.plugin_dict)
-            self.pedalboards[bundle] = pedalboard
-            self.pedalboard_list.append(pedalboard)
-            #logging.debug("dump: %s" % pedalboard.to_json())
+
+        # Sync stubs (title + bundle) with the list: known pedalboards are kept, only added or
+        # modified ones need loading.  The current one is loaded now, the rest by a background
+        # thread.  See pedalboard_loader.
+        if self.pedalboard_loader is None:
+            self.plugin_cache.seed(self.plugin_dict)
+            parse_workers = Pedalboard.parse_workers_setting(self.settings.get_setting('pedalboards.parse_workers'))
+            self.pedalboard_loader = PedalboardLoader(
+                self.plugin_dict, self.pedalboard_cache, self.plugin_cache, parse_workers=parse_workers
+            )
+        self.pedalboard_loader.stop()
+        added, modified, removed = self.pedalboard_loader.sync(self.pedalboards, self.pedalboard_list, pbs, self.root_uri)
+        logging.info("Pedalboards: %d listed, %d added, %d modified, %d removed" %
+                     (len(self.pedalboard_list), added, modified, removed))
+
+        current = self.pedalboards.get(self.get_current_pedalboard_bundle_path())
+        if current is not None:
+            logging.info("Loading current pedalboard: %s" % current.title)
+            self.pedalboard_loader.load(current)
+        self.pedalboard_loader.start(self.pedalboard_list, self.root_uri)
 
         # TODO - example of querying host
         #bund = self.get_current_pedalboard()
@@ -748,17 +778,26 @@ class Mod(Handler):
     def pedalboard_change(self, pedalboard: Pedalboard.Pedalboard) -> None:
         logging.info("Pedalboard change")
         self.lcd.draw_info_message("Loading...")
-
-        resp1 = req.get(self.root_uri + "reset")
-        if resp1.status_code != 200:
+        # A snapshot still waiting to load belongs to the board being replaced
+        self.rest_worker.cancel("snapshot")
+        self.rest_worker.submit("pedalboard", lambda rest: self._load_bundle(rest, pedalboard.bundle),
+                                lambda ok: self._pedalboard_loaded(pedalboard))
+
+    def _load_bundle(self, rest: RestWorker, bundle: str) -> bool:
+        # Runs on the REST worker thread
+        resp1 = rest.get(self.root_uri + "reset")
+        if resp1 is None or resp1.status_code != 200:
             logging.error("Bad Reset request")
 
         uri = self.root_uri + "pedalboard/load_bundle/"
-        data = {"bundlepath": pedalboard.bundle}
-        resp2 = req.post(uri, data)
-        if resp2.status_code != 200:
-            logging.error("Bad Rest request: %s %s  status: %d" % (uri, data, resp2.status_code))
-
+        data = {"bundlepath": bundle}
+        resp2 = rest.post(uri, data=data)
+        if resp2 is None or resp2.status_code != 200:
+            logging.error("Bad Rest request: %s %s" % (uri, data))
+            return False
+        return True
+
+    def _pedalboard_loaded(self, pedalboard: Pedalboard.Pedalboard) -> None:
         self.set_current_pedalboard(pedalboard)
         self.bot_encoder_mode = BotEncoderMode.DEFAULT
 
@@ -842,16 +881,22 @@ class Mod(Handler):
                     self.active_blend_mode = None
 
         self.lcd.draw_info_message("Loading...")
-        url = (self.root_uri + "snapshot/load?id=%d" % index)
-        # req.get(self.root_uri + "reset")
-        resp = req.get(url)
-        if resp.status_code != 200:
-            logging.error("Bad Rest request: %s status: %d" % (url, resp.status_code))
+        # Set now so a quick next/previous tap steps from here; a queued load is replaced by the newer one
         self.current.preset_index = index
+        self.rest_worker.submit("snapshot", lambda rest: self._load_snapshot(rest, index))
 
         # Bypass/param changes from the snapshot arrive via the WS drain (source of truth).
         self.bot_encoder_mode = BotEncoderMode.DEFAULT
 
+    def _load_snapshot(self, rest: RestWorker, index: int) -> bool:
+        # Runs on the REST worker thread
+        url = (self.root_uri + "snapshot/load?id=%d" % index)
+        resp = rest.get(url)
+        if resp is None or resp.status_code != 200:
+            logging.error("Bad Rest request: %s" % url)
+            return False
+        return True
+
     def preset_incr_and_change(self):
         if self.universal_encoder_mode == UniversalEncoderMode.LOADING:
             return
@@ -911,7 +956,8 @@ class Mod(Handler):
             # Non-footswitch plugin: emit only; the inbound echo updates state and LCD.
             target_bypass = not inst.is_bypassed()
             if not self._is_pedalboard_loading:
-                self.ws_bridge.send_parameter(inst.instance_id, ":bypass", 1.0 if target_bypass else 0.0)
+                self.ws_bridge.send_parameter(inst.instance_id, ":bypass", 1.0 if target_bypass else 0.0,
+                                              PRIORITY_DISCRETE)
             self.lcd.draw_plugin_select(inst)  # selection highlight (navigation, not bypass)
 
     #
@@ -1372,7 +1418,8 @@ class Mod(Handler):
     def parameter_value_commit(self):
         param = self.deep.selected_parameter
         if not self._is_pedalboard_loading:
-            self.ws_bridge.send_parameter(param.instance_id, param.symbol, param.value)
+            priority = PRIORITY_DISCRETE if param.is_discrete else PRIORITY_CONTINUOUS
+            self.ws_bridge.send_parameter(param.instance_id, param.symbol, param.value, priority)
 
     #
     # LCD Stuff
@@ -1417,6 +1464,9 @@ class Mod(Handler):
     def load_banks(self):
         pass
 
+    def poll_rest_results(self):
+        self.rest_worker.poll()
+
     def poll_indicators(self):
         pass
 
@@ -15,7 +15,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
 
-from pistomp.handler import Handler
+from pistomp.handler import Handler, WsRedraws
 from pistomp.audiocard import Audiocard
 
 import json
@@ -28,25 +28,32 @@ import sys
 import yaml
 from typing import Any
 
-from typing import cast, Any
+from typing import TYPE_CHECKING, cast, Any
 
 import common.token as Token
 import common.util as util
 import modalapi.pedalboard as Pedalboard
+from modalapi.pedalboard_cache import CACHE_FILE, PedalboardCache
+import modalapi.plugin_cache as PluginCache
+from modalapi.pedalboard_loader import PedalboardLoader
 import modalapi.wifi as Wifi
 from pistomp.lcd320x240 import Lcd
 from pistomp.hardware import Controller, Hardware
 import pistomp.settings as Settings
 from blend.snapshot import SnapshotManager
-from modalapi.websocket_bridge import AsyncWebSocketBridge
-from modalapi.ws_protocol import parse_message, LoadingEndMessage, LoadingStartMessage, PedalSnapshotMessage, PluginBypassMessage, TransportMessage, AddPluginMessage, ParamSetMessage, MidiMapMessage, WebSocketMessage
+from modalapi.rest_worker import RestWorker
+from modalapi.websocket_bridge import PRIORITY_CONTINUOUS, PRIORITY_DISCRETE, AsyncWebSocketBridge
+from modalapi.ws_protocol import LoadingEndMessage, LoadingStartMessage, PedalSnapshotMessage, PluginBypassMessage, TransportMessage, AddPluginMessage, ParamSetMessage, MidiMapMessage, WebSocketMessage
 from modalapi.pedalboard_monitor import FileChangeMonitor, read_pedalboard_bundle
 
 from pistomp.footswitch import Footswitch
-from pistomp.tuner import TunerEngine, TunerPanel, TunerSourceFactory
-from pistomp.tuner.source import AudioSource, build_source
 from pathlib import Path
 
+if TYPE_CHECKING:
+    # The tuner stack pulls in numpy; it's imported when the tuner is first opened
+    from pistomp.tuner import TunerEngine, TunerPanel, TunerSourceFactory
+    from pistomp.tuner.source import AudioSource
+
 
 class Modhandler(Handler):
     __single = None
@@ -99,6 +106,11 @@ class Modhandler(Handler):
         self.last_json_monitor = FileChangeMonitor(os.path.join(self.data_dir, "last.json"))
         self.banks_monitor = FileChangeMonitor(self.banks_file)
 
+        # Parsed bundle data persisted across boots, so unchanged pedalboards skip lilv
+        self.pedalboard_cache = PedalboardCache(os.path.join(self.data_dir, CACHE_FILE))
+        self.plugin_cache = PluginCache.PluginCache(os.path.join(self.data_dir, PluginCache.CACHE_FILE))
+        self.pedalboard_loader = None
+
         self.wifi_manager = Wifi.WifiManager(on_status_change=self._on_wifi_status_change)
 
         # WebSocket bridge for MOD-UI communication
@@ -112,10 +124,13 @@ class Modhandler(Handler):
         # Suppress outbound WebSocket messages while a pedalboard change is in flight.
         self._is_pedalboard_loading = False
 
+        # Pedalboard and snapshot loads run here so the main loop keeps polling while mod-host loads
+        self.rest_worker = RestWorker()
+
         # Tuner state
-        self._tuner_engine: TunerEngine | None = None
-        self._tuner_panel: TunerPanel | None = None
-        self._tuner_source_factory: TunerSourceFactory | None = None
+        self._tuner_engine: 'TunerEngine | None' = None
+        self._tuner_panel: 'TunerPanel | None' = None
+        self._tuner_source_factory: 'TunerSourceFactory | None' = None
         self._tuner_muted: bool = False
 
         # Callback function map.  Key is the user specified name, value is function from this handler
@@ -138,6 +153,8 @@ class Modhandler(Handler):
             del self.wifi_manager
 
     def cleanup(self):
+        if self.pedalboard_loader is not None:
+            self.pedalboard_loader.stop()
         if self._tuner_engine is not None:
             if self._tuner_muted:
                 self.audiocard.set_output_muted(False)
@@ -147,9 +164,11 @@ class Modhandler(Handler):
         if self._lcd is not None:
             self._lcd.cleanup()
         if self._hardware is not None:
+            self._hardware.stop_adc_sampler()
             self._hardware.cleanup()
         self.ws_bridge.stop()
         logging.info("WebSocket bridge stopped")
+        self.rest_worker.shutdown()
 
     # Container for dynamic data which is unique to the "current" pedalboard
     # The self.current pointed above will point to this object which gets
@@ -200,6 +219,9 @@ class Modhandler(Handler):
         if self.hardware:
             self.hardware.poll_indicators()
 
+    def poll_rest_results(self):
+        self.rest_worker.poll()
+
     def poll_wifi(self):
         self.wifi_manager.poll()
         if self._lcd is not None and self.lcd.wifi_menu is not None:
@@ -278,12 +300,12 @@ class Modhandler(Handler):
             self._lcd.poll_updates()
 
     @property
-    def lcd_poll_divisor(self) -> int:
-        # 50 fps (every other 10 ms tick) while the tuner is active — fast enough
+    def lcd_poll_period(self) -> float:
+        # 50 fps (every 20 ms) while the tuner is active — fast enough
         # for smooth strobe animation and leaves headroom for SPI transfers.
         if self._tuner_panel is not None:
-            return 2
-        return self._lcd.poll_divisor if self._lcd is not None else 8
+            return 0.02
+        return self._lcd.poll_period if self._lcd is not None else 0.08
 
     def universal_encoder_select(self, direction):
         if self._lcd is not None:
@@ -334,7 +356,7 @@ class Modhandler(Handler):
         else:
             logging.debug(f"Snapshot '{new_snapshot_name}' is not a blend snapshot")
 
-    def _handle_ws_message(self, msg: WebSocketMessage):
+    def _apply_ws_message(self, msg: WebSocketMessage, redraws: WsRedraws):
         """Handle incoming WebSocket message from MOD-UI."""
         if isinstance(msg, LoadingStartMessage):
             self._is_pedalboard_loading = True
@@ -361,7 +383,7 @@ class Modhandler(Handler):
 
                     self.current.preset_index = msg.snapshot_id
                     self._handle_blend_mode_snapshot_change(msg.snapshot_id)
-                    self.lcd.draw_title()
+                    redraws.title = True
                 else:
                     # Different pedalboard pending - this is a legitimate pre-switch update
                     logging.debug(f"WebSocket: Pre-switch snapshot changed to {msg.snapshot_id}")
@@ -375,48 +397,53 @@ class Modhandler(Handler):
 
                 self.current.preset_index = msg.snapshot_id
                 self._handle_blend_mode_snapshot_change(msg.snapshot_id)
-                self.lcd.draw_title()
+                redraws.title = True
 
         elif isinstance(msg, (PluginBypassMessage, AddPluginMessage)):
             # PluginBypassMessage: live delta. AddPluginMessage: (re)connect dump
-            if self.current is not None:
-                for plugin in self.current.pedalboard.plugins:
-                    if plugin.instance_id == msg.instance:
-                        logging.debug(f"WebSocket: Plugin {msg.instance} bypass -> {msg.bypassed}")
-                        plugin.set_bypass(msg.bypassed)
-                        self.lcd.refresh_plugin(plugin)
-                        break
+            plugin = self.current.pedalboard.get_plugin(msg.instance) if self.current is not None else None
+            if plugin is not None:
+                logging.debug(f"WebSocket: Plugin {msg.instance} bypass -> {msg.bypassed}")
+                plugin.set_bypass(msg.bypassed)
+                redraws.plugins[plugin.instance_id] = plugin
 
         elif isinstance(msg, TransportMessage):
             if self.hardware and self.hardware.taptempo:
                 self.hardware.taptempo.set_bpm(msg.bpm)
                 if self.hardware.taptempo.is_enabled():
-                    fs = next((f for f in self.hardware.footswitches if f.taptempo is self.hardware.taptempo), None)
-                    self.update_lcd_fs(footswitch=fs)
+                    redraws.tempo = True
 
         elif isinstance(msg, ParamSetMessage):
             # Mirror mod-ui's live value: refresh the cache (so a later edit opens
             # at the current value) and sync any bound control. The connect-dump
             # delivers the real mod-ui state here — :bypass aside, nothing else
             # repaints a non-bypass footswitch.
-            if self.current is not None:
-                for plugin in self.current.pedalboard.plugins:
-                    if plugin.instance_id == msg.instance:
-                        plugin.set_param_value(msg.symbol, msg.value)
-                        break
+            plugin = self.current.pedalboard.get_plugin(msg.instance) if self.current is not None else None
+            if plugin is not None:
+                plugin.set_param_value(msg.symbol, msg.value)
 
         elif isinstance(msg, MidiMapMessage):
             # MIDI learn in mod-ui assigned a hardware control to a parameter.
             self._apply_midi_binding(msg.instance, msg.symbol, msg.binding)
 
+    def _draw_ws_redraws(self, redraws: WsRedraws):
+        plugins = list(redraws.plugins.values())
+        if redraws.title:
+            # draw_title refreshes the whole main panel, plugin rows included
+            self.lcd.refresh_plugin_group(plugins, refresh=False)
+            self.lcd.draw_title()
+        elif len(plugins) == 1:
+            self.lcd.refresh_plugin(plugins[0])
+        elif plugins:
+            self.lcd.refresh_plugin_group(plugins)
+        if redraws.tempo:
+            fs = next((f for f in self.hardware.footswitches if f.taptempo is self.hardware.taptempo), None)
+            self.update_lcd_fs(footswitch=fs)
+
     def poll_ws_messages(self):
         """Drain inbound WS messages (fast ~10ms cadence). Main-thread only.
         Must not touch next_pedalboard_preset_index (owned by the file-watch path)."""
-        for msg in self.ws_bridge.get_received_messages():
-            try:
-                self._handle_ws_message(parse_message(msg))
-            except Exception as e:
-                logging.error(f"Error handling WebSocket message '{msg}': {e}")
+        self._drain_ws_messages()
 
     def poll_modui_changes(self):
         """Poll for changes from MOD-UI: websockets and file watching"""
@@ -510,15 +537,26 @@ class Modhandler(Handler):
             sys.exit()
 
         pbs = json.loads(resp.text)
-        for pb in pbs:
-            logging.info("Loading pedalboard info: %s" % pb[Token.TITLE])
-            bundle = pb[Token.BUNDLE]
-            title = pb[Token.TITLE]
-            pedalboard = Pedalboard.Pedalboard(title, bundle, root_uri=self.root_uri)
-            pedalboard.load_bundle(bundle, self.plugin_dict)
-            self.pedalboards[bundle] = pedalboard
-            self.pedalboard_list.append(pedalboard)
-            #logging.debug("dump: %s" % pedalboard.to_json())
+
+        # Sync stubs (title + bundle) with the list: known pedalboards are kept, only added or
+        # modified ones need loading.  The current one is loaded now, the rest by a background
+        # thread.  See pedalboard_loader.
+        if self.pedalboard_loader is None:
+            self.plugin_cache.seed(self.plugin_dict)
+            parse_workers = Pedalboard.parse_workers_setting(self.settings.get_setting('pedalboards.parse_workers'))
+            self.pedalboard_loader = PedalboardLoader(
+                self.plugin_dict, self.pedalboard_cache, self.plugin_cache, parse_workers=parse_workers
+            )
+        self.pedalboard_loader.stop()
+        added, modified, removed = self.pedalboard_loader.sync(self.pedalboards, self.pedalboard_list, pbs, self.root_uri)
+        logging.info("Pedalboards: %d listed, %d added, %d modified, %d removed" %
+                     (len(self.pedalboard_list), added, modified, removed))
+
+        current = self.pedalboards.get(self.get_current_pedalboard_bundle_path())
+        if current is not None:
+            logging.info("Loading current pedalboard: %s" % current.title)
+            self.pedalboard_loader.load(current)
+        self.pedalboard_loader.start(self.pedalboard_list, self.root_uri)
 
     def reload_pedalboard(self, bundle):
         # find the current pedalboard object associated with that bundle
@@ -526,8 +564,9 @@ class Modhandler(Handler):
         title = old.title
 
         # create a new one
-        pedalboard = Pedalboard.Pedalboard(title, bundle, root_uri=self.root_uri)
-        pedalboard.load_bundle(bundle, self.plugin_dict)
+        pedalboard = self.pedalboard_loader.stub(title, bundle, self.root_uri)
+        self.pedalboard_loader.load(pedalboard)
+        self.pedalboard_loader.save()
         self.pedalboards[bundle] = pedalboard
 
         # replace the pedalboard in pedalboard_list with the new one
@@ -657,16 +696,24 @@ class Modhandler(Handler):
     def pedalboard_change(self, pedalboard: Pedalboard.Pedalboard) -> None:
         logging.info("Pedalboard change")
         self.lcd.draw_info_message("Loading...")
-
-        resp1 = self._rest_get(self.root_uri + "reset")
+        # A snapshot still waiting to load belongs to the board being replaced
+        self.rest_worker.cancel("snapshot")
+        # mod-ui rewrites last.json once loaded; poll_modui_changes() then makes the board current
+        self.rest_worker.submit("pedalboard", lambda rest: self._load_bundle(rest, pedalboard.bundle))
+
+    def _load_bundle(self, rest: RestWorker, bundle: str) -> bool:
+        # Runs on the REST worker thread
+        resp1 = rest.get(self.root_uri + "reset")
         if resp1 is None or resp1.status_code != 200:
             logging.error("Bad Reset request")
 
         uri = self.root_uri + "pedalboard/load_bundle/"
-        data = {"bundlepath": pedalboard.bundle}
-        resp2 = self._rest_post(uri, data=data)
+        data = {"bundlepath": bundle}
+        resp2 = rest.post(uri, data=data)
         if resp2 is None or resp2.status_code != 200:
             logging.error("Bad Rest request: %s %s" % (uri, data))
+            return False
+        return True
 
     #
     # Preset Stuff
@@ -731,13 +778,24 @@ class Modhandler(Handler):
         self._handle_blend_mode_snapshot_change(index)
 
         self.lcd.draw_info_message("Loading...")
+        # Set now so a quick next/previous tap steps from here; a queued load is replaced by the newer one
+        self.current.preset_index = index
+        current = self.current
+        self.rest_worker.submit("snapshot", lambda rest: self._load_snapshot(rest, index),
+                                lambda ok: self._preset_loaded(current))
+
+    def _load_snapshot(self, rest: RestWorker, index: int) -> bool:
+        # Runs on the REST worker thread
         url = (self.root_uri + "snapshot/load?id=%d" % index)
-        # req.get(self.root_uri + "reset")
-        resp = self._rest_get(url)
+        resp = rest.get(url)
         if resp is None or resp.status_code != 200:
             logging.error("Bad Rest request: %s" % url)
-        self.current.preset_index = index
+            return False
+        return True
 
+    def _preset_loaded(self, current: "Modhandler.Current") -> None:
+        if current is not self.current:
+            return  # the pedalboard changed while the snapshot loaded
         # Update name on lcd, and relight any footswitch mapped to a snapshot.
         self.lcd.draw_title()
         for fs in self.hardware.footswitches:
@@ -774,7 +832,7 @@ class Modhandler(Handler):
             # which send MIDI CC → mod-host internally → feedback → msg_callback.
             value = plugin.toggle_bypass()
             if not self._is_pedalboard_loading:
-                self.ws_bridge.send_parameter(plugin.instance_id, ":bypass", value)
+                self.ws_bridge.send_parameter(plugin.instance_id, ":bypass", value, PRIORITY_DISCRETE)
             self.lcd.toggle_plugin(widget, plugin)
 
     def update_lcd_fs(self, footswitch=None, bypass_change=False):
@@ -795,7 +853,8 @@ class Modhandler(Handler):
             return
 
         if not self._is_pedalboard_loading:
-            self.ws_bridge.send_parameter(param.instance_id, param.symbol, param.value)
+            priority = PRIORITY_DISCRETE if param.is_discrete else PRIORITY_CONTINUOUS
+            self.ws_bridge.send_parameter(param.instance_id, param.symbol, param.value, priority)
 
     def parameter_midi_change(self, param, direction):
         if param:
@@ -1060,15 +1119,19 @@ class Modhandler(Handler):
         self.hardware.toggle_tap_tempo_enable(self.get_bpm())
         self.lcd.update_footswitches()
 
-    def set_tuner_source_factory(self, factory: TunerSourceFactory) -> None:
+    def set_tuner_source_factory(self, factory: 'TunerSourceFactory') -> None:
         self._tuner_source_factory = factory
 
-    def _tuner_factory(self, port: str) -> AudioSource:
+    def _tuner_factory(self, port: str) -> 'AudioSource':
+        from pistomp.tuner.source import build_source
+
         factory = self._tuner_source_factory or (lambda p, *, name: build_source("jack", p, name=name))
         return factory(port, name=f"pistomp-tuner-{port.split('_')[-1]}")
 
     def toggle_tuner_enable(self, *argv) -> None:
         if self._tuner_engine is None:
+            from pistomp.tuner import TunerEngine, TunerPanel
+
             muted = bool(self.settings.get_setting(Token.TUNER_MUTE))
             input_port = int(self.settings.get_setting(Token.TUNER_INPUT) or 1)
             engine = TunerEngine(self._tuner_factory(f"system:capture_{input_port}"))
@@ -1087,6 +1150,7 @@ class Modhandler(Handler):
             )
             self._tuner_panel = panel
             self.lcd.show_tuner_panel(panel)
+            self.lcd_poll_period_changed()
         else:
             self._dismiss_tuner()
 
@@ -1099,6 +1163,7 @@ class Modhandler(Handler):
             self._tuner_engine.stop()
             self._tuner_engine = None
         self._tuner_panel = None
+        self.lcd_poll_period_changed()
 
     def _toggle_tuner_mute(self) -> None:
         new_muted = not self._tuner_muted
@@ -1109,6 +1174,8 @@ class Modhandler(Handler):
             self._tuner_panel.set_muted(new_muted)
 
     def _toggle_tuner_input(self) -> None:
+        from pistomp.tuner import TunerEngine
+
         current_port = int(self.settings.get_setting(Token.TUNER_INPUT) or 1)
         new_port = 2 if current_port == 1 else 1
         old_engine = self._tuner_engine
@@ -18,25 +18,31 @@
 import json
 import lilv
 import logging
-import operator
 import os
 import requests as req
 import sys
 import urllib.parse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import common.token as Token
 import common.util as util
 import common.parameter as Parameter
+import modalapi.pedalboard_cache as PedalboardCache
 import modalapi.plugin as Plugin
+import modalapi.signal_graph as SignalGraph
 
-class Pedalboard:
+class BundleParser:
+    """
+    Parses pedalboard bundles with a single lilv World.
 
-    def __init__(self, title, bundle, root_uri="http://localhost:80/"):
-        self.root_uri = root_uri
-        self.title = title
-        self.bundle = bundle  # TODO used?
-        self.plugins = []
+    Specifications and plugin classes are loaded once. Bundles are parsed one
+    after another and each is unloaded again as soon as its plain data has been
+    extracted, so the RDF model of only one bundle is resident at a time.
+    Use get_parser() rather than creating one per pedalboard.
+    """
 
+    def __init__(self):
         self.world = lilv.World()
 
         # this is needed when loading specific bundles instead of load_all
@@ -44,13 +50,28 @@ class Pedalboard:
         self.world.load_specifications()
         self.world.load_plugin_classes()
 
+        self.uri_arc   = self.world.new_uri("http://drobilla.net/ns/ingen#arc")
         self.uri_block = self.world.new_uri("http://drobilla.net/ns/ingen#block")
         self.uri_head  = self.world.new_uri("http://drobilla.net/ns/ingen#head")
         self.uri_port  = self.world.new_uri("http://lv2plug.in/ns/lv2core#port")
         self.uri_tail  = self.world.new_uri("http://drobilla.net/ns/ingen#tail")
         self.uri_value = self.world.new_uri("http://drobilla.net/ns/ingen#value")
+        self.uri_type  = self.world.new_uri("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
+
+    def get_pedalboard_plugin(self, bundlenode, bundle):
+        # get all plugins known to the world, then pick the one from this bundle
+        ps = self.world.get_all_plugins()
+        plugins = [p for p in ps if str(p.get_bundle_uri()) == str(bundlenode)]
+        if not plugins and len(ps) == 1:
+            plugins = [p for p in ps]
+
+        # make sure the bundle includes 1 and only 1 plugin (the pedalboard)
+        if len(plugins) != 1:
+            raise Exception('get_pedalboard_plugin(%s) - bundle has 0 or > 1 plugin' % bundle)
 
-    def get_pedalboard_plugin(self, world, bundlepath):
+        return plugins[0]
+
+    def parse(self, bundlepath):
         # lilv wants the last character as the separator
         bundle = os.path.abspath(bundlepath)
         if not bundle.endswith(os.sep):
@@ -58,112 +79,343 @@ class Pedalboard:
         # convert bundle string into a lilv node
         bundlenode = self.world.new_file_uri(None, bundle)
 
-        # load the bundle
+        # load the bundle, extract everything needed, then drop its model data from the world
         self.world.load_bundle(bundlenode)
+        try:
+            return self._parse_loaded(bundlepath, bundlenode, bundle)
+        finally:
+            self.world.unload_bundle(bundlenode)
 
-        # free bundlenode, no longer needed
-        #self.world.node_free(bundlenode)  # TODO find out why this is no longer necessary (why did API method go away)
+    def _parse_loaded(self, bundlepath, bundlenode, bundle):
+        # Return the single plugin for the pedalboard
+        plugin = self.get_pedalboard_plugin(bundlenode, bundle)
 
-        # get all plugins in the bundle
-        ps = self.world.get_all_plugins()
+        # check if the plugin is a pedalboard
+        def fill_in_type(node):
+            if node is not None and node.is_uri():
+                return node
+            return None
 
-        # make sure the bundle includes 1 and only 1 plugin (the pedalboard)
-        if len(ps) != 1:
-            raise Exception('get_pedalboard_info(%s) - bundle has 0 or > 1 plugin'.format(bundle))
+        plugin_types = [str(i) for i in util.LILV_FOREACH(plugin.get_value(self.uri_type), fill_in_type)]
+        if "http://moddevices.com/ns/modpedal#Pedalboard" not in plugin_types:
+            raise Exception('get_pedalboard_info(%s) - plugin has no mod:Pedalboard type' % bundlepath)
 
-        # no indexing in python-lilv yet, just get the first item
-        plugin = None
-        for p in ps:
-            plugin = p
-            break
+        # Iterate blocks (plugins)
+        plugins_by_id = {}
+        port_owner = {}
+        blocks = plugin.get_value(self.uri_block)
+        for block in blocks:
+            if block is None or block.is_blank():
+                continue
 
-        if plugin is None:
-            raise Exception('get_pedalboard_plugin(%s)'.format(bundle))
+            plugin_uri = None
+            prototype = self.world.find_nodes(block, self.world.ns.lv2.prototype, None)
+            if len(prototype) > 0:
+                #logging.debug("prototype %s" % prototype[0])
+                plugin_uri = str(prototype[0])  # plugin.get_uri()
 
-        return plugin
+            # Extract port data
+            instance_id = str(block.get_path()).replace(bundlepath, "", 1).lstrip("/")
+            nodes = self.world.find_nodes(block, self.world.ns.lv2.port, None)
+            ports = []
+            # These are the port nodes used to define parameter controls
+            for port in nodes:
+                port_owner[str(port)] = instance_id
+                param_value = self.world.get(port, self.uri_value, None)
+                #logging.debug("port: %s  value: %s" % (port, param_value))
+                binding = self.world.get(port, self.world.ns.midi.binding, None)
+                if binding is not None:
+                    controller_num = self.world.get(binding, self.world.ns.midi.controllerNumber, None)
+                    channel = self.world.get(binding, self.world.ns.midi.channel, None)
+                    if (controller_num is not None) and (channel is not None):
+                        binding = "%d:%d" % (self.world.new_int(int(channel)), self.world.new_int(int(controller_num)))
+                        logging.debug("  MIDI CC binding %s" % binding)
+                    else:
+                        binding = str(binding)
+                path = str(port)
+                symbol = os.path.basename(path)
+                value = None
+                if param_value is not None:
+                    if param_value.is_float():
+                        value = float(self.world.new_float(param_value))
+                    elif param_value.is_int():
+                        value = int(self.world.new_int(int(param_value)))
+                    else:
+                        value = str(value)
+                ports.append({"symbol": symbol, "value": value, "binding": binding})
+
+            plugins_by_id[instance_id] = {"instance_id": instance_id, "uri": plugin_uri, "ports": ports}
+
+        # Read every arc once and order the plugins by the resulting signal graph
+        arcs = []
+        for arc in plugin.get_value(self.uri_arc):
+            if arc is None:
+                continue
+            tail = self.world.get(arc, self.uri_tail, None)
+            head = self.world.get(arc, self.uri_head, None)
+            if tail is not None and head is not None:
+                arcs.append((str(tail), str(head)))
+        graph = SignalGraph.build(list(plugins_by_id), port_owner, arcs)
+        plugins = [plugins_by_id[instance_id] for instance_id in graph.order]
 
-    def get_plugin_data(self, uri):
-        url = self.root_uri + "effect/get?uri=" + urllib.parse.quote(uri)
+        # Done obtaining relevant lilv for the pedalboard
+        return {"plugins": plugins, "graph": graph.to_data()}
+
+
+_parser = None
+
+
+def get_parser():
+    """Return the process-wide BundleParser, creating it (and its lilv World) on first use."""
+    global _parser
+    if _parser is None:
+        _parser = BundleParser()
+    return _parser
+
+
+def default_parse_workers():
+    """Parser processes to use by default: all cores but one, which is left for JACK/mod-host."""
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def parse_workers_setting(value):
+    """Parser processes for the pedalboards.parse_workers setting: default_parse_workers() if unset or invalid."""
+    if value is None:
+        return default_parse_workers()
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        logging.warning("Invalid pedalboards.parse_workers setting: %s, using %d" % (value, default_parse_workers()))
+        return default_parse_workers()
+
+
+def parse_pool(workers):
+    """Process pool for parse_bundles().
+
+    Uses spawn rather than fork: the caller is typically multi-threaded (websocket
+    bridge, background loader) and forking with threads running isn't safe.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _parse_in_worker(bundlepath):
+    # Runs in a pool process, which has its own BundleParser
+    return get_parser().parse(bundlepath)
+
+
+def parse_bundles(bundlepaths, pool):
+    """Parse bundles on a process pool, yielding (bundlepath, data) in order.
+
+    data is the plain (picklable) parse_bundle() result, or None if that
+    bundle failed to parse; the error is logged and the caller can retry it
+    in-process.
+    """
+    futures = [(b, pool.submit(_parse_in_worker, b)) for b in bundlepaths]
+    for bundlepath, future in futures:
         try:
-            resp = req.get(url, headers={'Cache-Control': 'no-cache', 'Pragma': 'no-cache'})
-        except:  # TODO
-            logging.error("Cannot connect to mod-host.")
-            sys.exit()
+            yield bundlepath, future.result()
+        except Exception as e:
+            logging.error("Failed to parse pedalboard %s in worker: %s" % (bundlepath, e))
+            yield bundlepath, None
+
+
+# Concurrent effect/get requests while loading the library. Enough to hide
+# mod-ui's per-request latency without starving JACK/mod-host of CPU.
+FETCH_WORKERS = 4
+
+PLUGIN_DATA_HEADERS = {'Cache-Control': 'no-cache', 'Pragma': 'no-cache'}
+
+
+def plugin_data_url(root_uri, uri):
+    return root_uri + "effect/get?uri=" + urllib.parse.quote(uri)
+
+
+def plugin_uris(data):
+    """Prototype URIs referenced by parse_bundle() data."""
+    return [p["uri"] for p in data["plugins"] if p["uri"] is not None]
+
 
+def fetch_plugin_info(uris, root_uri, max_workers=FETCH_WORKERS):
+    """Fetch effect/get for each of uris and return {uri: info}.
+
+    Requests run on a bounded thread pool sharing one keep-alive connection
+    pool. Failures are logged and left out of the result.
+    """
+    uris = list(dict.fromkeys(uris))
+    if not uris:
+        return {}
+
+    session = req.Session()
+    adapter = req.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount("http://", adapter)
+
+    def fetch(uri):
+        url = plugin_data_url(root_uri, uri)
+        try:
+            resp = session.get(url, headers=PLUGIN_DATA_HEADERS)
+        except Exception as e:
+            logging.error("Cannot get plugin data: %s %s" % (url, e))
+            return {}
         if resp.status_code != 200:
             logging.error("mod-host not able to get plugin data: %s\nStatus: %s" % (url, resp.status_code))
             return {}
-            #sys.exit()
-
         return json.loads(resp.text)
 
-    def chase_tail(self, block, conn):
-        if block is None:
-            return
-        conn.append(block)
+    with session, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PluginFetch") as pool:
+        return {uri: info for uri, info in zip(uris, pool.map(fetch, uris)) if info}
 
-        ports = self.world.find_nodes(block, self.uri_port, None)
-        for port in ports:
-            tail = self.world.get(None, self.uri_tail, port)
-            if tail is None:
-                continue
-            head = self.world.get(tail, self.uri_head, None)
-            if head is not None:
-                block = self.world.get(None, self.uri_port, head)
-                if block is not None and block not in conn:
-                    self.chase_tail(block, conn)
-            break
-        return conn
 
-    # Get info from an lv2 bundle
-    # @a bundle is a string, consisting of a directory in the filesystem (absolute pathname).
-    def load_bundle(self, bundlepath, plugin_dict):
-        # Load the bundle, return the single plugin for the pedalboard
-        plugin = self.get_pedalboard_plugin(self.world, bundlepath)
+def fetch_plugin_data(uris, plugin_dict, root_uri, max_workers=FETCH_WORKERS):
+    """Fetch effect/get for each distinct uri not already in plugin_dict.
 
-        # check if the plugin is a pedalboard
-        def fill_in_type(node):
-            if node is not None and node.is_uri():
-                return node
-            return None
+    Failures are left out of plugin_dict, so Pedalboard.load_data() retries
+    them one at a time. Returns the number of entries added.
+    """
+    missing = [u for u in dict.fromkeys(uris) if u not in plugin_dict]
+    if not missing:
+        return 0
+    fetched = fetch_plugin_info(missing, root_uri, max_workers)
+    plugin_dict.update(fetched)
+    logging.debug("Fetched plugin data for %d of %d plugins" % (len(fetched), len(missing)))
+    return len(fetched)
 
-        u = self.world.new_uri("http://www.w3.org/1999/02/22-rdf-syntax-ns#type")
-        plugin_types = [i for i in util.LILV_FOREACH(plugin.get_value(u), fill_in_type)]
-        if "http://moddevices.com/ns/modpedal#Pedalboard" not in plugin_types:
-            raise Exception('get_pedalboard_info(%s) - plugin has no mod:Pedalboard type'.format(bundlepath))
-
-        # Walk ports starting from capture1 to determine general plugin order
-        # TODO can this be generalized to use the chase_tail function?
-        plugin_order = []
-        ports = plugin.get_value(self.uri_port)
-        for port in ports:
-            if port is None:
-                continue
-            tail = self.world.get(None, self.uri_tail, port)   # TODO could end up being capture2
-            if tail is None:
-                continue
-            head = self.world.get(tail, self.uri_head, None)
-            if head is not None:
-                block = self.world.get(None, self.uri_port, head)
-                if block is not None:
-                    self.chase_tail(block, plugin_order)
-            break
 
-        # Iterate blocks (plugins)
-        plugins_unordered = {}
-        plugins_extra = []
-        blocks = plugin.get_value(self.uri_block)
-        for block in blocks:
-            if block is None or block.is_blank():
+def load_bundles(pedalboards, plugin_dict, cache=None, max_workers=FETCH_WORKERS):
+    """Load many pedalboards at once.
+
+    Every bundle is read first (from the cache or lilv), then the plugin data
+    for all distinct prototypes they use is fetched concurrently, and only
+    then are the Plugin/Parameter objects built.
+    """
+    if not pedalboards:
+        return
+    datas = [pb.read_bundle(pb.bundle, cache) for pb in pedalboards]
+    uris = [uri for data in datas for uri in plugin_uris(data)]
+    fetch_plugin_data(uris, plugin_dict, pedalboards[0].root_uri, max_workers)
+    for pb, data in zip(pedalboards, datas):
+        pb.load_data(data, plugin_dict)
+
+
+class Pedalboard:
+
+    def __init__(self, title, bundle, root_uri="http://localhost:80/", loader=None):
+        self.root_uri = root_uri
+        self.title = title
+        self.bundle = bundle  # TODO used?
+        # With a loader this is a stub: plugins are loaded on first access (see pedalboard_loader)
+        self.loader = loader
+        self._plugins = None if loader is not None else []
+        self._plugins_by_id = {}
+        self._params_by_key = {}
+        self._graph = None
+        self.signature = None  # bundle .ttl mtimes when it was read, see pedalboard_cache
+
+    @property
+    def loaded(self):
+        return self._plugins is not None
+
+    @property
+    def plugins(self):
+        if self._plugins is None:
+            self.loader.load_on_demand(self)
+        return self._plugins
+
+    @plugins.setter
+    def plugins(self, plugins):
+        # Index before publishing: the prefetch thread assigns while the main thread reads
+        self._index_plugins(plugins)
+        self._plugins = plugins
+
+    # Inbound WebSocket messages name their target by instance_id (and port symbol), and
+    # a connect dump is one message per port, so look them up here rather than scanning.
+    # Rebuilt whenever the list is assigned (loaded, or reordered by bind_current_pedalboard).
+    def _index_plugins(self, plugins):
+        plugins_by_id = {}
+        params_by_key = {}
+        for plugin in plugins or []:
+            if plugin is None:
                 continue
+            plugins_by_id[plugin.instance_id] = plugin
+            for symbol, param in (plugin.parameters or {}).items():
+                params_by_key[(plugin.instance_id, symbol)] = param
+        self._plugins_by_id = plugins_by_id
+        self._params_by_key = params_by_key
+
+    # Plugin with this instance_id, or None
+    def get_plugin(self, instance_id):
+        if self._plugins is None:
+            self.loader.load_on_demand(self)
+        return self._plugins_by_id.get(instance_id)
+
+    # Parameter for this instance_id and port symbol, or None
+    def get_parameter(self, instance_id, symbol):
+        if self._plugins is None:
+            self.loader.load_on_demand(self)
+        return self._params_by_key.get((instance_id, symbol))
+
+    # SignalGraph of the plugins (by instance_id), or None if not known
+    @property
+    def graph(self):
+        if self._plugins is None:
+            self.loader.load_on_demand(self)
+        return self._graph
+
+    def get_plugin_data(self, uri):
+        url = plugin_data_url(self.root_uri, uri)
+        try:
+            resp = req.get(url, headers=PLUGIN_DATA_HEADERS)
+        except Exception as e:
+            logging.error("Cannot connect to mod-host: %s" % e)
+            if self.loader is not None:
+                # Loaded by the PedalboardLoader, likely on its prefetch thread, where exiting would only
+                # end that thread (skipping the cache save).  Left out of plugin_dict so it's tried again.
+                return {}
+            sys.exit()
+
+        if resp.status_code != 200:
+            logging.error("mod-host not able to get plugin data: %s\nStatus: %s" % (url, resp.status_code))
+            return {}
+            #sys.exit()
+
+        return json.loads(resp.text)
+
+    # Get info from an lv2 bundle
+    # @a bundle is a string, consisting of a directory in the filesystem (absolute pathname).
+    def load_bundle(self, bundlepath, plugin_dict, cache=None):
+        self.load_data(self.read_bundle(bundlepath, cache), plugin_dict)
+
+    # Return parse_bundle() data, from the cache when the bundle is unchanged
+    def read_bundle(self, bundlepath, cache=None):
+        data = None
+        signature = PedalboardCache.bundle_signature(bundlepath)
+        self.signature = signature
+        if cache is not None:
+            data = cache.get(bundlepath, signature)
+        if data is None:
+            data = self.parse_bundle(bundlepath)
+            if cache is not None:
+                cache.put(bundlepath, signature, data)
+        return data
+
+    # Parse a bundle with lilv into plain data (no Plugin/Parameter objects) so it can be cached:
+    # {"plugins": [{"instance_id": str, "uri": str|None, "ports": [{"symbol", "value", "binding"}]}],
+    #  "graph": SignalGraph.to_data()}
+    # Plugins are listed in signal graph order.
+    def parse_bundle(self, bundlepath):
+        return get_parser().parse(bundlepath)
+
+    # Build Plugin and Parameter objects from parse_bundle() data, filling in port details
+    # (ranges, units, scale points, category) from the plugin registry
+    def load_data(self, data, plugin_dict):
+        plugins = []
+        for p in data["plugins"]:
+            instance_id = p["instance_id"]
 
             # Add plugin data (from plugin registry) to global plugin dictionary
             plugin_info = {}
             category = None
-            prototype = self.world.find_nodes(block, self.world.ns.lv2.prototype, None)
-            if len(prototype) > 0:
-                #logging.debug("prototype %s" % prototype[0])
-                plugin_uri = str(prototype[0])  # plugin.get_uri()
+            plugin_uri = p["uri"]
+            if plugin_uri is not None:
                 if plugin_uri not in plugin_dict:
                     plugin_info = self.get_plugin_data(plugin_uri)
                     if plugin_info:
@@ -177,79 +429,38 @@ class Pedalboard:
                         category = cat[0]
 
             # Extract Parameter data
-            instance_id = str(block.get_path()).replace(bundlepath, "", 1).lstrip("/")
-            nodes = self.world.find_nodes(block, self.world.ns.lv2.port, None)
             parameters = {}
-            if len(nodes) > 0:
-                # These are the port nodes used to define parameter controls
-                for port in nodes:
-                    param_value = self.world.get(port, self.uri_value, None)
-                    #logging.debug("port: %s  value: %s" % (port, param_value))
-                    binding = self.world.get(port, self.world.ns.midi.binding, None)
-                    if binding is not None:
-                        controller_num = self.world.get(binding, self.world.ns.midi.controllerNumber, None)
-                        channel = self.world.get(binding, self.world.ns.midi.channel, None)
-                        if (controller_num is not None) and (channel is not None):
-                            binding = "%d:%d" % (self.world.new_int(int(channel)), self.world.new_int(int(controller_num)))
-                            logging.debug("  MIDI CC binding %s" % binding)
-                    path = str(port)
-                    symbol = os.path.basename(path)
-                    value = None
-                    if param_value is not None:
-                        if param_value.is_float():
-                            value = float(self.world.new_float(param_value))
-                        elif param_value.is_int():
-                            value = int(self.world.new_int(int(param_value)))
-                        else:
-                            value = str(value)
-                    # Bypass "parameter" is a special case without an entry in the plugin definition
-                    if symbol == Token.COLON_BYPASS:
-                        info = {"shortName": "bypass", "symbol": symbol, "ranges": {"minimum": 0, "maximum": 1}}  # TODO tokenize
-                        v = 0.0 if value == 0 else 1.0
-                        param = Parameter.Parameter(info, v, binding, instance_id)
+            for port in p["ports"]:
+                symbol = port["symbol"]
+                value = port["value"]
+                binding = port["binding"]
+                # Bypass "parameter" is a special case without an entry in the plugin definition
+                if symbol == Token.COLON_BYPASS:
+                    info = {"shortName": "bypass", "symbol": symbol, "ranges": {"minimum": 0, "maximum": 1}}  # TODO tokenize
+                    v = 0.0 if value == 0 else 1.0
+                    param = Parameter.Parameter(info, v, binding, instance_id)
+                    parameters[symbol] = param
+                    continue  # don't try to find matching symbol in plugin_dict
+                # Try to find a matching symbol in plugin_dict to obtain the remaining param details
+                try:
+                    plugin_params = plugin_info[Token.PORTS][Token.CONTROL][Token.INPUT]
+                except KeyError:
+                    logging.warning("plugin port info not found, could be missing LV2 for: %s", instance_id)
+                    continue
+                for pp in plugin_params:
+                    sym = util.DICT_GET(pp, Token.SYMBOL)
+                    if sym == symbol:
+                        #logging.debug("PARAM: %s %s %s" % (util.DICT_GET(pp, 'name'), info[uri], category))
+                        param = Parameter.Parameter(pp, value, binding, instance_id)
+                        #logging.debug("Param: %s %s %4.2f %4.2f %s" % (param.name, param.symbol, param.minimum, value, binding))
                         parameters[symbol] = param
-                        continue  # don't try to find matching symbol in plugin_dict
-                    # Try to find a matching symbol in plugin_dict to obtain the remaining param details
-                    try:
-                        plugin_params = plugin_info[Token.PORTS][Token.CONTROL][Token.INPUT]
-                    except KeyError:
-                        logging.warning("plugin port info not found, could be missing LV2 for: %s", instance_id)
-                        continue
-                    for pp in plugin_params:
-                        sym = util.DICT_GET(pp, Token.SYMBOL)
-                        if sym == symbol:
-                            #logging.debug("PARAM: %s %s %s" % (util.DICT_GET(pp, 'name'), info[uri], category))
-                            param = Parameter.Parameter(pp, value, binding, instance_id)
-                            #logging.debug("Param: %s %s %4.2f %4.2f %s" % (param.name, param.symbol, param.minimum, value, binding))
-                            parameters[symbol] = param
-
-                    #logging.debug("  Label: %s" % label)
-            inst = Plugin.Plugin(instance_id, parameters, plugin_info, category)
 
-            try:
-                index = plugin_order.index(block)
-                plugins_unordered[index] = inst
-            except:
-                plugins_extra.append(inst)
+            inst = Plugin.Plugin(instance_id, parameters, plugin_info, category)
+            plugins.append(inst)
             #logging.debug("dump: %s" % inst.to_json())
-
-        # Add "extra" plugins (those not part of the tail_chase order) to the plugins_unordered dict
-        max_index = len(plugins_unordered)
-        for e in plugins_extra:
-            plugins_unordered[max_index] = e
-            max_index = max_index + 1
-
-        # Sort the dictionary based on their order index and add to the pedalboard.plugin list
-        # TODO improve the creation (tail chasing, sorting, dict>list conversion)
-        if max_index > 0:
-            sorted_dict = dict(sorted(plugins_unordered.items(), key=operator.itemgetter(0)))
-            for i in range(0, len(sorted_dict)):
-                val = sorted_dict.get(i)
-                if val is not None:
-                    self.plugins.append(val)
-
-        # Done obtaining relevant lilv for the pedalboard
-        return
+        self._graph = SignalGraph.SignalGraph.from_data(data.get("graph"))
+        self.plugins = plugins
 
     def to_json(self):
-        return json.dumps(self, default=lambda o: o.__dict__, sort_keys=True, indent=4)
+        fields = {"title": self.title, "bundle": self.bundle, "plugins": self.plugins}
+        return json.dumps(fields, default=lambda o: o.__dict__, sort_keys=True, indent=4)
@@ -0,0 +1,130 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Persistent cache of parsed pedalboard bundles.
+
+Parsing a bundle through lilv is the slowest part of startup, yet almost no
+bundles change between boots. Each entry stores the plain-data result of
+Pedalboard.parse_bundle() together with the mtimes of the bundle's .ttl files;
+an entry is reused only while those mtimes match exactly.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Optional
+
+CACHE_FILE = "pedalboard_cache.json"
+
+# Bump whenever the shape of Pedalboard.parse_bundle() data changes so stale
+# entries written by an older version are discarded rather than misread.
+CACHE_VERSION = 2
+
+Signature = dict[str, int]
+
+
+def bundle_signature(bundlepath: str) -> Optional[Signature]:
+    """Return {ttl filename: mtime_ns} for a bundle, or None if it has no .ttl files."""
+    try:
+        entries = os.scandir(bundlepath)
+    except OSError:
+        return None
+    signature = {}
+    with entries:
+        for entry in entries:
+            if entry.name.endswith(".ttl") and entry.is_file():
+                signature[entry.name] = entry.stat().st_mtime_ns
+    return signature or None
+
+
+class PedalboardCache:
+    """Parsed bundle data keyed by bundle path, validated by .ttl mtimes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self) -> None:
+        self._entries = {}
+        self._dirty = False
+        try:
+            with open(self.path, "r") as f:
+                j = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable pedalboard cache {self.path}: {e}")
+            return
+        if not isinstance(j, dict) or j.get("version") != CACHE_VERSION:
+            logging.info(f"Pedalboard cache {self.path} is from another version, rebuilding")
+            return
+        entries = j.get("bundles")
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    def save(self) -> None:
+        """Write the cache if anything changed since the last load/save."""
+        if not self._dirty:
+            return
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"version": CACHE_VERSION, "bundles": self._entries}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning(f"Failed to write pedalboard cache {self.path}: {e}")
+            return
+        self._dirty = False
+
+    def get(self, bundle: str, signature: Optional[Signature]) -> Optional[dict[str, Any]]:
+        """Return cached data for bundle if its stored signature matches, else None."""
+        entry = self._entries.get(bundle)
+        if signature is not None and entry is not None and entry.get("signature") == signature:
+            self.hits += 1
+            return entry.get("data")
+        self.misses += 1
+        return None
+
+    def is_valid(self, bundle: str, signature: Optional[Signature]) -> bool:
+        """Like get() but only checks, without returning data or counting a hit/miss."""
+        entry = self._entries.get(bundle)
+        return signature is not None and entry is not None and entry.get("signature") == signature
+
+    def put(self, bundle: str, signature: Optional[Signature], data: dict[str, Any]) -> None:
+        # A bundle without .ttl files can't be validated later, so don't keep it
+        if signature is None:
+            return
+        self._entries[bundle] = {"signature": signature, "data": data}
+        self._dirty = True
+
+    def remove(self, bundle: str) -> None:
+        if self._entries.pop(bundle, None) is not None:
+            self._dirty = True
+
+    def prune(self, bundles) -> None:
+        """Drop entries for bundles not in the given collection."""
+        keep = set(bundles)
+        for bundle in [b for b in self._entries if b not in keep]:
+            self.remove(bundle)
+
+    def __contains__(self, bundle: str) -> bool:
+        return bundle in self._entries
@@ -0,0 +1,221 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Lazy pedalboard loading.
+
+load_pedalboards() syncs stub Pedalboards (title + bundle only) with
+pedalboard/list and loads just the current one before the main loop starts. A low-priority background
+thread then fills in the rest. A stub whose plugins are needed before the
+thread gets to it is loaded on demand by Pedalboard.plugins.
+
+All loads, from any loader, go through one lock: the shared lilv World behind
+parse_bundle() and the caches are not thread-safe.
+
+With parse_workers > 1 and enough uncached bundles, the background thread
+first parses those on a process pool (one lilv World per process) straight
+into the pedalboard cache; the in-process loads that follow are then cache
+hits that only build Plugin/Parameter objects.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Iterable, Optional
+
+import common.token as Token
+import modalapi.pedalboard as Pedalboard
+from modalapi.pedalboard_cache import bundle_signature
+
+# Pause between background loads so the main loop can take the GIL (and the lock)
+PREFETCH_YIELD = 0.005
+
+# Linux nice value for the background thread
+PREFETCH_NICE = 10
+
+# Below this many uncached bundles, starting parser processes costs more than it saves
+PARALLEL_MIN_BUNDLES = 8
+
+_lock = threading.RLock()
+
+
+class PedalboardLoader:
+    """Creates stub Pedalboards and loads them on demand or from a background thread."""
+
+    def __init__(self, plugin_dict: dict[str, Any], pedalboard_cache=None, plugin_cache=None, parse_workers: int = 1):
+        self.plugin_dict = plugin_dict
+        self.pedalboard_cache = pedalboard_cache
+        self.plugin_cache = plugin_cache
+        self.parse_workers = parse_workers
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.on_demand = 0
+
+    def stub(self, title: str, bundle: str, root_uri: str) -> "Pedalboard.Pedalboard":
+        return Pedalboard.Pedalboard(title, bundle, root_uri=root_uri, loader=self)
+
+    def sync(
+        self,
+        pedalboards: dict[str, "Pedalboard.Pedalboard"],
+        pedalboard_list: list["Pedalboard.Pedalboard"],
+        entries: list[dict[str, Any]],
+        root_uri: str,
+    ) -> tuple[int, int, int]:
+        """Bring pedalboards (by bundle) and pedalboard_list in line with a pedalboard/list response.
+
+        Both are updated in place, so anything holding them (eg. the LCD) stays
+        consistent. Known pedalboards are kept as they are; added ones, and
+        loaded ones whose .ttl files changed since, become stubs for the
+        background thread. Returns (added, modified, removed) counts.
+        """
+        added = modified = 0
+        updated = {}
+        for entry in entries:
+            bundle = entry[Token.BUNDLE]
+            title = entry[Token.TITLE]
+            if bundle in updated:
+                continue
+            pedalboard = pedalboards.get(bundle)
+            if pedalboard is None:
+                pedalboard = self.stub(title, bundle, root_uri)
+                added += 1
+            elif pedalboard.loaded and pedalboard.signature != bundle_signature(bundle):
+                pedalboard = self.stub(title, bundle, root_uri)
+                modified += 1
+            else:
+                pedalboard.title = title
+            updated[bundle] = pedalboard
+
+        removed = len([b for b in pedalboards if b not in updated])
+        pedalboards.clear()
+        pedalboards.update(updated)
+        pedalboard_list[:] = updated.values()
+        return added, modified, removed
+
+    def load(self, pedalboard: "Pedalboard.Pedalboard") -> None:
+        """Fully load a stub now (no-op if it already is)."""
+        with _lock:
+            if pedalboard.loaded:
+                return
+            try:
+                Pedalboard.load_bundles([pedalboard], self.plugin_dict, self.pedalboard_cache)
+            except Exception as e:
+                logging.error("Failed to load pedalboard %s: %s" % (pedalboard.bundle, e))
+                pedalboard.plugins = []
+
+    def load_on_demand(self, pedalboard: "Pedalboard.Pedalboard") -> None:
+        if not pedalboard.loaded:
+            self.on_demand += 1
+            logging.debug("Loading pedalboard on demand: %s" % pedalboard.title)
+        self.load(pedalboard)
+
+    def start(self, pedalboards: Iterable["Pedalboard.Pedalboard"], root_uri: str) -> None:
+        """Load the given stubs, in order, on a background thread."""
+        self.stop()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(list(pedalboards), root_uri), name="PedalboardPrefetch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the background thread to finish (used by tests and benchmarks)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def save(self) -> None:
+        """Persist anything the caches picked up."""
+        with _lock:
+            if self.pedalboard_cache is not None:
+                self.pedalboard_cache.save()
+            if self.plugin_cache is not None:
+                self.plugin_cache.update(self.plugin_dict)
+                self.plugin_cache.save()
+
+    def _run(self, pedalboards: list["Pedalboard.Pedalboard"], root_uri: str) -> None:
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), PREFETCH_NICE)
+        except (AttributeError, OSError):
+            pass
+
+        start = time.monotonic()
+        if self.parse_workers > 1:
+            self._parse_parallel([pb for pb in pedalboards if not pb.loaded])
+
+        loaded = 0
+        for pedalboard in pedalboards:
+            if self._stop.is_set():
+                return
+            if not pedalboard.loaded:
+                self.load(pedalboard)
+                loaded += 1
+                time.sleep(PREFETCH_YIELD)
+
+        logging.info(
+            "Background loaded %d pedalboards in %.2fs (%d on demand)" % (loaded, time.monotonic() - start, self.on_demand)
+        )
+        if self.pedalboard_cache is not None:
+            logging.info(
+                "Pedalboard cache: %d reused, %d parsed" % (self.pedalboard_cache.hits, self.pedalboard_cache.misses)
+            )
+            with _lock:
+                self.pedalboard_cache.prune(pb.bundle for pb in pedalboards)
+        self.save()
+        if self.plugin_cache is not None:
+            self.plugin_cache.refresh_in_background(root_uri, self.plugin_dict)
+
+    def _parse_parallel(self, pedalboards: list["Pedalboard.Pedalboard"]) -> None:
+        """Parse uncached bundles on a process pool into the pedalboard cache."""
+        if self.pedalboard_cache is None:
+            return
+        with _lock:
+            signatures = {pb.bundle: bundle_signature(pb.bundle) for pb in pedalboards}
+            bundles = [b for b, sig in signatures.items() if sig is not None and not self.pedalboard_cache.is_valid(b, sig)]
+        if len(bundles) < PARALLEL_MIN_BUNDLES:
+            return
+
+        start = time.monotonic()
+        uris = []
+        pool = Pedalboard.parse_pool(self.parse_workers)
+        try:
+            for bundle, data in Pedalboard.parse_bundles(bundles, pool):
+                if self._stop.is_set():
+                    return
+                if data is not None:
+                    with _lock:
+                        self.pedalboard_cache.put(bundle, signatures[bundle], data)
+                    uris.extend(Pedalboard.plugin_uris(data))
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        logging.info(
+            "Parsed %d pedalboards on %d processes in %.2fs" % (len(bundles), self.parse_workers, time.monotonic() - start)
+        )
+
+        # One concurrent fetch for every plugin those pedalboards use
+        with _lock:
+            Pedalboard.fetch_plugin_data(uris, self.plugin_dict, pedalboards[0].root_uri)
@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Persistent cache of mod-ui effect/get responses (the plugin_dict).
+
+A plugin description only changes when its LV2 bundle is installed or
+upgraded, so each entry is stored with a key made of the plugin's version and
+builder fields plus the mtimes of its LV2 bundle's .ttl files.
+
+At startup every cached entry is put straight into plugin_dict. Entries whose
+bundle files still match are fresh; the rest are stale and get refetched on a
+background thread, replacing both the cache entry and the plugin_dict entry.
+Pedalboards loaded before that finishes keep the stale description until they
+are next reloaded.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Optional
+
+import modalapi.pedalboard as Pedalboard
+from modalapi.pedalboard_cache import bundle_signature
+
+CACHE_FILE = "plugin_cache.json"
+
+# Bump whenever the shape of an entry changes
+CACHE_VERSION = 1
+
+
+def plugin_key(info: dict[str, Any]) -> dict[str, Any]:
+    """Validation key for an effect/get response: version, builder and LV2 bundle .ttl mtimes."""
+    bundles = {}
+    for bundle in info.get("bundles") or []:
+        bundles[bundle] = bundle_signature(bundle)
+    return {"version": info.get("version"), "builder": info.get("builder"), "bundles": bundles}
+
+
+def _is_fresh(key: Optional[dict[str, Any]]) -> bool:
+    """True while every LV2 bundle recorded in key still has the same .ttl mtimes."""
+    if not isinstance(key, dict):
+        return False
+    bundles = key.get("bundles")
+    if not bundles:
+        return False
+    return all(sig is not None and bundle_signature(b) == sig for b, sig in bundles.items())
+
+
+class PluginCache:
+    """effect/get responses keyed by plugin URI, validated by version/builder and bundle mtimes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+        self.stale: list[str] = []
+        self.load()
+
+    def load(self) -> None:
+        self._entries = {}
+        self._dirty = False
+        try:
+            with open(self.path, "r") as f:
+                j = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable plugin cache {self.path}: {e}")
+            return
+        if not isinstance(j, dict) or j.get("version") != CACHE_VERSION:
+            logging.info(f"Plugin cache {self.path} is from another version, rebuilding")
+            return
+        entries = j.get("plugins")
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    def save(self) -> None:
+        """Write the cache if anything changed since the last load/save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "w") as f:
+                    json.dump({"version": CACHE_VERSION, "plugins": self._entries}, f)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                logging.warning(f"Failed to write plugin cache {self.path}: {e}")
+                return
+            self._dirty = False
+
+    def seed(self, plugin_dict: dict[str, Any]) -> None:
+        """Copy every cached entry into plugin_dict and note which ones need refreshing."""
+        self.stale = []
+        with self._lock:
+            for uri, entry in self._entries.items():
+                if uri in plugin_dict:
+                    continue
+                plugin_dict[uri] = entry["data"]
+                if not _is_fresh(entry.get("key")):
+                    self.stale.append(uri)
+        logging.info(
+            "Plugin cache: %d fresh, %d stale" % (len(self._entries) - len(self.stale), len(self.stale))
+        )
+
+    def put(self, uri: str, info: dict[str, Any]) -> None:
+        key = plugin_key(info)
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is not None and entry.get("key") == key and entry.get("data") == info:
+                return
+            self._entries[uri] = {"key": key, "data": info}
+            self._dirty = True
+
+    def update(self, plugin_dict: dict[str, Any]) -> None:
+        """Store plugin_dict entries fetched since seed() (those not cached yet)."""
+        for uri in [u for u in plugin_dict if u not in self._entries]:
+            if plugin_dict[uri]:
+                self.put(uri, plugin_dict[uri])
+
+    def refresh(self, root_uri: str, plugin_dict: dict[str, Any]) -> None:
+        """Refetch stale entries, replace them in the cache and plugin_dict, and save."""
+        uris, self.stale = self.stale, []
+        if not uris:
+            return
+        fetched = Pedalboard.fetch_plugin_info(uris, root_uri)
+        for uri, info in fetched.items():
+            old = self._entries.get(uri, {}).get("key") or {}
+            if old.get("version") != info.get("version") or old.get("builder") != info.get("builder"):
+                logging.info("Plugin %s changed version %s -> %s" % (uri, old.get("version"), info.get("version")))
+            self.put(uri, info)
+            plugin_dict[uri] = info
+        logging.debug("Plugin cache: refreshed %d of %d stale entries" % (len(fetched), len(uris)))
+        self.save()
+
+    def refresh_in_background(self, root_uri: str, plugin_dict: dict[str, Any]) -> None:
+        """Run refresh() on a daemon thread if there is anything stale."""
+        if not self.stale or (self._refresh_thread is not None and self._refresh_thread.is_alive()):
+            return
+        self._refresh_thread = threading.Thread(
+            target=self.refresh, args=(root_uri, plugin_dict), name="PluginCacheRefresh", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout)
+
+    def __contains__(self, uri: str) -> bool:
+        return uri in self._entries
@@ -0,0 +1,141 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import requests
+
+# Seconds. Generous: mod-ui only answers load_bundle once mod-host has loaded every plugin.
+REST_TIMEOUT = 30.0
+
+RestJob = Callable[["RestWorker"], Any]
+
+
+class RestWorker:
+    """Runs slow mod-ui REST calls (pedalboard and snapshot loads) on a daemon
+    worker thread over one persistent requests.Session, so the main loop keeps
+    polling controls and drawing while mod-host loads. Results are delivered on
+    the main thread via poll(), like wifi's CommandQueue.
+
+    Jobs are queued by kind. A submission whose kind is already queued (not yet
+    started) replaces that job: the older one never runs and its callback never
+    fires. A fast triple-tap of "next snapshot" therefore costs at most one load
+    beyond the one already in flight.
+    """
+
+    def __init__(self, session: Any = None, timeout: float = REST_TIMEOUT) -> None:
+        self.session = session if session is not None else requests.Session()
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._pending: OrderedDict[str, tuple[RestJob, Optional[Callable[[Any], None]]]] = OrderedDict()
+        self._in_flight: Optional[str] = None
+        self._stopped = False
+        self._result_queue: queue.Queue = queue.Queue()
+        self.submitted = 0
+        self.superseded = 0   # queued jobs replaced by a newer one of the same kind
+        self._worker = threading.Thread(target=self._drain, daemon=True, name="RestWorker")
+        self._worker.start()
+
+    def get(self, url: str) -> Optional[requests.Response]:
+        """For jobs: GET on the worker's session. Logs and returns None on failure."""
+        try:
+            return self.session.get(url, timeout=self.timeout)
+        except Exception as e:
+            logging.error("REST GET failed: %s %s" % (url, e))
+            return None
+
+    def post(self, url: str, *, json=None, data=None) -> Optional[requests.Response]:
+        """For jobs: POST on the worker's session. Logs and returns None on failure."""
+        try:
+            return self.session.post(url, json=json, data=data, timeout=self.timeout)
+        except Exception as e:
+            logging.error("REST POST failed: %s %s" % (url, e))
+            return None
+
+    def submit(self, kind: str, job: RestJob, on_done: Optional[Callable[[Any], None]] = None) -> bool:
+        """Queue job(worker) to run on the worker thread; on_done(result) runs in poll().
+
+        Returns False if this replaced a queued job of the same kind.
+        """
+        with self._cond:
+            replaced = kind in self._pending
+            if replaced:
+                self.superseded += 1
+                logging.debug("REST %s superseded before it ran" % kind)
+            # A replacement keeps the kind's place in line
+            self._pending[kind] = (job, on_done)
+            self.submitted += 1
+            self._cond.notify()
+        return not replaced
+
+    def cancel(self, kind: str) -> bool:
+        """Drop a queued (not yet started) job. Its callback never fires."""
+        with self._cond:
+            return self._pending.pop(kind, None) is not None
+
+    def _drain(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                kind, (job, on_done) = self._pending.popitem(last=False)
+                self._in_flight = kind
+            try:
+                result = job(self)
+            except Exception as e:
+                logging.exception("REST %s failed" % kind)
+                result = e
+            if on_done is not None:
+                self._result_queue.put((on_done, result))
+            with self._cond:
+                self._in_flight = None
+                self._cond.notify_all()
+
+    def poll(self) -> None:
+        """Run completion callbacks on the calling (main) thread."""
+        while True:
+            try:
+                on_done, result = self._result_queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                on_done(result)
+            except Exception:
+                logging.exception("REST result callback failed")
+
+    def busy(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or self._in_flight is not None
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or running. False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and self._in_flight is None, timeout)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._pending.clear()
+            self._cond.notify_all()
+        self._worker.join(timeout=2.0)
+        self.session.close()
@@ -0,0 +1,134 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Signal graph of a pedalboard: which plugin feeds which.
+
+Built from the ingen arcs (tail port -> head port) of a bundle in one pass.
+Ports not owned by any block are the pedalboard's own inputs (capture_1,
+midi_capture, ...) and outputs (playback_1, ...).
+
+Plugin order is a depth-first topological order: plugins fed by the
+pedalboard inputs first, each parallel branch listed contiguously in arc
+order, then any plugins not reachable from an input. Everything is
+iterative and index based, so it's linear in blocks + arcs and deep chains
+can't hit the recursion limit.
+"""
+
+from typing import Any, Iterable, Optional
+
+
+class SignalGraph:
+    """Plugin-level adjacency of a pedalboard, by instance_id."""
+
+    def __init__(
+        self,
+        order: list[str],
+        edges: Iterable[tuple[str, str]] = (),
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+    ):
+        self.order = list(order)
+        self.index = {instance_id: i for i, instance_id in enumerate(self.order)}
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self._succ: dict[str, list[str]] = {i: [] for i in self.order}
+        self._pred: dict[str, list[str]] = {i: [] for i in self.order}
+        for tail, head in edges:
+            if head not in self._succ.setdefault(tail, []):
+                self._succ[tail].append(head)
+                self._pred.setdefault(head, []).append(tail)
+
+    @property
+    def edges(self) -> list[tuple[str, str]]:
+        return [(tail, head) for tail, heads in self._succ.items() for head in heads]
+
+    def successors(self, instance_id: str) -> list[str]:
+        return self._succ.get(instance_id, [])
+
+    def predecessors(self, instance_id: str) -> list[str]:
+        return self._pred.get(instance_id, [])
+
+    def is_parallel(self) -> bool:
+        """True if the signal splits anywhere (a plugin feeds more than one other plugin)."""
+        return len(self.inputs) > 1 or any(len(heads) > 1 for heads in self._succ.values())
+
+    def to_data(self) -> dict[str, Any]:
+        return {"order": self.order, "edges": [list(e) for e in self.edges], "inputs": self.inputs, "outputs": self.outputs}
+
+    @classmethod
+    def from_data(cls, data: Optional[dict[str, Any]]) -> Optional["SignalGraph"]:
+        if not data:
+            return None
+        return cls(data["order"], [tuple(e) for e in data["edges"]], data["inputs"], data["outputs"])
+
+
+def _reverse_postorder(roots: list[str], succ: dict[str, list[str]], visited: set[str]) -> list[str]:
+    # Roots and children are visited in reverse so the reversed postorder lists them in their given order
+    postorder = []
+    for root in reversed(roots):
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(reversed(succ[root])))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(reversed(succ[child]))))
+                    break
+            else:
+                stack.pop()
+                postorder.append(node)
+    postorder.reverse()
+    return postorder
+
+
+def build(blocks: list[str], port_owner: dict[str, str], arcs: Iterable[tuple[str, str]]) -> SignalGraph:
+    """Build the graph for blocks (instance_ids, in document order).
+
+    port_owner maps a port URI to the instance_id of the block it belongs to.
+    arcs are (tail port URI, head port URI) pairs.
+    """
+    succ: dict[str, list[str]] = {b: [] for b in blocks}
+    indegree = dict.fromkeys(blocks, 0)
+    inputs = []  # (pedalboard input port, block) pairs
+    outputs = []
+    for tail, head in sorted(arcs):
+        src = port_owner.get(tail)
+        dst = port_owner.get(head)
+        if src is None and dst is not None:
+            inputs.append((tail, dst))
+        elif src is not None and dst is None:
+            if src not in outputs:
+                outputs.append(src)
+        elif src is not None and dst is not None and src != dst and dst not in succ[src]:
+            succ[src].append(dst)
+            indegree[dst] += 1
+
+    roots = list(dict.fromkeys(block for _, block in inputs))
+    visited: set[str] = set()
+    order = _reverse_postorder(roots, succ, visited)
+
+    # Then plugins the inputs don't reach (generators, orphans): sources first, then anything left (cycles)
+    rest = [b for b in blocks if b not in visited]
+    order += _reverse_postorder([b for b in rest if indegree[b] == 0], succ, visited)
+    order += _reverse_postorder([b for b in rest if b not in visited], succ, visited)
+
+    edges = [(tail, head) for tail in blocks for head in succ[tail]]
+    return SignalGraph(order, edges, roots, outputs)
@@ -20,6 +20,26 @@ Async WebSocket bridge for parameter setting.
 
 Provides a thread-safe bridge between the synchronous main loop and
 async WebSocket communication with mod-ui.
+
+By default each bridge runs its worker on a dedicated thread with its own event
+loop. After use_event_loop(loop), bridges started from then on run their worker
+as a task on that loop instead (the asyncio runtime, see pistomp.aioruntime).
+The main loop and the WebSocket then share one thread, and on_receive callbacks
+run as soon as a message arrives.
+
+Outbound param_sets coalesce: while one for an (instance, symbol) port is still
+queued, a newer value for that port overwrites it in place, so a pedal sweep
+sends the latest value rather than every intermediate one. Other commands
+(transport-bpm) are never merged and keep their FIFO position.
+
+Each send names a priority lane. Discrete user actions (a bypass, a toggle) go
+out ahead of queued controller streams, which go ahead of background sync. While
+the socket is backed up only the background lane is shed: the other lanes are
+either one message per action or already bounded by coalescing.
+
+Either way the worker sleeps while the outbound queue is empty. A send that finds
+it asleep wakes it with loop.call_soon_threadsafe (or directly, from the loop's
+own thread); sends made while it is draining don't touch the loop at all.
 """
 
 import asyncio
@@ -27,7 +47,11 @@ import logging
 import queue
 import sys
 import threading
-from typing import Optional
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+import pistomp.latency as latency
 
 try:
     import websockets
@@ -35,6 +59,84 @@ except ImportError:
     logging.error("websockets library not installed. Run: pip install websockets")
     raise
 
+# Outbound priority lanes, most urgent first
+PRIORITY_DISCRETE = 0    # user actions: bypass, toggle and enumeration params, tempo
+PRIORITY_CONTINUOUS = 1  # controller streams: pedal sweeps, encoder turns, blend interpolation
+PRIORITY_BACKGROUND = 2  # bulk sync, e.g. blend constants on activation; shed under backpressure
+PRIORITIES = (PRIORITY_DISCRETE, PRIORITY_CONTINUOUS, PRIORITY_BACKGROUND)
+
+# Loop that bridges started after use_event_loop() run their worker on; None = own thread each
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def use_event_loop(loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Run the workers of bridges started from now on as tasks on loop (None: back to threads)."""
+    global _shared_loop
+    _shared_loop = loop
+
+
+class OutboundQueue:
+    """Thread-safe outbound queue with one lane per priority. get_nowait() takes
+    from the most urgent non-empty lane, FIFO within it.
+
+    A message put with a key replaces a queued message with the same key. In the
+    same lane it keeps its place in line; put in another lane it moves there, so
+    an older value can never be sent after a newer one. Unkeyed messages are plain
+    FIFO. Same get_nowait/empty/qsize interface as queue.Queue."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lanes: list[OrderedDict] = [OrderedDict() for _ in PRIORITIES]
+        self._lane_of: dict[Hashable, int] = {}  # key -> lane it's queued in
+        self._seq = 0
+        self.coalesced = 0  # queued messages overwritten by a newer value before being sent
+
+    def put(self, msg: str, key: Optional[Hashable] = None, priority: int = PRIORITY_CONTINUOUS) -> Optional[str]:
+        """Queue msg. Returns the message it replaced, if any."""
+        with self._lock:
+            lane = self._lanes[priority]
+            if key is None:
+                self._seq += 1
+                lane[self._seq] = msg  # ints never collide with tuple keys
+                return None
+            old = None
+            queued_in = self._lane_of.get(key)
+            if queued_in is not None:
+                old = (lane.get(key) if queued_in == priority else self._lanes[queued_in].pop(key))
+                self.coalesced += 1
+            lane[key] = msg
+            self._lane_of[key] = priority
+            return old
+
+    def put_nowait(self, msg: str) -> None:
+        self.put(msg)
+
+    def get_nowait(self) -> str:
+        with self._lock:
+            for lane in self._lanes:
+                if lane:
+                    key, msg = lane.popitem(last=False)
+                    self._lane_of.pop(key, None)
+                    return msg
+            raise queue.Empty
+
+    def empty(self) -> bool:
+        return not any(self._lanes)
+
+    def qsize(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    def lane_depths(self) -> list[int]:
+        return [len(lane) for lane in self._lanes]
+
+    def clear(self) -> int:
+        with self._lock:
+            n = self.qsize()
+            for lane in self._lanes:
+                lane.clear()
+            self._lane_of.clear()
+            return n
+
 
 class WebSocketWorker:
     """
@@ -46,7 +148,8 @@ class WebSocketWorker:
     """
 
     def __init__(
-        self, ws_url: str, backpressure_threshold: int, command_queue: queue.Queue, received_queue: queue.Queue
+        self, ws_url: str, backpressure_threshold: int, command_queue: "OutboundQueue | queue.Queue",
+        received_queue: queue.Queue
     ):
         self.ws_url = ws_url
         self.backpressure_threshold = backpressure_threshold
@@ -54,6 +157,17 @@ class WebSocketWorker:
         self.received_queue = received_queue
         self.running = False
         self.ws = None
+        # id(message) -> switch edge timestamp, for messages sent while handling a press
+        self.traced: dict[int, float] = {}
+        # Outbound wakeup, created on the worker's loop. waiting is True while
+        # _process_queue is (about to be) asleep on an empty queue.
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.waiting = False
+        self.wakeups = 0
+        # Shared-loop mode: called after each inbound message is queued
+        self.on_receive: Optional[Callable[[], None]] = None
 
         # Metrics
         self.messages_sent = 0
@@ -72,8 +186,46 @@ class WebSocketWorker:
         finally:
             loop.close()
 
+    def notify(self, force: bool = False) -> None:
+        """Wake _process_queue after a message was queued. Any thread.
+
+        Cheap when the worker is busy: it drains until the queue is empty, so
+        only a send that finds it waiting needs to schedule the wakeup.
+        """
+        if not (self.waiting or force):
+            return
+        loop, wakeup = self.loop, self.wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        if threading.get_ident() == self._loop_thread:
+            wakeup.set()
+        else:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                pass  # loop closed between the check and the call
+
+    async def _wait_for_messages(self):
+        """Sleep until notify(). Publishing `waiting` before the emptiness check means a
+        sender either sees the flag and wakes us, or queued its message before the check."""
+        self.waiting = True
+        self.wakeup.clear()
+        try:
+            if self.command_queue.empty() and self.running:
+                self.wakeups += 1
+                await self.wakeup.wait()
+        finally:
+            self.waiting = False
+
+    def _bind_loop(self):
+        """Attach the wakeup to the running loop (the one _process_queue runs on)."""
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.wakeup = asyncio.Event()
+
     async def _async_worker(self):
         """Connects and drives the message loop, with exponential-backoff reconnection."""
+        self._bind_loop()
         retry_delay = 1.0
 
         while self.running:
@@ -98,6 +250,7 @@ class WebSocketWorker:
                             flushed += 1
                         except queue.Empty:
                             break
+                    self.traced.clear()
                     if flushed:
                         logging.info(f"Flushed {flushed} stale messages from queue after reconnect")
 
@@ -117,18 +270,23 @@ class WebSocketWorker:
 
     async def _process_queue(self, ws):
         """Drain the queue and send messages; exits on connection close."""
+        if self.loop is not asyncio.get_running_loop():
+            self._bind_loop()  # the wakeup must belong to the loop we wait on
         while self.running:
             msg = None
             try:
                 try:
                     msg = self.command_queue.get_nowait()
                 except queue.Empty:
-                    await asyncio.sleep(0.001)  # 1ms yield
+                    await self._wait_for_messages()
                     continue
 
                 await ws.send(msg)
                 self.messages_sent += 1
-                self.command_queue.task_done()
+                if self.traced:
+                    edge = self.traced.pop(id(msg), None)
+                    if edge is not None:
+                        latency.record("ws_sent", time.monotonic() - edge)
 
                 buffer_size = self._get_write_buffer_size(ws)
 
@@ -175,6 +333,8 @@ class WebSocketWorker:
                     continue  # audio-meter flood; nothing consumes it, drop before it floods the queue
                 self.received_queue.put(message)
                 self.messages_received += 1
+                if self.on_receive is not None:
+                    self.on_receive()
                 logging.debug(f"Received message from server: {message[:100]}")
         except websockets.exceptions.ConnectionClosed:
             logging.debug("WebSocket receive loop closed")
@@ -198,18 +358,25 @@ class AsyncWebSocketBridge:
 
     def __init__(self, ws_url: str = "ws://localhost:80/websocket", backpressure_threshold: int = 8192):
         self.ws_url = ws_url
-        self.command_queue: queue.Queue = queue.Queue()  # Unbounded - never drop blend mode messages
+        # Unbounded, and the latest value for every port is always sent (blend mode relies on it)
+        self.command_queue = OutboundQueue()
         self.received_queue: queue.Queue = queue.Queue()
         self._worker = WebSocketWorker(ws_url, backpressure_threshold, self.command_queue, self.received_queue)
+        self.messages_shed = 0  # background sends refused under backpressure
         self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
 
     def start(self):
-        """Start background async worker thread."""
+        """Start the async worker: on its own thread, or on the loop given to use_event_loop()."""
         if self._worker.running:
             logging.warning("WebSocket bridge already running")
             return
 
         self._worker.running = True
+        if _shared_loop is not None:
+            self._task = _shared_loop.create_task(self._worker._async_worker(), name="WebSocketWorker")
+            logging.info(f"WebSocket worker started on the shared event loop, connecting to {self.ws_url}")
+            return
         self._thread = threading.Thread(target=self._worker.run, daemon=True, name="WebSocketWorker")
         self._thread.start()
         logging.info(f"WebSocket worker started, connecting to {self.ws_url}")
@@ -220,23 +387,62 @@ class AsyncWebSocketBridge:
             return
 
         self._worker.running = False
-        if self._thread and not sys.is_finalizing():
+        self._worker.notify(force=True)
+        if self._task is not None:
+            self._stop_task(self._task)
+            self._task = None
+        elif self._thread and not sys.is_finalizing():
             self._thread.join(timeout=2.0)
         logging.info(f"WebSocket worker stopped (sent={self._worker.messages_sent})")
 
-    def send_bpm(self, bpm: float) -> bool:
-        """Queue a BPM change. Returns False if backpressure is active."""
-        if self._worker.backpressure_active:
+    @staticmethod
+    def _stop_task(task: asyncio.Task) -> None:
+        task.cancel()
+        loop = task.get_loop()
+        # Outside the loop (e.g. cleanup after it returned), let the cancellation run so the socket closes
+        if not loop.is_running() and not loop.is_closed():
+            try:
+                loop.run_until_complete(asyncio.wait([task], timeout=2.0))
+            except Exception as e:
+                logging.debug(f"WebSocket worker did not stop cleanly: {e}")
+
+    def set_on_receive(self, callback: Optional[Callable[[], None]]) -> None:
+        """Call callback after each inbound message is queued. It runs on the worker's
+        loop, so this is only useful with use_event_loop() (the callback shares the main thread)."""
+        self._worker.on_receive = callback
+
+    def _shed(self, priority: int) -> bool:
+        if priority == PRIORITY_BACKGROUND and self._worker.backpressure_active:
+            self.messages_shed += 1
+            return True
+        return False
+
+    def send_bpm(self, bpm: float, priority: int = PRIORITY_CONTINUOUS) -> bool:
+        """Queue a BPM change. Returns False if shed for backpressure (background lane only)."""
+        if self._shed(priority):
             return False
-        self.command_queue.put_nowait(f"transport-bpm {bpm}")
+        self.command_queue.put(f"transport-bpm {bpm}", priority=priority)
+        self._worker.notify()
         return True
 
-    def send_parameter(self, instance_id: str, symbol: str, value: float) -> bool:
+    def send_parameter(self, instance_id: str, symbol: str, value: float,
+                       priority: int = PRIORITY_CONTINUOUS) -> bool:
         """Queue a parameter update. instance_id should be canonical (no leading slash).
-        Returns False if backpressure is active."""
-        if self._worker.backpressure_active:
+        Returns False if shed for backpressure (background lane only)."""
+        if self._shed(priority):
             return False
-        self.command_queue.put_nowait(f"param_set /graph/{instance_id}/{symbol} {value}")
+        msg = f"param_set /graph/{instance_id}/{symbol} {value}"
+        edge = latency.active()
+        if edge is not None:
+            latency.mark("ws_queued")
+            self._worker.traced[id(msg)] = edge
+        replaced = self.command_queue.put(msg, key=(instance_id, symbol), priority=priority)
+        if replaced is not None and self._worker.traced:
+            # The earlier press's value now goes out with this message
+            old_edge = self._worker.traced.pop(id(replaced), None)
+            if old_edge is not None and (edge is None or old_edge < edge):
+                self._worker.traced[id(msg)] = old_edge
+        self._worker.notify()
         return True
 
     def get_received_messages(self) -> list:
@@ -252,11 +458,19 @@ class AsyncWebSocketBridge:
     def get_queue_depth(self) -> int:
         return self.command_queue.qsize()
 
+    @property
+    def messages_coalesced(self) -> int:
+        """param_sets overwritten by a newer value for the same port before they were sent."""
+        return self.command_queue.coalesced
+
     def get_stats(self) -> dict:
         stats = {
             "queue_depth": self.get_queue_depth(),
             "messages_sent": self._worker.messages_sent,
             "messages_received": self._worker.messages_received,
+            "messages_coalesced": self.command_queue.coalesced,
+            "messages_shed": self.messages_shed,
+            "lane_depths": self.command_queue.lane_depths(),
             "backpressure_events": self._worker.backpressure_events,
             "backpressure_active": self._worker.backpressure_active,
         }
@@ -266,15 +480,8 @@ class AsyncWebSocketBridge:
 
     def clear_queue(self) -> int:
         """Clear all pending messages from the queue, returning num cleared."""
-        cleared_count = 0
-        try:
-            while True:
-                self.command_queue.get_nowait()
-                self.command_queue.task_done()
-                cleared_count += 1
-        except queue.Empty:
-            pass
-
+        cleared_count = self.command_queue.clear()
+        self._worker.traced.clear()
         if cleared_count > 0:
             logging.debug(f"Cleared {cleared_count} pending messages from WebSocket queue")
 
@@ -264,3 +264,24 @@ def parse_message(raw_message: str) -> WebSocketMessage:
         return UnknownMessage(raw=raw_message)
 
     return UnknownMessage(raw=raw_message)
+
+
+def _supersede_key(msg: WebSocketMessage):
+    # Messages with the same key set the same state, so only the last one counts
+    if isinstance(msg, ParamSetMessage):
+        return (msg.instance, msg.symbol)
+    if isinstance(msg, (PluginBypassMessage, AddPluginMessage)):
+        return (msg.instance, ":bypass")
+    return None
+
+
+def coalesce_messages(messages: list[WebSocketMessage]) -> list[WebSocketMessage]:
+    """Drop messages a later one in the same batch supersedes: a param_set for the
+    same port, or a bypass (param_set :bypass or add) for the same plugin. Everything
+    else, and the order of what's kept, is unchanged."""
+    last = {}
+    for i, msg in enumerate(messages):
+        key = _supersede_key(msg)
+        if key is not None:
+            last[key] = i
+    return [msg for i, msg in enumerate(messages) if last.get(_supersede_key(msg), i) == i]
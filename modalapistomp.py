@@ -31,26 +31,26 @@ logging.basicConfig(
 
 import argparse
 import os
-import time
 
 from rtmidi.midiutil import open_midioutput
 
 from modalapi.pedalboard_monitor import write_last_json
 
 from pistomp.audiocard import Audiocard
+from pistomp.scheduler import PRIORITY_LOW, Scheduler
+import pistomp.latency as latency
+from pistomp.startup_trace import StartupTracer
 import pistomp.audiocardfactory as Audiocardfactory
 import pistomp.config as config
-import pistomp.generichost as Generichost
-import pistomp.testhost as Testhost
 import pistomp.handlerfactory as Handlerfactory
 import pistomp.hardwarefactory as Hardwarefactory
-from pistomp.tuner.source import build_source
 
 EMULATOR_HOSTS = ("emulator_v1", "emulator_v2", "emulator_v3")
 
 
 def main():
     sys.settrace
+    trace = StartupTracer()
 
     # Command line parsing
     parser = argparse.ArgumentParser()
@@ -74,6 +74,21 @@ def main():
         default=None,
         help="Audio source for tuner: 'jack' or 'tone:<hz>' (e.g. tone:440). Defaults to 'tone:440' on emulator, 'jack' otherwise.",
     )
+    parser.add_argument(
+        "--latency-report",
+        nargs="?",
+        type=float,
+        const=30.0,
+        default=None,
+        metavar="SECONDS",
+        help="Print footswitch-to-MIDI/WebSocket/LCD latency distributions every SECONDS (default 30) and at exit",
+    )
+    parser.add_argument(
+        "--asyncio",
+        action="store_true",
+        help="Run the main loop, WebSocket and file watching on one asyncio event loop instead of a "
+        "polling main loop plus a WebSocket thread (for A/B comparison)",
+    )
 
     args = parser.parse_args()
 
@@ -106,11 +121,21 @@ def main():
 
     is_emulator = args.host[0] in EMULATOR_HOSTS
 
+    # The handler's WebSocket bridge starts on this loop, so it must exist before the handler
+    loop = None
+    if args.asyncio:
+        import asyncio
+        from modalapi import websocket_bridge
+
+        loop = asyncio.new_event_loop()
+        websocket_bridge.use_event_loop(loop)
+
     if not is_emulator:
         # Audio Card Config - doing this early so audio passes ASAP
-        factory = Audiocardfactory.Audiocardfactory(cwd)
-        audiocard = factory.create()
-        audiocard.restore()
+        with trace.phase("audiocard restore"):
+            factory = Audiocardfactory.Audiocardfactory(cwd)
+            audiocard = factory.create()
+            audiocard.restore()
 
         # MIDI initialization
         # Prompts user for MIDI input port, unless a valid port number or name
@@ -121,69 +146,81 @@ def main():
         port = 0  # TODO get this (the Midi Through port) programmatically
         # port = sys.argv[1] if len(sys.argv) > 1 else None
         try:
-            midiout, port_name = open_midioutput(port)
+            with trace.phase("midi open"):
+                midiout, port_name = open_midioutput(port)
         except (EOFError, KeyboardInterrupt):
             sys.exit()
 
         # Load the default config
         # cfg used by factories to determine which handler and hardware objects to create
         # Hardware object uses cfg to know how to initialize the hardware elements
-        cfg = config.load_default_cfg()
+        with trace.phase("config load"):
+            cfg = config.load_default_cfg()
 
     if args.host[0] == "mod":
         # Create singleton Mod handler
-        handlerfactory = Handlerfactory.Handlerfactory()
-        handler = handlerfactory.create(cfg, audiocard, cwd)
+        with trace.phase("handler create"):
+            handlerfactory = Handlerfactory.Handlerfactory()
+            handler = handlerfactory.create(cfg, audiocard, cwd)
         if handler is None:
             logging.error("Cannot create handler for the version specified in configuration file")
             sys.exit()
 
         # Initialize hardware (Footswitches, Encoders, Analog inputs, etc.)
-        factory = Hardwarefactory.Hardwarefactory()
-        hw = factory.create(cfg, handler, midiout)
-        handler.add_hardware(hw)
+        with trace.phase("hardware init"):
+            factory = Hardwarefactory.Hardwarefactory()
+            hw = factory.create(cfg, handler, midiout)
+            handler.add_hardware(hw)
 
-        # Load all pedalboard info from the lilv ttl file
-        handler.load_banks()
-        handler.load_pedalboards()
+        # Load the current pedalboard from its lilv ttl file; the rest load in the background
+        with trace.phase("load_banks"):
+            handler.load_banks()
+        with trace.phase("load_pedalboards"):
+            handler.load_pedalboards()
 
         # Load the current pedalboard as "current"
-        current_pedal_board_bundle = handler.get_current_pedalboard_bundle_path()
-        if current_pedal_board_bundle and current_pedal_board_bundle in handler.pedalboards:
-            handler.set_current_pedalboard(handler.pedalboards[current_pedal_board_bundle])
-        else:
-            if not handler.pedalboard_list:
+        with trace.phase("set current pedalboard"):
+            current_pedal_board_bundle = handler.get_current_pedalboard_bundle_path()
+            if current_pedal_board_bundle and current_pedal_board_bundle in handler.pedalboards:
+                handler.set_current_pedalboard(handler.pedalboards[current_pedal_board_bundle])
+            else:
+                if not handler.pedalboard_list:
+                    if current_pedal_board_bundle:
+                        logging.error(
+                            "last.json references %s but no pedalboards are available",
+                            current_pedal_board_bundle,
+                        )
+                    else:
+                        logging.error("No pedalboards found; cannot recover from missing/malformed last.json")
+                    sys.exit(1)
                 if current_pedal_board_bundle:
-                    logging.error(
-                        "last.json references %s but no pedalboards are available",
+                    logging.warning(
+                        "last.json pedalboard %s not found; resetting to first available",
                         current_pedal_board_bundle,
                     )
-                else:
-                    logging.error("No pedalboards found; cannot recover from missing/malformed last.json")
-                sys.exit(1)
-            if current_pedal_board_bundle:
-                logging.warning(
-                    "last.json pedalboard %s not found; resetting to first available",
-                    current_pedal_board_bundle,
-                )
-            pb = handler.pedalboard_list[0]
-            write_last_json(handler.last_json_monitor.path, pb.bundle)
-            handler.pedalboard_change(pb)
-            handler.set_current_pedalboard(pb)
+                pb = handler.pedalboard_list[0]
+                write_last_json(handler.last_json_monitor.path, pb.bundle)
+                handler.pedalboard_change(pb)
+                handler.set_current_pedalboard(pb)
 
         # Load system info.  This can take a few seconds
-        handler.system_info_load()
+        with trace.phase("system_info_load"):
+            handler.system_info_load()
 
     elif args.host[0] == "generic":
         # No specific plugin host specified, so use a generic handler
         # Encoders and LCD not mapped without specific purpose
         # Just initialize the control hardware (footswitches, analog controls, etc.) for use as MIDI controls
+        import pistomp.generichost as Generichost
+
         handler = Generichost.Generichost(homedir=cwd)
         factory = Hardwarefactory.Hardwarefactory()
         hw = factory.create(cfg, handler, midiout)
         handler.add_hardware(hw)
 
     elif args.host[0] == "test":
+        import pistomp.testhost as Testhost  # numpy
+
         handler = Testhost.Testhost(audiocard, homedir=cwd)
         try:
             factory = Hardwarefactory.Hardwarefactory()
@@ -195,49 +232,51 @@ def main():
     elif is_emulator:
         from emulator.bootstrap import bootstrap_emulator
 
-        handler, midiout = bootstrap_emulator(args.host[0], cwd)
+        handler, midiout = bootstrap_emulator(args.host[0], cwd, trace)
 
     assert handler is not None
 
     if not is_emulator and args.tuner_source:
+        from pistomp.tuner.source import build_source
+
         tuner_spec = args.tuner_source
         handler.set_tuner_source_factory(lambda port, *, name: build_source(tuner_spec, port, name=name))
 
     logging.info("Entering main loop. Press Control-C to exit.")
-    period = 0
     try:
         # startup actions
-        handler.poll_system_info()
-
-        # main loop
-        while True:
-            handler.poll_controls()
-            handler.poll_ws_messages()  # drain inbound WS every tick for instant bypass/snapshot indicators
-            time.sleep(0.01)  # lower to increase responsiveness, but can cause conflict with LCD if too low
-
-            # For less frequent events
-            period += 1
-            if period % 2 == 0:
-                handler.poll_indicators()
-            # LCD polling frequency adapts to SPI speed (24MHz→80ms, 48MHz→40ms, 56MHz→30ms)
-            if period % handler.lcd_poll_divisor == 0:
-                handler.poll_lcd_updates()
-            if period % 100 == 0:
-                handler.poll_modui_changes()
-            if period % 200 == 0:
-                handler.poll_wifi()
-            if period > 6000:  # every 60 seconds (when sleep = 0.01)
-                handler.poll_system_info()
-                period = 0
+        with trace.phase("poll_system_info"):
+            handler.poll_system_info()
+        trace.finish(getattr(handler, "data_dir", None))
+
+        # main loop: periodic polls run by deadline, controls first
+        # LCD polling period adapts to SPI speed (24MHz→80ms, 48MHz→40ms, 56MHz→30ms)
+        scheduler = Scheduler()
+        handler.add_poll_tasks(scheduler)
+        if args.latency_report:
+            scheduler.add("latency_report", lambda: print(latency.summary(), flush=True), args.latency_report,
+                          PRIORITY_LOW)
+        if loop is not None:
+            from pistomp.aioruntime import AsyncRuntime
+
+            AsyncRuntime(handler, scheduler, loop).run()
+        else:
+            scheduler.run_forever()
 
     except KeyboardInterrupt:
         logging.info("keyboard interrupt")
     finally:
         logging.info("Exit.")
+        if args.latency_report:
+            print(latency.summary(), flush=True)
         if midiout:
             midiout.close_port()
         handler.cleanup()
         del handler
+        if loop is not None:
+            from pistomp.aioruntime import close_loop
+
+            close_loop(loop)
         logging.info("Completed cleanup")
 
 
@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+
+import numpy as np
+
+from pistomp.tuner.ringbuffer import RingBuffer
+
+DEFAULT_WINDOW = 0.02  # seconds: the indicator poll period, so the VU sees every sample between refreshes
+
+
+class AdcSampler:
+    """Scans the MCP3008 on its own thread at a fixed rate, into a ring buffer per channel.
+
+    Without it the ADC is read once per controls poll (10 ms) and indicators poll
+    (20 ms), whenever the main loop gets there. With it, AdcScanner.value() is
+    the mean of the last `window` seconds of samples and AdcScanner.block() the
+    samples themselves (the VU takes their peak), so expression pedals and clip
+    detection don't depend on how busy the main loop is, and a transient between
+    two VU refreshes still shows.
+
+    The sampler thread is the only writer and the main loop the only reader of
+    each buffer (RingBuffer is single-producer, single-consumer). Channels
+    registered after start() are picked up on the next tick. If a tick is
+    missed (the bus was held by an LCD band, or the thread wasn't scheduled)
+    it's counted in `overruns` and the schedule restarts from now rather than
+    bursting to catch up.
+
+    Each scan holds the bus for 3 bytes per channel plus chip select gaps, at
+    240 kHz about 110 us per channel, so mind the rate with many channels.
+    """
+
+    def __init__(self, adc, rate_hz, window=DEFAULT_WINDOW):
+        self.adc = adc
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.window = max(1, round(rate_hz * window))
+        self.capacity = 1 << max(6, (4 * self.window - 1).bit_length())
+        self.buffers: dict[int, RingBuffer] = {}
+        self.samples = 0
+        self.overruns = 0
+        self._sample = np.zeros(1, dtype=np.float32)
+        self._out = np.zeros(self.window, dtype=np.float32)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.adc.sampler = self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="adc-sampler", daemon=True)
+        self._thread.start()
+        logging.info("ADC sampler started: %d Hz, %d sample window" % (self.rate_hz, self.window))
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.adc.sampler = None
+
+    def sample(self):
+        """One tick: scan every channel and append each reading to its buffer."""
+        channels = self.adc.channels
+        self.adc.scan()
+        for channel in channels:
+            buffer = self.buffers.get(channel)
+            if buffer is None:
+                buffer = self.buffers[channel] = RingBuffer(self.capacity)
+            self._sample[0] = self.adc.values[channel]
+            buffer.write(self._sample)
+        self.samples += 1
+
+    def _run(self):
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception:
+                logging.exception("ADC sampler scan failed")
+                self._stop.wait(1.0)  # don't spin on a bus that keeps failing
+                next_tick = time.monotonic()
+            next_tick += self.period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                self.overruns += 1
+                next_tick = time.monotonic()
+
+    def block(self, channel):
+        """The last `window` samples (a scratch array, valid until the next call), or None until there are that many."""
+        buffer = self.buffers.get(channel)
+        if buffer is None or not buffer.read_latest(self.window, self._out):
+            return None
+        return self._out
+
+    def mean(self, channel):
+        samples = self.block(channel)
+        if samples is None:
+            return self.adc.values[channel]  # not a full window yet
+        return int(round(float(samples.mean())))
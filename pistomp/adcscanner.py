@@ -0,0 +1,157 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+import ctypes
+import fcntl
+import logging
+import threading
+
+MCP3008_CHANNELS = 8
+
+# Held for each ADC transaction and, while the sampler runs, each band of an LCD
+# update (see LcdIli9341), so a sampler scan and a display write are never
+# interleaved on the bus
+SPI_BUS_LOCK = threading.Lock()
+
+
+def mcp3008_command(channel):
+    # Start bit, single-ended mode + channel, then 8 clocks for the rest of the 10-bit result
+    return [1, (8 + channel) << 4, 0]
+
+
+def mcp3008_value(response):
+    return ((response[1] & 3) << 8) + response[2]
+
+
+class _SpiIocTransfer(ctypes.Structure):
+    # struct spi_ioc_transfer (linux/spi/spidev.h), 32 bytes
+    _fields_ = [
+        ("tx_buf", ctypes.c_uint64),
+        ("rx_buf", ctypes.c_uint64),
+        ("len", ctypes.c_uint32),
+        ("speed_hz", ctypes.c_uint32),
+        ("delay_usecs", ctypes.c_uint16),
+        ("bits_per_word", ctypes.c_uint8),
+        ("cs_change", ctypes.c_uint8),
+        ("tx_nbits", ctypes.c_uint8),
+        ("rx_nbits", ctypes.c_uint8),
+        ("word_delay_usecs", ctypes.c_uint8),
+        ("pad", ctypes.c_uint8),
+    ]
+
+
+def spi_ioc_message(n):
+    # SPI_IOC_MESSAGE(n): _IOW('k', 0, char[n * sizeof(struct spi_ioc_transfer)])
+    return (1 << 30) | ((n * ctypes.sizeof(_SpiIocTransfer)) << 16) | (ord("k") << 8)
+
+
+class SpiMessage:
+    """One conversion per channel, all in a single SPI_IOC_MESSAGE ioctl.
+
+    The MCP3008 only starts a conversion when chip select goes low, so the
+    channels can't simply be chained into one xfer2 (which holds CS for the whole
+    buffer). Each channel is its own transfer with cs_change set, so the kernel
+    toggles CS between them, and the whole scan is still one syscall.
+    """
+
+    def __init__(self, channels):
+        n = len(channels)
+        self.request = spi_ioc_message(n)
+        self.tx = (ctypes.c_uint8 * (3 * n))(*[b for ch in channels for b in mcp3008_command(ch)])
+        self.rx = (ctypes.c_uint8 * (3 * n))()
+        self.transfers = (_SpiIocTransfer * n)()
+        for i, t in enumerate(self.transfers):
+            t.tx_buf = ctypes.addressof(self.tx) + 3 * i
+            t.rx_buf = ctypes.addressof(self.rx) + 3 * i
+            t.len = 3
+            t.cs_change = 1 if i < n - 1 else 0  # the last one is released at the end of the message
+
+    def transfer(self, fd):
+        fcntl.ioctl(fd, self.request, self.transfers)
+        return [self.rx[i:i + 3] for i in range(0, len(self.rx), 3)]
+
+
+class AdcScanner:
+    """Reads every MCP3008 channel an AnalogControl uses, once per tick.
+
+    Hardware passes this in place of the spidev object to the analog controls;
+    each registers its channel (see AnalogControl). scan() (from
+    Hardware.poll_controls) reads them all in one SPI transaction and caches the
+    frame, and AnalogControl.read() returns the cached value, so the nav switch,
+    knobs, expression pedals, ADC footswitches and VU meters no longer each make
+    their own transfer. readChannel() still does a direct conversion, for reads
+    outside the poll loop (initial sync, hardware self-test).
+
+    With an AdcSampler attached, scan() runs on the sampler's thread instead, and
+    value() and block() come from its ring buffers.
+    """
+
+    def __init__(self, spi, lock=SPI_BUS_LOCK):
+        self.spi = spi
+        self.lock = lock
+        self.channels: list[int] = []
+        self.values = [0] * MCP3008_CHANNELS
+        self.scans = 0
+        self.sampler = None
+        self._message = None
+        self._message_channels = None
+        self._single_message = hasattr(spi, "fileno")  # a spidev; test doubles fall back to xfer2
+
+    def add_channel(self, channel):
+        if channel not in self.channels:
+            # A new list rather than in place: the sampler thread may be scanning the old one
+            self.channels = sorted(self.channels + [channel])
+
+    def read_channel(self, channel):
+        """Direct (uncached) conversion."""
+        with self.lock:
+            return mcp3008_value(self.spi.xfer2(mcp3008_command(channel)))
+
+    def value(self, channel):
+        """The channel's current reading: the sampler's filtered value, else the last scan's."""
+        if self.sampler is not None:
+            return self.sampler.mean(channel)
+        return self.values[channel]
+
+    def block(self, channel):
+        """The sampler's samples since the last indicator poll, or None without a sampler."""
+        if self.sampler is not None:
+            return self.sampler.block(channel)
+        return None
+
+    def scan(self):
+        channels = self.channels
+        if not channels:
+            return
+        with self.lock:
+            responses = self._transfer_message(channels) if self._single_message else None
+            if responses is None:
+                responses = [self.spi.xfer2(mcp3008_command(ch)) for ch in channels]
+        for channel, response in zip(channels, responses):
+            self.values[channel] = mcp3008_value(response)
+        self.scans += 1
+
+    def _transfer_message(self, channels):
+        try:
+            if self._message_channels is not channels:
+                self._message = SpiMessage(channels)
+                self._message_channels = channels
+            return self._message.transfer(self.spi.fileno())
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning("ADC single-message scan failed (%s), reading channels separately" % e)
+            self._single_message = False
+            return None
@@ -0,0 +1,102 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Asyncio runtime (modalapistomp.py --asyncio).
+
+The default runtime has a synchronous main loop (Scheduler.run_forever) plus a
+WebSocketWorker thread with its own event loop. They talk through queues: each
+send wakes the worker across threads (call_soon_threadsafe), and an inbound
+message waits for the next 10 ms ws_messages poll.
+
+Here one asyncio loop runs all of it. The handler's poll tasks (controls, LCD,
+file monitors, wifi, ...) keep their Scheduler, with its priorities, deadlines
+and stats, driven by Scheduler.run_async(). The WebSocket worker is a task on the
+same loop (websocket_bridge.use_event_loop), woken directly by a send. Each inbound
+message schedules the handler's ws drain on the loop, so it's handled as soon
+as the loop is free rather than at the next tick.
+
+The Handler API is unchanged. Threads that aren't ours stay: gpiozero edge
+callbacks (edges are timestamped there and picked up by the controls poll), and
+wifi's CommandQueue and status monitor, which block on nmcli.
+
+    loop = asyncio.new_event_loop()
+    websocket_bridge.use_event_loop(loop)   # before the handler creates its bridge
+    handler = ...
+    AsyncRuntime(handler, scheduler, loop).run()
+    handler.cleanup()
+    close_loop(loop)
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from modalapi import websocket_bridge
+from pistomp.scheduler import Scheduler
+
+
+class AsyncRuntime:
+
+    def __init__(self, handler: Any, scheduler: Scheduler, loop: asyncio.AbstractEventLoop):
+        self.handler = handler
+        self.scheduler = scheduler
+        self.loop = loop
+        self._drain_pending = False
+        self.ws_drains = 0  # inbound drains run on arrival (not counting the ws_messages poll)
+
+    def _on_ws_receive(self) -> None:
+        # One drain per burst: messages arriving before it runs are picked up by it
+        if not self._drain_pending:
+            self._drain_pending = True
+            self.loop.call_soon(self._drain_ws)
+
+    def _drain_ws(self) -> None:
+        self._drain_pending = False
+        self.ws_drains += 1
+        try:
+            self.handler.poll_ws_messages()
+        except Exception:
+            logging.exception("WebSocket drain failed")
+
+    async def main(self) -> None:
+        bridge = getattr(self.handler, "ws_bridge", None)
+        if bridge is not None:
+            bridge.set_on_receive(self._on_ws_receive)
+        try:
+            await self.scheduler.run_async()
+        finally:
+            if bridge is not None:
+                bridge.set_on_receive(None)
+
+    def run(self) -> None:
+        """Run until scheduler.stop() (or KeyboardInterrupt)."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.main())
+
+
+def close_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """After the handler's cleanup: cancel whatever is left on the loop and close it."""
+    websocket_bridge.use_event_loop(None)
+    if loop.is_closed():
+        return
+    pending = [t for t in asyncio.all_tasks(loop) if not t.done()]
+    for task in pending:
+        task.cancel()
+    if pending:
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.close()
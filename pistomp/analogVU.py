@@ -25,6 +25,8 @@ from enum import Enum
 SAMPLE_PERIOD_MS = 10
 AVERAGE_PERIOD_SAMPLES = 4
 AVERAGE_PERIOD_OFF = 50
+PEAK_HOLD_REFRESHES = 10    # a peak is held this many refreshes (200 ms at the indicator poll) ...
+PEAK_DECAY = 0.7            # ... then its excursion above baseline decays by this factor per refresh
 
 class VuState(Enum):
     OFF = 0
@@ -42,12 +44,20 @@ class AnalogVU(AnalogControl.AnalogControl):
 
         # The idea here is to have two sampling windows, one for the "on" states (SIG, WARN, CLIP)
         # one for the "off" state.  To avoid a flickery display, the off should have a longer period (some delay)
-        # where "on" states should be immediate since they are likely transient and won't last long
+        # where "on" states should be immediate since they are likely transient and won't last long.
+        # Each refresh adds one level, the peak of its block of samples, and the sums are kept running.
         self.samples = deque([0]*AVERAGE_PERIOD_SAMPLES, maxlen=AVERAGE_PERIOD_SAMPLES)  # Use a deque with a maximum length
         self.off = deque([0]*AVERAGE_PERIOD_OFF, maxlen=AVERAGE_PERIOD_OFF)  # Use a deque with a maximum length
+        self.samples_sum = 0
+        self.off_sum = 0
+
+        # Peak hold: the highest level seen, held then decayed, so a transient shorter than a refresh still shows
+        self.peak = 0
+        self.peak_age = 0
 
         self.last_avg = 0
         self.state = VuState.OFF
+        self.led_writes = 0
         self.color_map = {VuState.OFF: None, VuState.SIG: "forestgreen", VuState.WARN: "orange", VuState.CLIP: "red"}
 
         self.units_per_volt = 512 / 1.665   # ADC units/2 / supplyVoltage/2
@@ -89,42 +99,58 @@ class AnalogVU(AnalogControl.AnalogControl):
                       (adc_baseline, self.thresh_sig, thresh_sig_db, self.thresh_warn, thresh_warn_db,
                        self.thresh_clip, thresh_clip_db))
 
-    def calculate_average_amplitude(self, samples):
-        if len(samples) == 0:
-            return 0.0
-        return sum(samples) / len(samples)  # TODO keep running sum instead of this O(n)
-
     def change_color(self, state):
-        if self.state is VuState.OFF:
+        self.led_writes += 1
+        if state is VuState.OFF:
             self.pixel.set_enable(False)
         else:
             self.pixel.set_color(self.color_map[state])
             self.pixel.set_enable(True)
 
+    def read_level(self):
+        """Peak of this refresh's samples, folded about the baseline: the sampler's block if it runs, else one reading."""
+        if self.adc is not None:
+            block = self.adc.block(self.adc_channel)
+            if block is not None:
+                return int(abs(block - self.adc_baseline).max()) + self.adc_baseline
+        return abs(self.adc_baseline - self.read()) + self.adc_baseline
+
+    def add_level(self, level):
+        # Running sums: add the new level, drop the one falling out of each window
+        self.samples_sum += level - self.samples[0]
+        self.samples.append(level)
+        self.off_sum += level - self.off[0]
+        self.off.append(level)
+
+        if level >= self.peak:
+            self.peak = level
+            self.peak_age = 0
+        elif self.peak_age < PEAK_HOLD_REFRESHES:
+            self.peak_age += 1
+        else:
+            self.peak = max(level, self.adc_baseline + int((self.peak - self.adc_baseline) * PEAK_DECAY))
+
     def refresh(self):
-        # read the analog pin
-        value = self.readChannel()
+        self.add_level(self.read_level())
 
-        value = abs(self.adc_baseline - value) + self.adc_baseline
-        self.samples.append(value)
-        self.off.append(value)
+        average_amplitude = self.samples_sum / AVERAGE_PERIOD_SAMPLES
+        average_off = self.off_sum / AVERAGE_PERIOD_OFF
 
-        average_amplitude = self.calculate_average_amplitude(self.samples)
-        average_off = self.calculate_average_amplitude(self.off)
+        # Clip condition, from the held peak so that a single clipped block lights it for the hold time
+        state = self.state
+        if self.peak >= self.thresh_clip:
+            state = VuState.CLIP
 
         # Off condition (more samples/lag than On)
-        state = self.state
-        if 500 < average_off < self.thresh_sig:
+        elif 500 < average_off < self.thresh_sig:
             state = VuState.OFF
 
         # On condition
-        elif average_amplitude != self.last_avg:
-            if self.thresh_sig <= average_amplitude < self.thresh_warn:  # was 523, 540, 560
-                state = VuState.SIG
-            elif self.thresh_warn <= average_amplitude < self.thresh_clip:
+        elif average_amplitude != self.last_avg or self.state is VuState.CLIP:
+            if average_amplitude >= self.thresh_warn:
                 state = VuState.WARN
-            elif average_amplitude >= self.thresh_clip:
-                state = VuState.CLIP
+            elif average_amplitude >= self.thresh_sig or self.state is VuState.CLIP:  # was 523, 540, 560
+                state = VuState.SIG
 
             self.last_avg = average_amplitude
 
@@ -17,6 +17,8 @@
 
 import logging
 
+from pistomp.adcscanner import AdcScanner, mcp3008_command, mcp3008_value
+
 
 class AnalogControl:
 
@@ -28,10 +30,23 @@ class AnalogControl:
         self.tolerance = tolerance  # to keep from being jittery we'll only change the
                                     # value when the control has moved a significant amount
 
+        # Hardware's scanner reads every control's channel in one transaction per tick
+        self.adc = spi if isinstance(spi, AdcScanner) else None
+        if self.adc is not None:
+            self.adc.add_channel(adc_channel)
+
     def readChannel(self):
-        adc = self.spi.xfer2([1, (8 + self.adc_channel) << 4, 0])
-        data = ((adc[1] & 3) << 8) + adc[2]
-        return data
+        # Direct conversion, outside the per-tick scan
+        if self.adc is not None:
+            return self.adc.read_channel(self.adc_channel)
+        return mcp3008_value(self.spi.xfer2(mcp3008_command(self.adc_channel)))
+
+    def read(self):
+        """This tick's reading: from the scanner (its frame, or the sampler's filtered value),
+        or a direct conversion without one."""
+        if self.adc is not None:
+            return self.adc.value(self.adc_channel)
+        return self.readChannel()
 
     def refresh(self):
         """Read current value from hardware and potentially take action."""
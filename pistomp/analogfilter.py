@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Filters for AnalogMidiControl, configured per control in default_config.yml:
+
+    analog_controllers:
+      - adc_input: 7
+        midi_CC: 77
+        filter:
+          median: 5         # median of the last 5 readings (drops single-reading spikes)
+          ema: 0.3          # exponential moving average, weight of the newest reading (0-1]
+          hysteresis: 0.5   # MIDI steps the position must pass the current value's step by
+
+median and ema work on the 10-bit ADC reading (median first), hysteresis on the
+7-bit value sent, so a pedal resting on a step boundary doesn't flap between two
+CC values.
+"""
+
+import logging
+from collections import deque
+
+import common.token as Token
+import common.util as util
+
+
+class MedianFilter:
+
+    def __init__(self, size: int):
+        self.readings: deque[int] = deque(maxlen=size)
+
+    def reset(self, value: int) -> None:
+        self.readings.clear()
+        self.readings.append(value)
+
+    def process(self, value: int) -> int:
+        self.readings.append(value)
+        return sorted(self.readings)[len(self.readings) // 2]
+
+
+class EmaFilter:
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self.average: float | None = None
+
+    def reset(self, value: int) -> None:
+        self.average = float(value)
+
+    def process(self, value: int) -> int:
+        if self.average is None:
+            self.average = float(value)
+        else:
+            self.average += self.alpha * (value - self.average)
+        return round(self.average)
+
+
+class Hysteresis:
+    """10-bit reading to 7-bit value, moving only once the reading is `width` steps past the current value's step.
+
+    Full scale either way always goes straight to 0 or 127.
+    """
+
+    def __init__(self, width: float):
+        self.width = width
+        self.value: int | None = None
+
+    def reset(self, value: int) -> None:
+        self.value = None
+
+    def process(self, adc_value: int) -> int:
+        position = adc_value * 127 / 1023
+        if self.value is None or adc_value in (0, 1023) or abs(position - self.value) > 0.5 + self.width:
+            self.value = round(position)
+        return self.value
+
+
+def create_filters(cfg: dict | None) -> tuple[list, Hysteresis | None]:
+    """The ADC stage (in order) and the output hysteresis for a control's `filter` config."""
+    filters: list = []
+    hysteresis = None
+    if not cfg:
+        return filters, hysteresis
+    median = util.DICT_GET(cfg, Token.MEDIAN)
+    if median is not None:
+        if isinstance(median, int) and median > 1:
+            filters.append(MedianFilter(median))
+        else:
+            logging.error("Config file error.  Analog control filter %s must be an integer > 1" % Token.MEDIAN)
+    ema = util.DICT_GET(cfg, Token.EMA)
+    if ema is not None:
+        if isinstance(ema, (int, float)) and 0 < ema <= 1:
+            filters.append(EmaFilter(ema))
+        else:
+            logging.error("Config file error.  Analog control filter %s must be in (0, 1]" % Token.EMA)
+    width = util.DICT_GET(cfg, Token.HYSTERESIS)
+    if width is not None:
+        if isinstance(width, (int, float)) and width >= 0:
+            hysteresis = Hysteresis(width)
+        else:
+            logging.error("Config file error.  Analog control filter %s must be >= 0" % Token.HYSTERESIS)
+    return filters, hysteresis
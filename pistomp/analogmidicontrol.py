@@ -20,8 +20,10 @@ from typing import Any
 
 from rtmidi.midiconstants import CONTROL_CHANGE
 
+import common.token as Token
 import common.util as util
 import pistomp.analogcontrol as analogcontrol
+from pistomp.analogfilter import create_filters
 
 import logging
 
@@ -60,6 +62,12 @@ class AnalogMidiControl(analogcontrol.AnalogControl):
         self.cfg: dict[str, Any] = cfg
         self.value_change_callback = value_change_callback
 
+        # Optional filter stage (see pistomp.analogfilter), and what it saved
+        self.filters, self.hysteresis = create_filters(util.DICT_GET(cfg, Token.FILTER))
+        self.last_sent: int | None = None
+        self.sent = 0
+        self.suppressed = 0  # readings past tolerance that came out as the CC value already sent
+
     def set_midi_channel(self, midi_channel):
         self.midi_channel = midi_channel
 
@@ -77,15 +85,26 @@ class AnalogMidiControl(analogcontrol.AnalogControl):
 
         # read the analog pin
         value = self._clamp_endpoints(self.readChannel())
-        set_volume = as_midi_value(value)
+        for f in self.filters:
+            f.reset(value)
+        if self.hysteresis is not None:
+            self.hysteresis.reset(value)
+        set_volume = self._midi_value(value)
 
         cc = [self.midi_channel | CONTROL_CHANGE, self.midi_CC, set_volume]
         logging.debug("AnalogControl force-sending CC event %s" % cc)
         self.midiout.send_message(cc)
+        self.last_sent = set_volume
+        self.sent += 1
 
         # save the reading to prevent duplicate sends on next poll
         self.last_read = value
 
+    def _midi_value(self, value: int) -> int:
+        if self.hysteresis is not None:
+            return self.hysteresis.process(value)
+        return as_midi_value(value)
+
     def _clamp_endpoints(self, value: int) -> int:
         """Clamp ADC values within tolerance of endpoints to exact endpoints.
 
@@ -101,20 +120,27 @@ class AnalogMidiControl(analogcontrol.AnalogControl):
     @override
     def refresh(self):
         # read the analog pin
-        value = self._clamp_endpoints(self.readChannel())
+        value = self.read()
+        for f in self.filters:
+            value = f.process(value)
+        value = self._clamp_endpoints(value)
 
         # how much has it changed since the last read?
         pot_adjust = abs(value - self.last_read)
         value_changed = pot_adjust > self.tolerance
 
         if value_changed:
-            set_volume = as_midi_value(value)
+            set_volume = self._midi_value(value)
+            self.last_read = value
+            if set_volume == self.last_sent:
+                self.suppressed += 1
+                return
 
             cc = [self.midi_channel | CONTROL_CHANGE, self.midi_CC, set_volume]
             logging.debug("AnalogControl Sending CC event %s" % cc)
             self.midiout.send_message(cc)
-
-            self.last_read = value
+            self.last_sent = set_volume
+            self.sent += 1
 
             if self.value_change_callback:
                 self.value_change_callback(value, self)
@@ -19,6 +19,7 @@ from typing_extensions import override
 
 import time
 import pistomp.analogcontrol as analogcontrol
+import pistomp.latency as latency
 import pistomp.switchstate as switchstate
 from pistomp.taptempo import TapTempo
 
@@ -39,7 +40,7 @@ class AnalogSwitch(analogcontrol.AnalogControl):
     @override
     def refresh(self):
         # read the analog channel
-        new_value = self.readChannel()
+        new_value = self.read()
 
         if new_value <= FALLING_THRESHOLD:
             # switch pressed
@@ -53,12 +54,14 @@ class AnalogSwitch(analogcontrol.AnalogControl):
                 self.duration = time.monotonic() - self.start_time
                 if self.duration >= LONG_PRESS_TIME:
                     self.state = switchstate.Value.LONGPRESSED
-                    self.callback(switchstate.Value.LONGPRESSED)
+                    with latency.tracing(self.start_time):
+                        self.callback(switchstate.Value.LONGPRESSED)
         elif new_value > FALLING_THRESHOLD:
             # switch released
             if self.state is switchstate.Value.PRESSED:
                 self.state = switchstate.Value.RELEASED
-                self.callback(switchstate.Value.RELEASED)
+                with latency.tracing(self.start_time):
+                    self.callback(switchstate.Value.RELEASED)
             elif self.state is switchstate.Value.LONGPRESSED:
                 self.state = switchstate.Value.RELEASED
 
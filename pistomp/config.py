@@ -15,17 +15,18 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
+import json
 import logging
 import os
 from typing import Any
 
 import yaml
-from jsonschema import validate
-from jsonschema import exceptions
 
 data_dir = '/home/pistomp/data/config'
 
 DEFAULT_CONFIG_FILE = "default_config.yml"
+VALIDATED_STAMP_FILE = ".default_config.validated"
 
 schema = {
   "$schema": "http://json-schema.org/draft-04/schema#",
@@ -136,6 +137,25 @@ schema = {
               },
               "autosync": {
                 "type": "boolean"
+              },
+              "filter": {
+                "type": "object",
+                "properties": {
+                  "median": {
+                    "type": "integer",
+                    "minimum": 2
+                  },
+                  "ema": {
+                    "type": "number",
+                    "minimum": 0,
+                    "exclusiveMinimum": True,
+                    "maximum": 1
+                  },
+                  "hysteresis": {
+                    "type": "number",
+                    "minimum": 0
+                  }
+                }
               }
             },
             "required": [
@@ -167,6 +187,30 @@ schema = {
               "id"
             ]
           }
+        },
+        "encoder_acceleration": {
+          "type": "object",
+          "properties": {
+            "min_speed": {
+              "type": "number",
+              "minimum": 0,
+              "exclusiveMinimum": True
+            },
+            "max_speed": {
+              "type": "number",
+              "minimum": 0,
+              "exclusiveMinimum": True
+            },
+            "max_multiplier": {
+              "type": "integer",
+              "minimum": 1
+            },
+            "curve": {
+              "type": "number",
+              "minimum": 0,
+              "exclusiveMinimum": True
+            }
+          }
         }
       },
       "required": [
@@ -180,16 +224,30 @@ schema = {
   ]
 }
 
-def load_cfg_from_file(path):
-    """Load and validate a config from an explicit file path."""
-    with open(path, 'r') as ymlfile:
-        cfg = yaml.load(ymlfile, Loader=yaml.SafeLoader)
+def _validate(cfg, path) -> bool:
+    # Error message if problem found but it won't be fatal
+    from jsonschema import validate, exceptions  # slow to import, and only needed here
     try:
         validate(instance=cfg, schema=schema)
     except exceptions.SchemaError as e:
-        logging.error("Badly formatted schema in: %s %s" % (os.path.basename(path), e.message))
+        logging.error("Badly formatted schema in: %s %s" % (os.path.basename(__file__), e.message))
+        return False
     except exceptions.ValidationError as e:
         logging.error("Config file error in: %s\n%s\n%s" % (path, e.schema_path, e.message))
+        return False
+    return True
+
+def _validated_stamp(path) -> str:
+    # Identifies this version of the file checked against this version of the schema
+    st = os.stat(path)
+    digest = hashlib.sha1(json.dumps(schema, sort_keys=True).encode()).hexdigest()
+    return "%d %d %s" % (st.st_mtime_ns, st.st_size, digest)
+
+def load_cfg_from_file(path):
+    """Load and validate a config from an explicit file path."""
+    with open(path, 'r') as ymlfile:
+        cfg = yaml.load(ymlfile, Loader=yaml.SafeLoader)
+    _validate(cfg, path)
     return cfg
 
 def load_default_cfg() -> dict[str, Any]:
@@ -198,14 +256,20 @@ def load_default_cfg() -> dict[str, Any]:
     with open(default_config_file, 'r') as ymlfile:
         cfg = yaml.load(ymlfile, Loader=yaml.SafeLoader)
 
-        # Now validate.  Error message if problem found but it won't be fatal
+    # Validation is skipped if this exact file already passed, which saves importing jsonschema
+    # on most boots. A file that failed is checked (and its errors logged) every time
+    stamp_file = os.path.join(data_dir, VALIDATED_STAMP_FILE)
+    stamp = _validated_stamp(default_config_file)
+    try:
+        with open(stamp_file) as f:
+            if f.read() == stamp:
+                return cfg
+    except OSError:
+        pass
+    if _validate(cfg, default_config_file):
         try:
-            validate(instance=cfg, schema=schema)
-        except exceptions.SchemaError as e:
-            msg = ("Badly formatted schema in: %s %s" % (os.path.basename(__file__), e.message))
-            logging.error(msg)
-        except exceptions.ValidationError as e:
-            msg = ("Config file error in: %s\n%s\n%s" % (default_config_file, e.schema_path, e.message))
-            logging.error(msg)
-
-        return cfg
+            with open(stamp_file, 'w') as f:
+                f.write(stamp)
+        except OSError as e:
+            logging.debug("Could not write %s: %s" % (stamp_file, e))
+    return cfg
@@ -16,10 +16,56 @@
 # along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
 
 import threading
+import time
+from collections import deque
 
 from functools import partial
 
+import common.token as Token
+import common.util as Util
+
+
+class Acceleration:
+    """Steps per detent as a function of rotation speed (detents per second).
+
+    Up to min_speed a detent is one step. Above it the multiplier rises along
+    ((speed - min_speed) / (max_speed - min_speed)) ** curve, reaching
+    max_multiplier at max_speed. Configured by hardware: encoder_acceleration in
+    default_config.yml; max_multiplier: 1 turns it off.
+    """
+
+    def __init__(self, min_speed=4.0, max_speed=20.0, max_multiplier=8, curve=2.0):
+        self.min_speed = min_speed
+        self.max_speed = max(max_speed, min_speed + 1)
+        self.max_multiplier = max(1, max_multiplier)
+        self.curve = curve
+
+    @classmethod
+    def from_config(cls, cfg):
+        a = cls()
+        if cfg:
+            for key in (Token.MIN_SPEED, Token.MAX_SPEED, Token.MAX_MULTIPLIER, Token.CURVE):
+                value = Util.DICT_GET(cfg, key)
+                if value is not None:
+                    setattr(a, key, value)
+            a.max_speed = max(a.max_speed, a.min_speed + 1)
+        return a
+
+    def multiplier(self, speed):
+        if speed <= self.min_speed or self.max_multiplier <= 1:
+            return 1
+        x = min(1.0, (speed - self.min_speed) / (self.max_speed - self.min_speed))
+        return max(1, round(1 + (self.max_multiplier - 1) * x ** self.curve))
+
+
 class Encoder:
+    # Shared by every encoder, set from the hardware config (see Hardware)
+    acceleration = Acceleration()
+    SPEED_WINDOW = 4  # detents the rotation speed is measured over
+
+    @classmethod
+    def set_acceleration(cls, cfg):
+        cls.acceleration = Acceleration.from_config(cfg)
 
     def _process_gpios(self):
         # This decode/debouce algorithm adapted from
@@ -47,10 +93,26 @@ class Encoder:
         return direction
 
     def _gpio_callback(self, channel):
+        self._edge(time.monotonic())
+
+    def _edge(self, now):
+        """Decode the pins after an edge at `now`; a completed detent adds its (accelerated) steps."""
         d = self._process_gpios()
         if d != 0:
             with self._lock:
-                self.direction += d
+                self.direction += self._accelerate(d, now)
+
+    def _accelerate(self, d, now):
+        # Speed over the last few detents turning the same way. A reversal, or a gap
+        # longer than a detent at min_speed, starts a new measurement.
+        times = self.detent_times
+        if times and (d != self.last_detent or now - times[-1] > 1.0 / self.acceleration.min_speed):
+            times.clear()
+        times.append(now)
+        self.last_detent = d
+        elapsed = times[-1] - times[0]
+        self.speed = (len(times) - 1) / elapsed if elapsed > 0 else 0.0
+        return d * self.acceleration.multiplier(self.speed)
 
     def __init__(self, d_pin, clk_pin, callback, type=None, id=None, **kw):
         self.d_pin = d_pin
@@ -75,7 +137,12 @@ class Encoder:
 
         self.prevNextCode = 0
         self.store = 0
-        self.direction = 0
+        self.direction = 0  # steps since the last read_rotary, acceleration applied
+
+        # Detent timestamps, for the rotation speed
+        self.detent_times: deque[float] = deque(maxlen=self.SPEED_WINDOW)
+        self.last_detent = 0
+        self.speed = 0.0
 
         # 16 possible grey codes.  1=Valid, 0=Invalid (bounce)
         self.rot_enc_table = [0, 1, 1, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0, 1, 1, 0]
@@ -98,7 +165,9 @@ class Encoder:
         with self._lock:
             d = self.direction
             self.direction = 0
-        if d == 0:
-            d = self._process_gpios()
+            if d == 0:
+                d = self._process_gpios()
+                if d != 0:
+                    d = self._accelerate(d, time.monotonic())
         if d != 0 and self.callback is not None:
             self.callback(d)
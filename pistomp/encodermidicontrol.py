@@ -40,7 +40,7 @@ class EncoderMidiControl(encoder.Encoder, controller.Controller):
         self.value = 0       # the user view of the value
         self.cfg: dict[str, Any] = {}
         self.midi_value = 0  # the midi equivalent value
-        self.per_click = 8   # resolution (midi values per click)
+        self.per_click = 8   # resolution (midi values per step; a fast turn is several steps per click)
 
         # Blend mode integration: callback override
         self.value_change_callback = None
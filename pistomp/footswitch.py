@@ -25,6 +25,7 @@ import common.token as Token
 import pistomp.controller as controller
 import pistomp.analogswitch as analogswitch
 import pistomp.gpioswitch as gpioswitch
+import pistomp.latency as latency
 import pistomp.switchstate as switchstate
 import common.util as util
 
@@ -215,6 +216,7 @@ class Footswitch(controller.Controller):
 
     def pressed(self, state):
         """Handle a footswitch press: route to relay, preset, or MIDI CC as configured."""
+        latency.mark("pressed")
         new_toggled = not self.toggled
 
         # First handle Longpress Events
@@ -231,6 +233,7 @@ class Footswitch(controller.Controller):
                         r.disable()
                 self.set_led(self.toggled)
                 self.refresh_callback(True)  # True means this is a bypass change only
+                latency.mark("lcd")
             else:
                 # TODO consider case where relay and longpress are specified
                 self._log_longpress_events()
@@ -257,11 +260,13 @@ class Footswitch(controller.Controller):
             cc = [self.midi_channel | CONTROL_CHANGE, self.midi_CC, 127 if self.toggled else 0]
             logging.debug("Sending CC event: %d" % self.midi_CC)
             self.midiout.send_message(cc)
+            latency.mark("midi")
             if self.drives_display:
                 self.set_led(self.toggled)
 
         if self.drives_display:
             self.refresh_callback(footswitch=self)
+            latency.mark("lcd")
 
     def set_display_label(self, label):
         self.display_label = label
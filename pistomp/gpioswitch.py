@@ -18,6 +18,7 @@
 import logging
 
 import pistomp.controller as controller
+import pistomp.latency as latency
 import pistomp.switchstate as switchstate
 import pistomp.taptempo as taptempo
 
@@ -26,7 +27,8 @@ import queue
 
 class GpioSwitch(controller.Controller):
 
-    def __init__(self, gpio_input, midi_channel, midi_CC, callback, longpress_callback=None, taptempo=None):
+    def __init__(self, gpio_input, midi_channel, midi_CC, callback, longpress_callback=None, taptempo=None,
+                 button=None):
         super(GpioSwitch, self).__init__(midi_channel, midi_CC)
         self.gpio_input = gpio_input
         self.cur_tstamp = None
@@ -41,8 +43,10 @@ class GpioSwitch(controller.Controller):
         # TODO with the move to gpiozero.button, we could take advantage of its methods for detecting release,
         # hold, etc. (when_released, when_held).  But experiments with those async events caused issues with
         # the LCD refresh timing.  So for now, we'll just poll like we did before when using RPi.GPIO
-        from gpiozero import Button
-        self.button = Button(gpio_input, bounce_time=0.008)
+        if button is None:
+            from gpiozero import Button
+            button = Button(gpio_input, bounce_time=0.008)
+        self.button = button
         self.button.when_pressed = self._gpio_down
 
     def __del__(self):
@@ -89,11 +93,13 @@ class GpioSwitch(controller.Controller):
             state = switchstate.Value.RELEASED
         else:
             return
+        edge = self.cur_tstamp
         self.cur_tstamp = None
 
-        if state == switchstate.Value.LONGPRESSED and self.longpress_callback is not None:
-            logging.debug("GPIO Switch %d %s %s" % (self.gpio_input, state, self.longpress_callback))
-            self.longpress_callback(state)
-        else:
-            logging.debug("GPIO Switch %d %s %s" % (self.gpio_input, state, self.callback))
-            self.callback(state)
\ No newline at end of file
+        with latency.tracing(edge):
+            if state == switchstate.Value.LONGPRESSED and self.longpress_callback is not None:
+                logging.debug("GPIO Switch %d %s %s" % (self.gpio_input, state, self.longpress_callback))
+                self.longpress_callback(state)
+            else:
+                logging.debug("GPIO Switch %d %s %s" % (self.gpio_input, state, self.callback))
+                self.callback(state)
\ No newline at end of file
@@ -18,16 +18,45 @@
 
 from __future__ import annotations
 
-from typing import Any
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
 import common.token as Token
+from modalapi.ws_protocol import WebSocketMessage, coalesce_messages, parse_message
 from pistomp.analogmidicontrol import AnalogMidiControl
 from pistomp.encodermidicontrol import EncoderMidiControl
 from pistomp.footswitch import Footswitch
-from pistomp.tuner.source import TunerSourceFactory
+from pistomp.scheduler import PRIORITY_CONTROLS, PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, Scheduler, Task
+
+if TYPE_CHECKING:
+    from pistomp.tuner.source import TunerSourceFactory
+
+
+@dataclass
+class WsRedraws:
+    """LCD regions changed by a batch of inbound WebSocket messages, drawn once each
+    after the whole batch is applied."""
+    plugins: dict[str, Any] = field(default_factory=dict)  # instance_id -> Plugin whose bypass changed
+    title: bool = False  # snapshot changed
+    tempo: bool = False  # tap tempo footswitch
 
 
 class Handler:
+    # Main loop poll periods, seconds
+    CONTROLS_POLL_PERIOD = 0.01
+    WS_POLL_PERIOD = 0.01
+    INDICATORS_POLL_PERIOD = 0.02
+    REST_POLL_PERIOD = 0.02
+    MODUI_POLL_PERIOD = 1.0
+    WIFI_POLL_PERIOD = 2.0
+    SYSTEM_INFO_POLL_PERIOD = 60.0
+    LOOP_STATS_LOG_PERIOD = 60.0
+
+    # Set by add_poll_tasks (subclasses don't call Handler.__init__)
+    poll_scheduler: Scheduler | None = None
+    _lcd_task: Task | None = None
+
     def __init__(self):
         self.homedir = None
         self.lcd = None
@@ -35,11 +64,39 @@ class Handler:
         self.current: Any = None
 
     @property
-    def lcd_poll_divisor(self) -> int:
-        # Gate for poll_lcd_updates, in units of 10 ms main-loop ticks
-        # (20 → one flush every 200 ms). Subclasses may override to narrow
-        # it dynamically (e.g. when the tuner panel is visible).
-        return 20
+    def lcd_poll_period(self) -> float:
+        # Seconds between poll_lcd_updates (one flush every 200 ms). Subclasses may
+        # override to narrow it dynamically (e.g. when the tuner panel is visible),
+        # calling lcd_poll_period_changed() when it changes.
+        return 0.2
+
+    def add_poll_tasks(self, scheduler: Scheduler) -> None:
+        """Register the main loop's periodic polls. Controls always run first."""
+        self.poll_scheduler = scheduler
+        scheduler.add("controls", self.poll_controls, self.CONTROLS_POLL_PERIOD, PRIORITY_CONTROLS)
+        # drain inbound WS every tick for instant bypass/snapshot indicators
+        scheduler.add("ws_messages", self.poll_ws_messages, self.WS_POLL_PERIOD, PRIORITY_HIGH)
+        scheduler.add("indicators", self.poll_indicators, self.INDICATORS_POLL_PERIOD, PRIORITY_HIGH)
+        scheduler.add("rest_results", self.poll_rest_results, self.REST_POLL_PERIOD, PRIORITY_HIGH)
+        self._lcd_task = scheduler.add("lcd", self.poll_lcd_updates, self.lcd_poll_period, PRIORITY_NORMAL)
+        scheduler.add("modui_changes", self.poll_modui_changes, self.MODUI_POLL_PERIOD, PRIORITY_LOW)
+        scheduler.add("wifi", self.poll_wifi, self.WIFI_POLL_PERIOD, PRIORITY_LOW)
+        scheduler.add("system_info", self.poll_system_info, self.SYSTEM_INFO_POLL_PERIOD, PRIORITY_LOW)
+        scheduler.add("loop_stats", self.log_loop_stats, self.LOOP_STATS_LOG_PERIOD, PRIORITY_LOW)
+
+    def get_loop_stats(self) -> dict[str, dict[str, float]]:
+        """Per poll task: period, p50/p95/p99/max duration (ms), runs, overruns and skipped periods."""
+        if self.poll_scheduler is None:
+            return {}
+        return self.poll_scheduler.stats()
+
+    def log_loop_stats(self) -> None:
+        if self.poll_scheduler is not None and logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(self.poll_scheduler.summary())
+
+    def lcd_poll_period_changed(self) -> None:
+        if self.poll_scheduler is not None and self._lcd_task is not None:
+            self.poll_scheduler.set_period(self._lcd_task, self.lcd_poll_period)
 
     def noop(self):
         pass
@@ -63,6 +120,10 @@ class Handler:
         # no-op for handlers without a WS
         pass
 
+    def poll_rest_results(self):
+        # no-op for handlers that make their REST calls synchronously
+        pass
+
     def preset_incr_and_change(self):
         raise NotImplementedError()
 
@@ -114,9 +175,48 @@ class Handler:
     def poll_wifi(self):
         raise NotImplementedError()
 
+    def poll_system_info(self):
+        raise NotImplementedError()
+
     def set_tuner_source_factory(self, factory: "TunerSourceFactory") -> None:
         pass
 
+    #
+    # Inbound WebSocket (shared by v1/v3 handlers)
+    #
+    def _drain_ws_messages(self) -> None:
+        # One batch per tick: a snapshot load flips many bypasses (and a sweep sends
+        # the same port repeatedly), so apply the net state change first and draw each
+        # changed region once rather than once per message.
+        messages = []
+        for raw in self.ws_bridge.get_received_messages():
+            try:
+                messages.append(parse_message(raw))
+            except Exception as e:
+                logging.error(f"Error parsing WebSocket message '{raw}': {e}")
+        if messages:
+            self._apply_ws_batch(coalesce_messages(messages))
+
+    def _apply_ws_batch(self, messages: list[WebSocketMessage]) -> None:
+        redraws = WsRedraws()
+        for msg in messages:
+            try:
+                self._apply_ws_message(msg, redraws)
+            except Exception as e:
+                logging.error(f"Error handling WebSocket message {msg}: {e}")
+        self._draw_ws_redraws(redraws)
+
+    def _handle_ws_message(self, msg: WebSocketMessage) -> None:
+        """Apply and draw a single inbound message (a batch of one)."""
+        self._apply_ws_batch([msg])
+
+    def _apply_ws_message(self, msg: WebSocketMessage, redraws: WsRedraws) -> None:
+        """Update state for one message, recording (not drawing) what needs redrawing."""
+        raise NotImplementedError()
+
+    def _draw_ws_redraws(self, redraws: WsRedraws) -> None:
+        raise NotImplementedError()
+
     #
     # MIDI binding (shared by v1/v3 handlers)
     #
@@ -126,11 +226,9 @@ class Handler:
         # a pedalboard reload. Idempotent: replayed connect-dump maps are no-ops.
         if self.current is None:
             return
-        plugin = next((p for p in self.current.pedalboard.plugins if p is not None and p.instance_id == instance), None)
-        if plugin is None or plugin.parameters is None:
-            return
-        param = plugin.parameters.get(symbol)
-        if param is None or param.binding == binding:
+        plugin = self.current.pedalboard.get_plugin(instance)
+        param = self.current.pedalboard.get_parameter(instance, symbol)
+        if plugin is None or param is None or param.binding == binding:
             return
         controller = self.hardware.controllers.get(binding)
         if controller is None:
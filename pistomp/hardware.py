@@ -22,6 +22,7 @@ import sys
 
 import common.token as Token
 import common.util as Util
+from pistomp.adcscanner import AdcScanner
 from pistomp.analogcontrol import AnalogControl
 import pistomp.analogmidicontrol as AnalogMidiControl
 import pistomp.encoder as Encoder
@@ -44,12 +45,14 @@ class Hardware(ABC):
         self.midiout = midiout
         self.refresh_callback = refresh_callback
         self.spi = None
+        self.adc_sampler = None
         self.test_pass = False
         self.test_sentinel = None
 
         # From config file(s)
         self.default_cfg = default_config
         self.version = self.default_cfg[Token.HARDWARE][Token.VERSION]
+        Encoder.Encoder.set_acceleration(Util.DICT_GET(self.default_cfg[Token.HARDWARE], Token.ENCODER_ACCELERATION))
         self.cfg = None          # compound cfg (default with user/pedalboard specific cfg overlaid)
         self.midi_channel = 0
 
@@ -82,12 +85,43 @@ class Hardware(ABC):
 
     def init_spi(self):
         import spidev
-        self.spi = spidev.SpiDev()
-        self.spi.open(0, 1)  # Bus 0, CE1
-        self.spi.max_speed_hz = self._adc_speed()
+        spi = spidev.SpiDev()
+        spi.open(0, 1)  # Bus 0, CE1
+        spi.max_speed_hz = self._adc_speed()
+        # Analog controls are given this; each registers its channel and reads scan()'s frame
+        self.spi = AdcScanner(spi)
+        self.start_adc_sampler()
+
+    def _adc_sample_rate(self):
+        # Off unless set: scans then happen once per controls poll
+        rate = self.handler.settings.get_setting('adc.sample_rate_hz')
+        try:
+            return int(rate or 0)
+        except (TypeError, ValueError):
+            logging.warning("Invalid adc.sample_rate_hz setting: %s, ADC sampler disabled" % rate)
+            return 0
+
+    def start_adc_sampler(self):
+        rate = self._adc_sample_rate()
+        if rate <= 0:
+            return
+        from pistomp.adcsampler import AdcSampler
+        self.adc_sampler = AdcSampler(self.spi, rate)
+        self.adc_sampler.start()
+
+    def stop_adc_sampler(self):
+        if self.adc_sampler is not None:
+            self.adc_sampler.stop()
+            self.adc_sampler = None
+
+    def spi_bus_lock(self):
+        # For the LCD: only needed (and only worth banding its updates for) while the sampler runs
+        return self.spi.lock if self.adc_sampler is not None else None
 
     def poll_controls(self):
         # This is intended to be called periodically from main working loop to poll the instantiated controls
+        if self.spi is not None and self.adc_sampler is None:
+            self.spi.scan()
         for c in self.analog_controls:
             c.refresh()
         for e in self.encoders:
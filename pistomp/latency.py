@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Input-to-effect latency.
+
+A switch's press edge is timestamped where it happens (GpioSwitch._gpio_down,
+AnalogSwitch.refresh). While the switch's callback runs on the main thread,
+`with tracing(edge):` makes that timestamp the active input. Each hop on the way
+out then calls mark(hop), which records the time since the edge:
+
+    pressed    Footswitch.pressed entered (edge -> poll -> dispatch)
+    midi       CC handed to rtmidi
+    ws_queued  param_set queued on the WebSocket bridge
+    ws_sent    param_set written to the WebSocket (worker thread, via record())
+    lcd        footswitch redrawn on the LCD (the SPI transfer is synchronous)
+
+Short presses are acted on at release, so these numbers include how long the
+switch was held. Outside an input, mark() is a single None check.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from pistomp.scheduler import DurationWindow
+
+HOPS = ("pressed", "midi", "ws_queued", "ws_sent", "lcd")
+
+_lock = threading.Lock()
+_windows = {hop: DurationWindow() for hop in HOPS}
+_edge: Optional[float] = None
+
+
+@contextmanager
+def tracing(edge: Optional[float]):
+    """Attribute hops marked inside this block to the press at monotonic time edge."""
+    global _edge
+    outer, _edge = _edge, edge
+    try:
+        yield
+    finally:
+        _edge = outer
+
+
+def active() -> Optional[float]:
+    """The edge timestamp of the input being handled, if any."""
+    return _edge
+
+
+def mark(hop: str) -> None:
+    if _edge is not None:
+        record(hop, time.monotonic() - _edge)
+
+
+def record(hop: str, seconds: float) -> None:
+    with _lock:
+        _windows[hop].record(seconds)
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """Per hop: samples seen and p50/p95/p99/max (ms) over the most recent ones."""
+    out = {}
+    with _lock:
+        for hop, window in _windows.items():
+            p = window.percentiles()
+            out[hop] = {"count": window.count, "p50_ms": 1000 * p["p50"], "p95_ms": 1000 * p["p95"],
+                        "p99_ms": 1000 * p["p99"], "max_ms": 1000 * p["max"]}
+    return out
+
+
+def summary() -> str:
+    lines = ["Input latency from switch edge (ms)",
+             "  %-10s %7s %8s %8s %8s %8s" % ("hop", "count", "p50", "p95", "p99", "max")]
+    for hop, s in stats().items():
+        lines.append("  %-10s %7d %8.2f %8.2f %8.2f %8.2f" %
+                     (hop, s["count"], s["p50_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"]))
+    return "\n".join(lines)
+
+
+def reset() -> None:
+    global _windows
+    with _lock:
+        _windows = {hop: DurationWindow() for hop in HOPS}
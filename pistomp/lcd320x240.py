@@ -17,10 +17,9 @@
 
 import logging
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import common.token as Token
 import common.parameter as Parameter
-from ui.wifi_menu import WifiMenu
 import pistomp.category as Category
 import pistomp.lcd as abstract_lcd
 import pistomp.switchstate as switchstate
@@ -28,9 +27,14 @@ from PIL import Image, ImageColor
 
 from uilib import *
 from uilib.lcd_ili9341 import *
+from uilib.parameterdialog import Parameterdialog
 
 from pistomp.footswitch import Footswitch  # TODO would like to avoid this module knowing such details
-from pistomp.tuner.panel import TunerPanel
+
+if TYPE_CHECKING:
+    # The tuner (numpy) and wifi menu load on first use, not at startup
+    from pistomp.tuner.panel import TunerPanel
+    from ui.wifi_menu import WifiMenu
 
 #import traceback
 
@@ -39,7 +43,7 @@ from common.fonts import font_path
 
 class Lcd(abstract_lcd.Lcd):
 
-    def __init__(self, cwd, handler=None, flip=False, display=None, spi_speed_mhz=24):
+    def __init__(self, cwd, handler=None, flip=False, display=None, spi_speed_mhz=24, bus_lock=None):
         self.cwd = cwd
         self.imagedir = os.path.join(cwd, "images")
         Config(os.path.join(cwd, 'ui', 'config.json'))
@@ -47,12 +51,12 @@ class Lcd(abstract_lcd.Lcd):
         self.flip = flip
         self.spi_speed_mhz = spi_speed_mhz
 
-        # Calculate optimal polling divisor based on LCD speed
-        # 24MHz: 78ms/frame → poll every 80ms (divisor=8)
-        # 48MHz: 39ms/frame → poll every 40ms (divisor=4)
-        # 56MHz: 34ms/frame → poll every 30ms (divisor=3)
+        # Calculate optimal polling period (seconds) based on LCD speed
+        # 24MHz: 78ms/frame → poll every 80ms
+        # 48MHz: 39ms/frame → poll every 40ms
+        # 56MHz: 34ms/frame → poll every 30ms
         frame_time_ms = (56.0 / spi_speed_mhz) * 33.6
-        self.poll_divisor = max(1, round(frame_time_ms / 10.0))
+        self.poll_period = max(1, round(frame_time_ms / 10.0)) / 100.0
 
         # TODO would be good to decouple the actual LCD hardware.  This file should work for any 320x240 display
         if display is None:
@@ -63,7 +67,8 @@ class Lcd(abstract_lcd.Lcd):
                                  digitalio.DigitalInOut(board.D6),
                                  digitalio.DigitalInOut(board.D5),
                                  spi_speed_mhz * 1_000_000,
-                                 flip)
+                                 flip,
+                                 bus_lock=bus_lock)
 
         # Colors
         self.background = (0, 0, 0)
@@ -116,7 +121,7 @@ class Lcd(abstract_lcd.Lcd):
             frame.load()
         self._wifi_tick = 0
         self._wifi_ticks_per_frame = 2
-        self.wifi_menu: Optional[WifiMenu] = None
+        self.wifi_menu: Optional['WifiMenu'] = None
         self.w_eq = None
         self.w_power = None
         self.w_wrench = None
@@ -141,8 +146,6 @@ class Lcd(abstract_lcd.Lcd):
 
         self.pedalboards = {}
 
-        self.wifi_menu = WifiMenu(self)
-
         # Skip the in-app splash when early boot already showed one (/run/lcd.init).
         # Hardware reset/clear still runs every process start (see LcdIli9341).
         if not display.has_system_splash:
@@ -156,6 +159,10 @@ class Lcd(abstract_lcd.Lcd):
         # TODO check if widget is type
         if direction == 0:
             return
+        if isinstance(widget, Parameterdialog):
+            # All of an accelerated turn's steps in one change (and one redraw)
+            widget.parameter_value_change(direction)
+            return
         event = InputEvent.RIGHT if direction > 0 else InputEvent.LEFT
         for _ in range(abs(direction)):
             widget.input_event(event)
@@ -199,7 +206,7 @@ class Lcd(abstract_lcd.Lcd):
         if self._tuner_panel is not None and self.pstack.current == self._tuner_panel:
             self._tuner_panel.tick()
 
-    def show_tuner_panel(self, panel: TunerPanel) -> None:
+    def show_tuner_panel(self, panel: 'TunerPanel') -> None:
         self._tuner_panel = panel
         self.pstack.push_panel(panel)
         # push_panel composes the (still-blank) panel image onto the stack but
@@ -210,7 +217,7 @@ class Lcd(abstract_lcd.Lcd):
     def hide_tuner_panel(self) -> None:
         if self._tuner_panel is not None:
             self.pstack.pop_panel(self._tuner_panel)
-        self._tuner_panel: TunerPanel | None = None
+        self._tuner_panel: 'TunerPanel | None' = None
 
     #
     # Toolbar
@@ -218,6 +225,10 @@ class Lcd(abstract_lcd.Lcd):
     def draw_tools(self, wifi_type=None, eq_type=None, bypass_type=None, system_type=None):
         if self.w_wifi is not None:
             return
+        if self.wifi_menu is None:
+            # Toolbar is first drawn after the splash, so the menu module loads off the splash path
+            from ui.wifi_menu import WifiMenu
+            self.wifi_menu = WifiMenu(self)
         self.w_wifi = ImageWidget(
             box=Box.xywh(210, 0, 20, 20),
             image=os.path.join(self.imagedir, 'wifi_gray.png'),
@@ -403,6 +414,16 @@ class Lcd(abstract_lcd.Lcd):
                 w.refresh()
                 break
 
+    # Several bypasses changed at once (e.g. a snapshot load): recolor their widgets and
+    # push them to the display in one update, not one per widget. refresh=False leaves
+    # that to a main panel refresh the caller is about to do.
+    def refresh_plugin_group(self, plugins, refresh=True):
+        widgets = [w for w in self.w_plugins if any(w.object is p for p in plugins)]
+        for w in widgets:
+            self.color_plugin(w, w.object)
+        if refresh:
+            self.main_panel.refresh_children(widgets)
+
     def toggle_plugin(self, widget, plugin):
         self.color_plugin(widget, plugin)
         widget.refresh()
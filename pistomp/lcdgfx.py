@@ -44,8 +44,8 @@ class Lcd(abstract_lcd.Lcd):
             from gfxhat import touch, lcd, backlight  # type: ignore[import-untyped]
             self._lcd, self._backlight, self._touch = lcd, backlight, touch
 
-        # Polling divisor for main loop (monochrome LCD is fast)
-        self.poll_divisor = 3
+        # Polling period (seconds) for main loop (monochrome LCD is fast)
+        self.poll_period = 0.03
 
         self.width, self.height = self._lcd.dimensions()
         self.height -= 1  # TODO figure out why this is needed
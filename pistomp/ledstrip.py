@@ -21,10 +21,22 @@ from PIL import ImageColor
 import common.util as Util
 import pistomp.category as Category
 
+
 # LED strip configuration:  # TODO get these from hardware impl (pisompcore.py)
 LED_COUNT = 6          # Number of LED pixels.
 LED_BRIGHTNESS = 0.19  # Set to 0 for darkest, 1.0 for brightest (0.19 seems good, 0.06 for photos)
 
+
+def color_rgb(name):
+    # PIL knows the CSS color names (the same set as matplotlib.colors.cnames), so
+    # matplotlib, which takes seconds to import on a Pi, is only loaded for a name PIL rejects
+    try:
+        return ImageColor.getcolor(name, "RGB")
+    except ValueError:
+        import matplotlib.colors
+        return ImageColor.getcolor(matplotlib.colors.cnames[name], "RGB")
+
+
 class Ledstrip:
 
     def __init__(self):
@@ -71,12 +83,10 @@ class Pixel:
 
     # set the color for the pixel based on the name or rgb
     def set_color(self, color):
-        import matplotlib
         try:
             c = Util.DICT_GET(self.color_cache, color)
             if c is None:
-                c = matplotlib.colors.cnames[color]
-                c = ImageColor.getcolor(c, "RGB")
+                c = color_rgb(color)
                 self.color_cache[color] = c
         except:
             c = color
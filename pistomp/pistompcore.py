@@ -79,7 +79,8 @@ class Pistompcore(hardware.Hardware):
         spi_speed = self.mod.settings.get_setting('lcd.spi_speed_mhz')
         if spi_speed is None:
             spi_speed = 24  # Default to spec
-        self.mod.add_lcd(Lcd.Lcd(self.mod.homedir, self.mod, flip=True, spi_speed_mhz=spi_speed))
+        self.mod.add_lcd(Lcd.Lcd(self.mod.homedir, self.mod, flip=True, spi_speed_mhz=spi_speed,
+                                 bus_lock=self.spi_bus_lock()))
 
     def init_encoders(self):
         top_enc = Encoder.Encoder(TOP_ENC_PIN_D, TOP_ENC_PIN_CLK, callback=self.mod.universal_encoder_select)
@@ -94,7 +94,8 @@ class Pistomptre(hardware.Hardware):
         spi_speed = self.handler.settings.get_setting('lcd.spi_speed_mhz')
         if spi_speed is None:
             spi_speed = 24  # Default to spec
-        self.handler.add_lcd(Lcd.Lcd(self.handler.homedir, self.handler, flip=False, spi_speed_mhz=spi_speed))
+        self.handler.add_lcd(Lcd.Lcd(self.handler.homedir, self.handler, flip=False, spi_speed_mhz=spi_speed,
+                                     bus_lock=self.spi_bus_lock()))
 
     def add_encoder(self, id, type, callback, longpress_callback, midi_channel, midi_cc):
         enc_pins = Util.DICT_GET(ENC, id)
@@ -0,0 +1,240 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Deadline scheduler for the main loop's periodic polls.
+
+Each task has a period and a priority. A task's next deadline is its previous
+deadline plus its period (not "now" plus its period), so time spent doing work
+doesn't stretch the period. The loop sleeps until the earliest deadline.
+
+Among due tasks the lowest priority number runs first. Each task runs at most once
+per pass, except PRIORITY_CONTROLS tasks, which are checked again after every
+other task: a slow LCD flush delays a footswitch poll by at most the flush
+itself, not by another whole tick.
+
+A task that falls a whole period or more behind skips the missed runs (counted
+in `skipped`) rather than running back to back to catch up. A run that takes
+longer than the task's budget (by default its period) counts as an overrun.
+
+Every run's duration also goes into a fixed-size window of recent runs, from
+which stats() reports p50/p95/p99/max. Recording is one list store, so
+the instrumentation costs a few microseconds per tick. Sorting happens only
+when someone asks for the numbers.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Callable, Optional
+
+PRIORITY_CONTROLS = 0
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 2
+PRIORITY_LOW = 3
+
+STATS_WINDOW = 1024  # recent runs kept per task for percentiles
+
+
+class DurationWindow:
+    """The last `size` durations (seconds), for percentiles over recent runs."""
+
+    def __init__(self, size: int = STATS_WINDOW):
+        self._samples = [0.0] * size
+        self._next = 0
+        self.count = 0
+
+    def record(self, duration: float) -> None:
+        self._samples[self._next] = duration
+        self._next = (self._next + 1) % len(self._samples)
+        self.count += 1
+
+    def percentiles(self) -> dict[str, float]:
+        n = min(self.count, len(self._samples))
+        if n == 0:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        s = sorted(self._samples[:n])
+        # nearest rank
+        return {
+            "p50": s[math.ceil(0.50 * n) - 1],
+            "p95": s[math.ceil(0.95 * n) - 1],
+            "p99": s[math.ceil(0.99 * n) - 1],
+            "max": s[-1],
+        }
+
+
+class Task:
+
+    def __init__(self, name: str, fn: Callable[[], object], period: float, priority: int, due: float,
+                 budget: Optional[float] = None):
+        self.name = name
+        self.fn = fn
+        self.period = period
+        self.priority = priority
+        self.due = due
+        self._budget = budget
+        self.last_run: Optional[float] = None
+        self.runs = 0
+        self.overruns = 0       # runs that took longer than budget
+        self.skipped = 0        # runs dropped because the loop fell a period or more behind
+        self.max_duration = 0.0
+        self.max_late = 0.0     # worst start time past the deadline
+        self.durations = DurationWindow()
+
+    @property
+    def budget(self) -> float:
+        return self.period if self._budget is None else self._budget
+
+    def stats(self) -> dict[str, float]:
+        """Milliseconds, percentiles over the last STATS_WINDOW runs; counts since start."""
+        p = self.durations.percentiles()
+        return {
+            "period_ms": 1000 * self.period,
+            "budget_ms": 1000 * self.budget,
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "p50_ms": 1000 * p["p50"],
+            "p95_ms": 1000 * p["p95"],
+            "p99_ms": 1000 * p["p99"],
+            "max_ms": 1000 * p["max"],
+            "max_ever_ms": 1000 * self.max_duration,
+            "max_late_ms": 1000 * self.max_late,
+        }
+
+    def __repr__(self):
+        return "Task(%s, period=%.3f, priority=%d)" % (self.name, self.period, self.priority)
+
+
+class Scheduler:
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        self.tasks: list[Task] = []
+        self._stopped = False
+
+    def add(self, name: str, fn: Callable[[], object], period: float, priority: int = PRIORITY_NORMAL,
+            delay: Optional[float] = None, budget: Optional[float] = None) -> Task:
+        """Run fn every period seconds, the first time after delay (default: one period).
+
+        A run longer than budget (default: the period) counts as an overrun.
+        """
+        if period <= 0:
+            raise ValueError("Task %s period must be positive: %s" % (name, period))
+        due = self._clock() + (period if delay is None else delay)
+        task = Task(name, fn, period, priority, due, budget)
+        self.tasks.append(task)
+        return task
+
+    def get_task(self, name: str) -> Optional[Task]:
+        for task in self.tasks:
+            if task.name == name:
+                return task
+        return None
+
+    def set_period(self, task: Task, period: float) -> None:
+        """Change a task's period. The next deadline moves to one new period after its last run."""
+        if period <= 0:
+            raise ValueError("Task %s period must be positive: %s" % (task.name, period))
+        if period == task.period:
+            return
+        task.period = period
+        base = task.last_run if task.last_run is not None else self._clock()
+        task.due = base + period
+        logging.debug("Scheduler: %s period now %.0f ms" % (task.name, 1000 * period))
+
+    def _next_due(self, now: float, ran: set) -> Optional[Task]:
+        best = None
+        for task in self.tasks:
+            if task.due > now or task in ran:
+                continue
+            if best is None or (task.priority, task.due) < (best.priority, best.due):
+                best = task
+        return best
+
+    def _run(self, task: Task, start: float) -> None:
+        late = start - task.due
+        if late > task.max_late:
+            task.max_late = late
+        task.last_run = start
+        try:
+            task.fn()
+        finally:
+            end = self._clock()
+            duration = end - start
+            task.runs += 1
+            task.durations.record(duration)
+            if duration > task.max_duration:
+                task.max_duration = duration
+            if duration > task.budget:
+                task.overruns += 1
+            task.due += task.period
+            if task.due <= end:
+                missed = int((end - task.due) // task.period) + 1
+                task.skipped += missed
+                task.due += missed * task.period
+
+    def run_pending(self) -> float:
+        """Run every due task once (controls between each), returning seconds until the next deadline."""
+        ran: set = set()
+        while True:
+            now = self._clock()
+            task = self._next_due(now, ran)
+            if task is None:
+                break
+            self._run(task, now)
+            if task.priority == PRIORITY_CONTROLS:
+                ran.add(task)
+            else:
+                ran = {t for t in ran if t.priority != PRIORITY_CONTROLS}
+                ran.add(task)
+        if not self.tasks:
+            return 0.0
+        return max(0.0, min(t.due for t in self.tasks) - self._clock())
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {task.name: task.stats() for task in self.tasks}
+
+    def summary(self) -> str:
+        lines = ["Main loop (ms over last %d runs)" % STATS_WINDOW,
+                 "  %-14s %7s %7s %7s %7s %7s %9s %8s %7s" %
+                 ("task", "period", "p50", "p95", "p99", "max", "runs", "overrun", "skipped")]
+        for name, s in self.stats().items():
+            lines.append("  %-14s %7.1f %7.2f %7.2f %7.2f %7.2f %9d %8d %7d" %
+                         (name, s["period_ms"], s["p50_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"],
+                          s["runs"], s["overruns"], s["skipped"]))
+        return "\n".join(lines)
+
+    def run_forever(self) -> None:
+        self._stopped = False
+        while not self._stopped:
+            wait = self.run_pending()
+            if wait > 0 and not self._stopped:
+                self._sleep(wait)
+
+    async def run_async(self) -> None:
+        """run_forever() as a coroutine: waits on the event loop, so other tasks run between deadlines."""
+        self._stopped = False
+        while not self._stopped:
+            wait = self.run_pending()
+            if not self._stopped:
+                await asyncio.sleep(wait)
+
+    def stop(self) -> None:
+        self._stopped = True
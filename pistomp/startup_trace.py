@@ -0,0 +1,143 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Startup phase timeline.
+
+Wrap each step of startup in `with tracer.phase("name"):` to record its wall
+time, CPU time, HTTP requests and files opened for reading. finish() logs a
+summary at INFO and writes the timeline as JSON to the data dir.
+
+HTTP requests and file opens are counted with a Python audit hook
+(http.client.send / open events), so nothing gets patched. The counts are
+process-wide: work done meanwhile by background threads lands in whichever
+phase is running. CPU time is process time, so it includes those threads too.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Optional
+
+TIMELINE_FILE = "startup_timeline.json"
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+_lock = threading.Lock()
+_counts = {"http": 0, "files": 0}
+_hooked = False
+
+
+def _audit(event: str, args: tuple) -> None:
+    if event == "open":
+        path, mode, flags = args
+        if not isinstance(path, (str, bytes, os.PathLike)):
+            return
+        if mode is not None:
+            reading = not any(c in mode for c in "wax+")
+        else:
+            reading = not (flags or 0) & _WRITE_FLAGS
+        if reading:
+            with _lock:
+                _counts["files"] += 1
+    elif event == "http.client.send":
+        # One send per request line; body chunks are sent separately
+        data = args[1]
+        if isinstance(data, (bytes, bytearray)) and b" HTTP/1." in data.split(b"\r\n", 1)[0]:
+            with _lock:
+                _counts["http"] += 1
+
+
+def _install_hook() -> None:
+    # Audit hooks can't be removed, so install one for the life of the process
+    global _hooked
+    if not _hooked:
+        sys.addaudithook(_audit)
+        _hooked = True
+
+
+def counts() -> dict[str, int]:
+    with _lock:
+        return dict(_counts)
+
+
+class StartupTracer:
+
+    def __init__(self):
+        _install_hook()
+        self.started_at = time.time()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self.phases: list[dict[str, Any]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        before = counts()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            after = counts()
+            self.phases.append({
+                "name": name,
+                "start": round(wall - self._wall0, 6),
+                "wall": round(time.perf_counter() - wall, 6),
+                "cpu": round(time.process_time() - cpu, 6),
+                "http": after["http"] - before["http"],
+                "files": after["files"] - before["files"],
+            })
+
+    def timeline(self) -> dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "wall": round(time.perf_counter() - self._wall0, 6),
+            "cpu": round(time.process_time() - self._cpu0, 6),
+            "phases": list(self.phases),
+        }
+
+    def summary(self) -> str:
+        t = self.timeline()
+        lines = ["Startup: %.2fs wall, %.2fs CPU" % (t["wall"], t["cpu"]),
+                 "  %-24s %9s %9s %6s %6s" % ("phase", "wall ms", "cpu ms", "http", "files")]
+        for p in t["phases"]:
+            lines.append("  %-24s %9.1f %9.1f %6d %6d" %
+                         (p["name"], 1000 * p["wall"], 1000 * p["cpu"], p["http"], p["files"]))
+        return "\n".join(lines)
+
+    def write(self, data_dir: str) -> Optional[str]:
+        """Write the timeline to data_dir, returning the path (None if it couldn't be written)."""
+        path = os.path.join(data_dir, TIMELINE_FILE)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.timeline(), f, indent=2)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"Failed to write startup timeline {path}: {e}")
+            return None
+        return path
+
+    def finish(self, data_dir: Optional[str]) -> None:
+        """Log the summary and write the timeline (if there is a data dir)."""
+        logging.info(self.summary())
+        if data_dir:
+            self.write(data_dir)
@@ -136,11 +136,11 @@ class FakeWebSocketBridge:
     def stop(self) -> None:
         pass
 
-    def send_parameter(self, instance_id: str, symbol: str, value: float) -> bool:
+    def send_parameter(self, instance_id: str, symbol: str, value: float, priority: int = 1) -> bool:
         self.sent.append(f"param_set /graph/{instance_id}/{symbol} {value}")
         return True
 
-    def send_bpm(self, bpm: float) -> bool:
+    def send_bpm(self, bpm: float, priority: int = 0) -> bool:
         self.sent.append(f"transport-bpm {bpm}")
         return True
 
@@ -164,6 +164,61 @@ def fake_ws_bridge():
     return FakeWebSocketBridge()
 
 
+class InlineRestWorker:
+    """Stand-in for RestWorker: runs each job as it is submitted, over the (patched)
+    requests module, and calls back at once, so tests see the REST calls and the
+    redraw without driving a poll loop."""
+
+    def __init__(self):
+        import requests
+
+        self.session = requests
+        self.timeout = None
+        self.submitted = 0
+
+    def get(self, url):
+        return self.session.get(url, timeout=self.timeout)
+
+    def post(self, url, *, json=None, data=None):
+        return self.session.post(url, json=json, data=data, timeout=self.timeout)
+
+    def submit(self, kind, job, on_done=None) -> bool:
+        self.submitted += 1
+        result = job(self)
+        if on_done is not None:
+            on_done(result)
+        return True
+
+    def cancel(self, kind) -> bool:
+        return False
+
+    def poll(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FakeMcp3008:
+    """spidev stand-in wired to an MCP3008: xfer2 answers a single-ended conversion
+    command with the value set in `levels` for that channel, and counts transfers."""
+
+    def __init__(self, levels=None):
+        self.levels = dict(levels or {})
+        self.transfers = 0
+
+    def xfer2(self, data):
+        self.transfers += 1
+        assert data[0] == 1 and data[1] & 0x80, "not a single-ended MCP3008 conversion"
+        value = self.levels.get((data[1] >> 4) & 7, 0)
+        return [0, (value >> 8) & 3, value & 0xFF]
+
+
+@pytest.fixture
+def fake_mcp3008():
+    return FakeMcp3008()
+
+
 # ---------------------------------------------------------------------------
 # FakeLcd — captures rendered frames without touching hardware
 # ---------------------------------------------------------------------------
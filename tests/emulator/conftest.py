@@ -11,6 +11,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 import common.token as Token
+from tests.conftest import InlineRestWorker
 
 
 def _mod_get(url, **_):
@@ -64,11 +65,13 @@ def emulator_env(tmp_path, monkeypatch):
     with ExitStack() as stack:
         mock_get = stack.enter_context(patch("requests.get", side_effect=_mod_get))
         mock_post = stack.enter_context(patch("requests.post", side_effect=_mod_post))
-        stack.enter_context(patch("modalapi.pedalboard.Pedalboard.load_bundle"))
+        stack.enter_context(patch("modalapi.pedalboard.Pedalboard.read_bundle", return_value={"plugins": []}))
         stack.enter_context(patch("modalapi.mod.AsyncWebSocketBridge"))
         stack.enter_context(patch("modalapi.modhandler.AsyncWebSocketBridge"))
         stack.enter_context(patch("emulator.mod.AsyncWebSocketBridge"))
         stack.enter_context(patch("emulator.modhandler.AsyncWebSocketBridge"))
+        stack.enter_context(patch("modalapi.mod.RestWorker", InlineRestWorker))
+        stack.enter_context(patch("modalapi.modhandler.RestWorker", InlineRestWorker))
         # MIDI device may not exist on CI; force the bootstrap's except branch.
         stack.enter_context(patch("emulator.bootstrap.open_midioutput", side_effect=RuntimeError("no midi")))
         yield {"get": mock_get, "post": mock_post, "tmp_path": tmp_path}
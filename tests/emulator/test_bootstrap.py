@@ -4,11 +4,13 @@ Catches wiring regressions in bootstrap_emulator (add_lcd, add_hardware,
 set_window, load_banks, load_pedalboards, set_current_pedalboard,
 system_info_load) without requiring MOD Desktop or a real MIDI device."""
 
+import json
 from pathlib import Path
 
 import pytest
 
 from emulator.bootstrap import bootstrap_emulator
+from pistomp.startup_trace import TIMELINE_FILE, StartupTracer
 
 PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
 
@@ -34,3 +36,29 @@ def test_bootstrap_selects_first_pedalboard_when_last_json_missing(emulator_env)
 
     assert handler.hardware is not None
     handler.hardware.cleanup()
+
+
+@pytest.mark.parametrize("version", ["emulator_v2", "emulator_v3"])
+def test_bootstrap_records_startup_phases(emulator_env, version):
+    trace = StartupTracer()
+    handler, _ = bootstrap_emulator(version, PROJECT_ROOT, trace)
+    trace.finish(handler.data_dir)  # pyright: ignore[reportAttributeAccessIssue]
+
+    names = [p["name"] for p in trace.phases]
+    assert names == [
+        "pygame init",
+        "midi open",
+        "config load",
+        "handler create",
+        "hardware init",
+        "load_banks",
+        "load_pedalboards",
+        "set current pedalboard",
+        "system_info_load",
+    ]
+
+    timeline = json.loads((emulator_env["tmp_path"] / ".pistomp_emulator" / TIMELINE_FILE).read_text())
+    assert [p["name"] for p in timeline["phases"]] == names
+
+    assert handler.hardware is not None
+    handler.hardware.cleanup()
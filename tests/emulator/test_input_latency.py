@@ -0,0 +1,26 @@
+"""Emulator latency harness: presses driven from a thread through the real switch/footswitch path."""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from emulator.bootstrap import bootstrap_emulator
+from emulator.latency_harness import drive_presses, over_budget
+
+PROJECT_ROOT = str(Path(__file__).parent.parent.parent)
+
+
+def test_footswitch_presses_within_latency_budget(emulator_env):
+    handler, _ = bootstrap_emulator("emulator_v3", PROJECT_ROOT)
+    midiout = MagicMock()
+    for fs in handler.hardware.footswitches:
+        fs.midiout = midiout
+
+    stats = drive_presses(handler, presses=20)
+
+    assert stats["pressed"]["count"] == 20
+    assert stats["midi"]["count"] == 20
+    assert stats["lcd"]["count"] == 20
+    assert midiout.send_message.call_count == 20
+    assert over_budget(stats) == {}
+
+    handler.hardware.cleanup()
@@ -14,7 +14,7 @@ import pytest
 import yaml
 from PIL import Image
 
-from tests.conftest import FakeWebSocketBridge
+from tests.conftest import FakeWebSocketBridge, InlineRestWorker
 from tests.types import SystemFixture, SystemFixtureLegacy
 import common.token as Token
 
@@ -87,11 +87,12 @@ def _build_stack(hw_class: type[Hardware], cfg_path: Path, fake_lcd, tmp_path) -
         patch("requests.get") as mock_get,
         patch("requests.post") as mock_post,
         patch("pistomp.settings.Settings") as mock_settings_cls,
-        patch("modalapi.pedalboard.Pedalboard.load_bundle"),
+        patch("modalapi.pedalboard.Pedalboard.read_bundle", return_value={"plugins": []}),
         patch("modalapi.wifi.WifiManager") as mock_wm_cls,
         patch("subprocess.check_output", return_value=b"SystemState=running"),
         patch("pistomp.lcd320x240.LcdIli9341", return_value=fake_lcd),
         patch("modalapi.modhandler.AsyncWebSocketBridge", return_value=fake_bridge),
+        patch("modalapi.modhandler.RestWorker", InlineRestWorker),
     ):
         # Tests don't drive a poll loop, so stub pending_op_count to always return 0 (no pending ops).
         mock_wm_cls.return_value.queue.pending_op_count.return_value = 0
@@ -135,6 +136,7 @@ def _build_stack(hw_class: type[Hardware], cfg_path: Path, fake_lcd, tmp_path) -
         hw = hw_class(cfg, handler, midiout, handler.update_lcd_fs)
         handler.add_hardware(hw)
         handler.load_pedalboards()
+        handler.pedalboard_loader.join()
 
         pb = handler.pedalboards["/path/to/rig.pedalboard"]
         pb.plugins = []
@@ -201,9 +203,10 @@ def _v1_stack(tmp_path) -> Generator[SystemFixtureLegacy, None, None]:
     with (
         patch("requests.get") as mock_get,
         patch("requests.post") as mock_post,
-        patch("modalapi.pedalboard.Pedalboard.load_bundle"),
+        patch("modalapi.pedalboard.Pedalboard.read_bundle", return_value={"plugins": []}),
         patch("modalapi.wifi.WifiManager") as mock_wm_cls,
         patch("modalapi.mod.AsyncWebSocketBridge", return_value=fake_bridge),
+        patch("modalapi.mod.RestWorker", InlineRestWorker),
         patch("pistomp.hardware.Hardware.init_spi"),
         patch("pistomp.pistomp.Pistomp.run_test"),
         patch("pistomp.pistomp.Pistomp.init_lcd", fake_init_lcd),
@@ -248,6 +251,7 @@ def _v1_stack(tmp_path) -> Generator[SystemFixtureLegacy, None, None]:
         hw = Pistomp(cfg, handler, midiout, handler.update_lcd_fs)
         handler.add_hardware(hw)
         handler.load_pedalboards()
+        handler.pedalboard_loader.join()
 
         pb = handler.pedalboards["/path/to/rig.pedalboard"]
         pb.plugins = []
@@ -0,0 +1,93 @@
+"""AdcSampler: the MCP3008 scanned on its own thread into per-channel ring buffers, and the SPI bus lock it shares with the LCD."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+from PIL import Image
+
+from pistomp.adcsampler import AdcSampler
+from pistomp.adcscanner import AdcScanner
+from pistomp.analogmidicontrol import AnalogMidiControl
+from pistomp.analogVU import AnalogVU
+from uilib.lcd_ili9341 import BUS_BAND_COLUMNS, LcdIli9341
+
+
+def test_controls_read_the_window_mean_and_vu_the_peak(fake_mcp3008):
+    fake_mcp3008.levels = {2: 600, 5: 512}
+    adc = AdcScanner(fake_mcp3008)
+    knob = AnalogMidiControl(spi=adc, adc_channel=2, tolerance=16, midi_CC=70, midi_channel=0,
+                             midiout=MagicMock(), type="KNOB", id=0)
+    vu = AnalogVU(adc, 5, 4, MagicMock(), 5, 0, 512)
+    sampler = AdcSampler(adc, rate_hz=1000)  # 20 sample window
+    adc.sampler = sampler
+    assert sampler.window == 20
+
+    sampler.sample()
+    assert knob.read() == 600  # no full window yet: the last scan
+
+    for n in range(19):
+        fake_mcp3008.levels[2] = 600 + (10 if n % 2 else -10)  # noise around 600
+        fake_mcp3008.levels[5] = 900 if n == 7 else 512        # a 1 ms transient
+        sampler.sample()
+    assert sampler.samples == 20
+    assert abs(knob.read() - 600) <= 1
+    assert adc.values[5] == 512         # the last scan doesn't see the transient...
+    assert vu.read_level() == 900       # ...but the block's peak does
+
+
+def test_thread_samples_at_rate_and_stops(fake_mcp3008):
+    fake_mcp3008.levels = {0: 300}
+    adc = AdcScanner(fake_mcp3008)
+    adc.add_channel(0)
+    sampler = AdcSampler(adc, rate_hz=500)
+    sampler.start()
+    try:
+        adc.add_channel(3)  # registered after start: picked up on the next tick
+        deadline = time.monotonic() + 2
+        while sampler.samples < 40 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert adc.sampler is sampler
+        assert adc.value(0) == 300
+    finally:
+        sampler.stop()
+    assert sampler.samples >= 40
+    assert set(sampler.buffers) == {0, 3}
+    assert adc.sampler is None
+
+
+class _Display:
+    """Records where each block lands, and whether the bus lock was held for it."""
+
+    def __init__(self, bus_lock):
+        self.bus_lock = bus_lock
+        self.blocks = []
+
+    def image(self, image, rotation, x, y):
+        held = self.bus_lock is not None and self.bus_lock.locked()
+        self.blocks.append((image.size, x, y, held))
+
+
+def _lcd(bus_lock):
+    lcd = LcdIli9341.__new__(LcdIli9341)
+    lcd.disp = _Display(bus_lock)
+    lcd.lock = threading.Lock()
+    lcd.bus_lock = bus_lock
+    lcd.width, lcd.height, lcd.flip = 320, 240, False
+    return lcd
+
+
+def test_lcd_update_is_written_in_bands_under_the_bus_lock():
+    frame = Image.new("RGB", (320, 240))
+    lcd = _lcd(None)
+    lcd.update(frame)
+    assert lcd.disp.blocks == [((320, 240), 0, 0, False)]
+
+    lcd = _lcd(threading.Lock())
+    lcd.update(frame)
+    bands = lcd.disp.blocks
+    assert len(bands) == 320 // BUS_BAND_COLUMNS
+    assert all(held for _, _, _, held in bands)
+    assert sorted(y for _, _, y, _ in bands) == list(range(0, 320, BUS_BAND_COLUMNS))
+    assert all(size == (BUS_BAND_COLUMNS, 240) and x == 0 for size, x, _, _ in bands)
+    assert not lcd.bus_lock.locked()
@@ -0,0 +1,103 @@
+"""AdcScanner: one SPI transaction per tick for every ADC channel, read by the controls from the cached frame."""
+
+import ctypes
+from unittest.mock import MagicMock
+
+import pistomp.adcscanner as adcscanner
+from pistomp.adcscanner import AdcScanner
+from pistomp.analogmidicontrol import AnalogMidiControl
+from pistomp.analogswitch import AnalogSwitch
+from pistomp.analogVU import AnalogVU
+
+
+def _controls(adc):
+    knob = AnalogMidiControl(spi=adc, adc_channel=2, tolerance=16, midi_CC=70, midi_channel=0,
+                             midiout=MagicMock(), type="KNOB", id=0)
+    nav = AnalogSwitch(adc, 7, 800, MagicMock())
+    vu = AnalogVU(adc, 5, 4, MagicMock(), 5, 0, 512)
+    knob_twin = AnalogMidiControl(spi=adc, adc_channel=2, tolerance=16, midi_CC=71, midi_channel=0,
+                                  midiout=MagicMock(), type="KNOB", id=1)
+    return knob, nav, vu, knob_twin
+
+
+def test_controls_read_the_cached_frame(fake_mcp3008):
+    fake_mcp3008.levels = {2: 600, 5: 512, 7: 1023}
+    adc = AdcScanner(fake_mcp3008)
+    knob, nav, vu, knob_twin = _controls(adc)
+    assert adc.channels == [2, 5, 7]
+
+    adc.scan()
+    assert fake_mcp3008.transfers == 3
+    for c in (knob, nav, vu, knob_twin):
+        c.refresh()
+    assert fake_mcp3008.transfers == 3  # nothing beyond the scan
+    assert knob.last_read == knob_twin.last_read == 600
+
+    fake_mcp3008.levels[2] = 100
+    assert knob.read() == 600      # the frame, until the next scan
+    assert knob.readChannel() == 100  # a direct conversion
+    adc.scan()
+    assert knob.read() == 100
+
+
+def test_control_without_scanner_reads_directly(fake_mcp3008):
+    fake_mcp3008.levels = {3: 900}
+    nav = AnalogSwitch(fake_mcp3008, 3, 800, MagicMock())
+    assert nav.adc is None
+    assert nav.read() == 900
+    assert fake_mcp3008.transfers == 1
+
+
+class _SpiDev:
+    """A spidev with a file descriptor: scans go through the SPI_IOC_MESSAGE ioctl."""
+
+    def __init__(self, chip):
+        self.chip = chip
+        self.ioctls = []
+
+    def fileno(self):
+        return 99
+
+    def xfer2(self, data):
+        return self.chip.xfer2(data)
+
+
+def _fake_ioctl(spi):
+    def ioctl(fd, request, transfers):
+        spi.ioctls.append((request, [t.cs_change for t in transfers]))
+        for t in transfers:
+            tx = list(ctypes.string_at(t.tx_buf, t.len))
+            ctypes.memmove(t.rx_buf, bytes(spi.chip.xfer2(tx)), t.len)
+        return 0
+    return ioctl
+
+
+def test_scan_is_one_ioctl_with_cs_toggled_between_channels(fake_mcp3008, monkeypatch):
+    fake_mcp3008.levels = {0: 1, 4: 513, 6: 1023}
+    spi = _SpiDev(fake_mcp3008)
+    monkeypatch.setattr(adcscanner.fcntl, "ioctl", _fake_ioctl(spi))
+    adc = AdcScanner(spi)
+    for ch in (6, 0, 4):
+        adc.add_channel(ch)
+
+    adc.scan()
+    adc.scan()
+
+    assert ctypes.sizeof(adcscanner._SpiIocTransfer) == 32
+    assert spi.ioctls == [(adcscanner.spi_ioc_message(3), [1, 1, 0])] * 2
+    assert [adc.values[ch] for ch in (0, 4, 6)] == [1, 513, 1023]
+    assert adc.scans == 2
+
+
+def test_failed_ioctl_falls_back_to_per_channel_reads(fake_mcp3008, monkeypatch, caplog):
+    fake_mcp3008.levels = {1: 321}
+    monkeypatch.setattr(adcscanner.fcntl, "ioctl", MagicMock(side_effect=OSError("EINVAL")))
+    adc = AdcScanner(_SpiDev(fake_mcp3008))
+    adc.add_channel(1)
+
+    adc.scan()
+    adc.scan()
+
+    assert adc.values[1] == 321
+    assert fake_mcp3008.transfers == 2
+    assert caplog.text.count("reading channels separately") == 1
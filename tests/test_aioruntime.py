@@ -0,0 +1,103 @@
+"""Asyncio runtime: poll tasks and the WebSocket worker share one event loop, and inbound messages dispatch on arrival."""
+
+import asyncio
+import time
+
+import pytest
+import websockets
+
+from modalapi import websocket_bridge
+from modalapi.websocket_bridge import AsyncWebSocketBridge
+from pistomp.aioruntime import AsyncRuntime, close_loop
+from pistomp.scheduler import Scheduler
+
+
+class _Host:
+    """Just enough of a handler: a WS bridge and its drain."""
+
+    def __init__(self, url):
+        self.ws_bridge = AsyncWebSocketBridge(ws_url=url)
+        self.ws_bridge.start()
+        self.received = []  # (message, monotonic time drained)
+
+    def poll_ws_messages(self):
+        now = time.monotonic()
+        self.received.extend((m, now) for m in self.ws_bridge.get_received_messages())
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    websocket_bridge.use_event_loop(loop)
+    yield loop
+    close_loop(loop)
+
+
+@pytest.fixture
+def server(loop):
+    """mod-ui stand-in: records what it's sent, and sends `push` to each client as it connects."""
+    state = {"got": [], "push": [], "sent_at": None}
+
+    async def handle(ws):
+        for msg in state["push"]:
+            state["sent_at"] = time.monotonic()
+            await ws.send(msg)
+        async for msg in ws:
+            state["got"].append(msg)
+
+    async def serve():
+        return await websockets.serve(handle, "127.0.0.1", 0)
+
+    srv = loop.run_until_complete(serve())
+    state["url"] = "ws://127.0.0.1:%d/websocket" % srv.sockets[0].getsockname()[1]
+    yield state
+    srv.close()
+    loop.run_until_complete(srv.wait_closed())
+
+
+def _run(loop, host, scheduler, until, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    scheduler.add("until", lambda: scheduler.stop() if until() or time.monotonic() > deadline else None, 0.005)
+    AsyncRuntime(host, scheduler, loop).run()
+    host.ws_bridge.stop()
+
+
+def test_bridge_runs_on_the_shared_loop_and_sends(loop, server):
+    host = _Host(server["url"])
+    assert host.ws_bridge._thread is None
+    scheduler = Scheduler()
+    scheduler.add("sender", lambda: host.ws_bridge.send_parameter("amp", "gain", 0.5), 0.01, delay=0.05)
+    _run(loop, host, scheduler, lambda: len(server["got"]) >= 3)
+    assert server["got"][:3] == ["param_set /graph/amp/gain 0.5"] * 3
+
+
+def test_inbound_messages_drain_on_arrival_not_on_the_next_poll(loop, server):
+    server["push"] = ["loading_end 0", "param_set /graph/amp/gain 0.25"]
+    host = _Host(server["url"])
+    scheduler = Scheduler()
+    # No ws_messages poll task at all: only the on-receive dispatch can deliver these
+    _run(loop, host, scheduler, lambda: len(host.received) >= 2)
+    assert [m for m, _ in host.received] == server["push"]
+    assert host.received[-1][1] - server["sent_at"] < 0.05
+
+
+def test_scheduler_run_async_lets_other_coroutines_run(loop):
+    scheduler = Scheduler()
+    ticks = []
+    scheduler.add("poll", lambda: ticks.append(time.monotonic()), 0.01, delay=0.0)
+    other = []
+
+    async def side():
+        while True:
+            other.append(1)
+            await asyncio.sleep(0.005)
+
+    async def main():
+        task = asyncio.ensure_future(side())
+        loop.call_later(0.1, scheduler.stop)
+        await scheduler.run_async()
+        task.cancel()
+
+    loop.run_until_complete(main())
+    assert 8 <= len(ticks) <= 12
+    assert len(other) >= 10
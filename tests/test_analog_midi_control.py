@@ -1,4 +1,6 @@
-"""Regression test for AnalogMidiControl.value_change_callback wiring.
+"""AnalogMidiControl: value_change_callback wiring, and the filter stage against noisy ADC traces.
+
+Regression test for AnalogMidiControl.value_change_callback wiring.
 
 Blend mode relies on `value_change_callback` being invoked from `refresh()`
 when the ADC reading crosses the tolerance threshold. A merge once stripped
@@ -6,8 +8,10 @@ this invocation while leaving the constructor parameter in place, silently
 breaking expression-pedal blend. This guards against that regression.
 """
 
+import random
 from unittest.mock import MagicMock
 
+from pistomp.analogfilter import EmaFilter, MedianFilter, create_filters
 from pistomp.analogmidicontrol import AnalogMidiControl
 
 
@@ -68,3 +72,73 @@ def test_callback_observes_updated_normalized_value():
     control.refresh()
 
     assert observed == [0.0]
+
+
+# Noisy ADC traces: a resting expression pedal and a slow heel-to-toe sweep, with
+# the few-LSB wander and occasional single-reading spikes of a worn pot.
+def _noisy_trace(levels, noise, seed, spike_every=37):
+    rng = random.Random(seed)
+    trace = []
+    for n, level in enumerate(levels):
+        value = level + rng.randint(-noise, noise)
+        if n % spike_every == spike_every - 1:
+            value += rng.choice((-1, 1)) * 60
+        trace.append(min(1023, max(0, round(value))))
+    return trace
+
+
+RESTING = _noisy_trace([556] * 400, noise=6, seed=1)  # 556 is right on the 69/70 CC step boundary
+SWEEP = _noisy_trace([i * 1023 / 299 for i in range(300)] + [1023] * 30, noise=6, seed=2)  # then rests at toe
+
+FILTERED = {"filter": {"median": 5, "ema": 0.3, "hysteresis": 0.5}}
+
+
+def _play(fake_mcp3008, trace, cfg, tolerance=4):
+    midiout = MagicMock()
+    callback = MagicMock()
+    control = AnalogMidiControl(spi=fake_mcp3008, adc_channel=7, tolerance=tolerance, midi_CC=77, midi_channel=0,
+                                midiout=midiout, type="EXPRESSION", id=0, cfg=cfg, autosync=True,
+                                value_change_callback=callback)
+    fake_mcp3008.levels[7] = trace[0]
+    control.initialize()
+    for value in trace[1:]:
+        fake_mcp3008.levels[7] = value
+        control.refresh()
+    sent = [call.args[0][2] for call in midiout.send_message.call_args_list]
+    assert control.sent == len(sent)
+    assert callback.call_count == len(sent) - 1  # every send but autosync's
+    return control, sent
+
+
+def test_filters_hold_a_resting_pedal_steady(fake_mcp3008):
+    raw, raw_sent = _play(fake_mcp3008, RESTING, {})
+    _, filtered_sent = _play(fake_mcp3008, RESTING, FILTERED)
+
+    assert len(raw_sent) > 40  # flapping around the step, plus every spike
+    assert filtered_sent == [filtered_sent[0]]
+    assert filtered_sent[0] in (69, 70)
+    assert raw.suppressed > 0  # even unfiltered, readings that land on the CC already sent aren't resent
+
+
+def test_filters_follow_a_sweep_without_flapping(fake_mcp3008):
+    _, raw_sent = _play(fake_mcp3008, SWEEP, {})
+    _, filtered_sent = _play(fake_mcp3008, SWEEP, FILTERED)
+
+    assert filtered_sent[0] == 0 and filtered_sent[-1] == 127
+    assert filtered_sent == sorted(filtered_sent)  # never steps back
+    assert raw_sent != sorted(raw_sent)
+    assert len(filtered_sent) < len(raw_sent)
+
+
+def test_unchanged_cc_value_is_not_resent(fake_mcp3008):
+    control, sent = _play(fake_mcp3008, [512, 514, 512, 515, 600], {}, tolerance=0)
+    assert sent == [64, 74]
+    assert control.suppressed == 3
+
+
+def test_filter_config():
+    filters, hysteresis = create_filters({"ema": 0.5, "median": 3, "hysteresis": 0.25})
+    assert [type(f) for f in filters] == [MedianFilter, EmaFilter]  # median first, whatever the order given
+    assert hysteresis.width == 0.25
+    assert create_filters(None) == ([], None)
+    assert create_filters({"median": 1, "ema": 2}) == ([], None)  # logged as config errors
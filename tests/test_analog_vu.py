@@ -0,0 +1,78 @@
+"""AnalogVU: running window sums, peak hold, and clip detection from the sampler's blocks."""
+
+import random
+from unittest.mock import MagicMock
+
+from pistomp.adcsampler import AdcSampler
+from pistomp.adcscanner import AdcScanner
+from pistomp.analogVU import AVERAGE_PERIOD_OFF, AVERAGE_PERIOD_SAMPLES, AnalogVU, VuState
+
+BASELINE = 512
+RATE_HZ = 1000
+BLOCK = 20  # samples per 20 ms indicator refresh at 1 kHz
+
+
+def _signal(refreshes, burst_at, burst_ms=2, burst_level=BASELINE + 200, seed=3):
+    """A quiet input (a couple of LSB of noise on the baseline) with one short clipping burst."""
+    rng = random.Random(seed)
+    trace = [BASELINE + rng.randint(-1, 1) for _ in range(refreshes * BLOCK)]
+    for n in range(burst_at, burst_at + burst_ms * RATE_HZ // 1000):
+        trace[n] = burst_level
+    return trace
+
+
+def _play(fake_mcp3008, trace, sampled):
+    adc = AdcScanner(fake_mcp3008)
+    vu = AnalogVU(adc, 5, 4, MagicMock(), 5, 0, BASELINE)
+    sampler = AdcSampler(adc, RATE_HZ)
+    if sampled:
+        adc.sampler = sampler
+    states = []
+    for n, value in enumerate(trace):
+        fake_mcp3008.levels[5] = value
+        if sampled:
+            sampler.sample()
+        if n % BLOCK == BLOCK - 1:
+            if not sampled:
+                adc.scan()  # the per-tick scan: one reading per refresh
+            vu.refresh()
+            if not states or states[-1] != vu.state:
+                states.append(vu.state)
+    return vu, states
+
+
+def test_2ms_burst_between_refreshes_lights_clip(fake_mcp3008):
+    trace = _signal(refreshes=80, burst_at=105)  # inside the block read by the 6th refresh
+
+    vu, states = _play(fake_mcp3008, trace, sampled=True)
+    assert states == [VuState.OFF, VuState.CLIP, VuState.SIG, VuState.OFF]  # held, decayed, then off
+    assert vu.led_writes == 3  # one per change
+
+    vu, states = _play(fake_mcp3008, trace, sampled=False)
+    assert states == [VuState.OFF]  # one reading per refresh never lands on it
+    assert vu.led_writes == 0
+
+
+def test_clip_is_held_then_decays(fake_mcp3008):
+    trace = _signal(refreshes=40, burst_at=105)
+    adc = AdcScanner(fake_mcp3008)
+    vu = AnalogVU(adc, 5, 4, MagicMock(), 5, 0, BASELINE)
+    adc.sampler = sampler = AdcSampler(adc, RATE_HZ)
+    clipped = 0
+    for n, value in enumerate(trace):
+        fake_mcp3008.levels[5] = value
+        sampler.sample()
+        if n % BLOCK == BLOCK - 1:
+            vu.refresh()
+            clipped += vu.state is VuState.CLIP
+    assert 10 < clipped < 20  # the 200 ms hold plus a few refreshes of decay
+    assert vu.peak < vu.thresh_sig
+
+
+def test_running_sums_match_the_windows():
+    vu = AnalogVU(MagicMock(), 5, 4, MagicMock(), 5, 0, BASELINE)
+    rng = random.Random(4)
+    for _ in range(500):
+        vu.add_level(rng.randint(BASELINE, 1023))
+        assert vu.samples_sum == sum(vu.samples) and len(vu.samples) == AVERAGE_PERIOD_SAMPLES
+        assert vu.off_sum == sum(vu.off) and len(vu.off) == AVERAGE_PERIOD_OFF
@@ -0,0 +1,55 @@
+"""BundleParser: one shared lilv World, bundles unloaded after each parse."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+import modalapi.pedalboard as pedalboard
+from modalapi.pedalboard import Pedalboard
+
+
+@pytest.fixture
+def fake_lilv(monkeypatch):
+    lilv = MagicMock()
+    monkeypatch.setattr(pedalboard, "lilv", lilv)
+    monkeypatch.setattr(pedalboard, "_parser", None)
+    return lilv
+
+
+def test_parser_is_shared_and_loads_specs_once(fake_lilv):
+    assert pedalboard.get_parser() is pedalboard.get_parser()
+    assert fake_lilv.World.call_count == 1
+    world = fake_lilv.World.return_value
+    assert world.load_specifications.call_count == 1
+    assert world.load_plugin_classes.call_count == 1
+
+
+def test_pedalboards_do_not_create_worlds(fake_lilv):
+    for i in range(5):
+        Pedalboard(f"Board {i}", f"/boards/{i}.pedalboard")
+    assert fake_lilv.World.call_count == 0
+
+
+def test_bundle_unloaded_even_when_parse_fails(fake_lilv):
+    world = fake_lilv.World.return_value
+    world.get_all_plugins.return_value = []
+
+    for i in range(3):
+        with pytest.raises(Exception, match="0 or > 1 plugin"):
+            Pedalboard("Rig", f"/boards/{i}.pedalboard").parse_bundle(f"/boards/{i}.pedalboard")
+
+    assert fake_lilv.World.call_count == 1
+    assert world.load_bundle.call_count == 3
+    assert world.unload_bundle.call_count == 3
+    world.new_file_uri.assert_called_with(None, "/boards/2.pedalboard/")
+
+
+def test_picks_plugin_from_its_own_bundle(fake_lilv):
+    world = fake_lilv.World.return_value
+    bundlenode = world.new_file_uri.return_value
+    ours, stale = MagicMock(), MagicMock()
+    ours.get_bundle_uri.return_value = bundlenode
+    stale.get_bundle_uri.return_value = "file:///boards/other.pedalboard/"
+    world.get_all_plugins.return_value = [stale, ours]
+
+    assert pedalboard.get_parser().get_pedalboard_plugin(bundlenode, "/boards/rig.pedalboard/") is ours
@@ -0,0 +1,81 @@
+"""Startup imports: slow, feature-specific modules load on first use, not at import."""
+
+import json
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import pistomp.config as config
+from pistomp.ledstrip import color_rgb
+
+PROJECT_ROOT = Path(__file__).parent.parent
+TEMPLATE = PROJECT_ROOT / "setup" / "config_templates" / "default_config_pistomptre.yml"
+
+DEFERRED = ["numpy", "matplotlib", "jsonschema", "pistomp.tuner", "ui.wifi_menu", "pistomp.testhost"]
+
+# Same hardware shims as conftest.py, minus matplotlib which must not be imported at all
+_PROBE = """
+import json, sys
+from unittest.mock import MagicMock
+for m in %r:
+    sys.modules[m] = MagicMock()
+for m in %r:
+    __import__(m)
+print(json.dumps(sorted(d for d in %r if any(n == d or n.startswith(d + ".") for n in sys.modules))))
+"""
+
+_SHIMS = ["alsaaudio", "board", "busio", "digitalio", "gpiozero", "neopixel", "spidev", "lilv",
+          "adafruit_mcp3xxx", "adafruit_mcp3xxx.analog_in", "adafruit_mcp3xxx.mcp3008",
+          "adafruit_rgb_display", "adafruit_rgb_display.ili9341", "adafruit_rgb_display.st7789"]
+
+
+def test_startup_modules_do_not_import_deferred_ones():
+    modules = ["modalapistomp", "modalapi.mod", "modalapi.modhandler", "pistomp.lcd320x240", "pistomp.ledstrip"]
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE % (_SHIMS, modules, DEFERRED)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    assert json.loads(out) == []
+
+
+@pytest.mark.parametrize("name, rgb", [
+    ("MediumVioletRed", (199, 21, 133)),
+    ("gray", (128, 128, 128)),
+    ("#0a0b0c", (10, 11, 12)),
+])
+def test_led_color_names_resolve_without_matplotlib(name, rgb):
+    assert color_rgb(name) == rgb
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    shutil.copy(TEMPLATE, tmp_path / config.DEFAULT_CONFIG_FILE)
+    monkeypatch.setattr(config, "data_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_default_config_validated_once_until_it_changes(config_dir):
+    with patch("jsonschema.validate") as validate:
+        first = config.load_default_cfg()
+        assert config.load_default_cfg() == first
+        assert validate.call_count == 1
+
+        cfg_file = config_dir / config.DEFAULT_CONFIG_FILE
+        cfg_file.write_text(cfg_file.read_text() + "\n# edited\n")
+        config.load_default_cfg()
+        assert validate.call_count == 2
+
+
+def test_invalid_default_config_reported_every_load(config_dir, caplog):
+    cfg_file = config_dir / config.DEFAULT_CONFIG_FILE
+    cfg_file.write_text(cfg_file.read_text().replace("channel: 14", "channel: 99", 1))
+    assert "channel: 99" in cfg_file.read_text()
+    for _ in range(2):
+        caplog.clear()
+        config.load_default_cfg()
+        assert "Config file error" in caplog.text
+    assert not (config_dir / config.VALIDATED_STAMP_FILE).exists()
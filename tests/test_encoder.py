@@ -0,0 +1,102 @@
+"""Encoder: quadrature decoding from timestamped edges, rotation speed and acceleration."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from pistomp.encoder import Acceleration, Encoder
+from pistomp.encodermidicontrol import EncoderMidiControl
+
+# (data, clk) pin states through one detent, starting and ending at rest (both high)
+CW = [(0, 1), (0, 0), (1, 0), (1, 1)]
+CCW = [(1, 0), (0, 0), (0, 1), (1, 1)]
+
+
+class Pins:
+    def __init__(self):
+        self.data = self.clk = 1
+
+
+def _encoder(cls=Encoder, **kw):
+    pins = Pins()
+    enc = cls(d_pin=None, clk_pin=None, **kw)
+    enc.get_data = lambda: pins.data
+    enc.get_clk = lambda: pins.clk
+    enc.prevNextCode = 0x3  # at rest
+    return enc, pins
+
+
+def _turn(enc, pins, detents, start=0.0, interval=0.5, bounce=False):
+    """Feed the edges of `detents` clicks (+ clockwise, - counter clockwise), one click every `interval` s."""
+    sequence = CW if detents > 0 else CCW
+    t = start
+    for _ in range(abs(detents)):
+        for n, (data, clk) in enumerate(sequence):
+            edge_t = t + interval * (n + 1) / len(sequence)
+            pins.data, pins.clk = data, clk
+            enc._edge(edge_t)
+            if bounce and n == 0:
+                pins.data, pins.clk = 1, 1  # contact bounce back to rest, then on again
+                enc._edge(edge_t)
+                pins.data, pins.clk = data, clk
+                enc._edge(edge_t)
+        t += interval
+    return t
+
+
+@pytest.fixture(autouse=True)
+def default_acceleration():
+    Encoder.set_acceleration(None)
+    yield
+    Encoder.set_acceleration(None)
+
+
+def test_slow_clicks_are_one_step_each():
+    steps = []
+    enc, pins = _encoder(callback=steps.append)
+    _turn(enc, pins, 3, interval=0.5, bounce=True)
+    enc.read_rotary()
+    _turn(enc, pins, -2, start=2.0, interval=0.5)
+    enc.read_rotary()
+    assert steps == [3, -2]
+
+
+def test_fast_spin_accelerates_and_reversal_resets():
+    steps = []
+    enc, pins = _encoder(callback=steps.append)
+    t = _turn(enc, pins, 8, interval=0.04)  # 25 clicks/s
+    enc.read_rotary()
+    assert enc.speed == pytest.approx(25)
+    # The first click has no speed yet; once measured, each click is max_multiplier steps
+    assert steps == [1 + 7 * 8]
+
+    _turn(enc, pins, -1, start=t, interval=0.04)
+    enc.read_rotary()
+    assert steps[-1] == -1
+
+
+def test_acceleration_curve():
+    a = Acceleration(min_speed=4, max_speed=20, max_multiplier=8, curve=2)
+    assert [a.multiplier(s) for s in (0, 4, 8, 12, 16, 20, 40)] == [1, 1, 1, 3, 5, 8, 8]
+    assert Acceleration(max_multiplier=1).multiplier(50) == 1
+    a = Acceleration.from_config({"max_multiplier": 4, "curve": 1})
+    assert (a.min_speed, a.max_multiplier, a.multiplier(12)) == (4.0, 4, 2)
+
+
+def test_midi_encoder_scales_per_click_by_speed():
+    handler = MagicMock()
+    midiout = MagicMock()
+    enc, pins = _encoder(EncoderMidiControl, handler=handler, callback=None, midi_CC=70, midi_channel=0,
+                         midiout=midiout)
+    enc.midi_min, enc.midi_max, enc.midi_value = 0, 127, 0
+    enc.parameter = MagicMock()
+
+    _turn(enc, pins, 2, interval=0.5)
+    enc.read_rotary()
+    assert enc.midi_value == 2 * enc.per_click
+
+    _turn(enc, pins, 4, start=2.0, interval=0.05)  # 20 clicks/s: min to max in a flick
+    enc.read_rotary()
+    assert enc.midi_value == 127
+    assert midiout.send_message.call_count == 2  # one CC per poll, however many steps
+    handler.parameter_midi_change.assert_called_with(enc.parameter, 1 + 3 * 8)
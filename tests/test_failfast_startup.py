@@ -8,6 +8,7 @@ import pytest
 
 import common.token as Token
 from modalapi.pedalboard_monitor import write_last_json
+from tests.conftest import InlineRestWorker
 
 with patch("pistomp.settings.Settings.load_settings"), patch("pistomp.settings.Settings.set_setting"):
     from modalapi.modhandler import Modhandler
@@ -35,7 +36,7 @@ def test_modhandler_init_propagates_ws_bridge_construction_failure(tmp_path):
         patch("requests.get"),
         patch("requests.post"),
         patch("pistomp.settings.Settings"),
-        patch("modalapi.pedalboard.Pedalboard.load_bundle"),
+        patch("modalapi.pedalboard.Pedalboard.read_bundle", return_value={"plugins": []}),
         patch("modalapi.wifi.WifiManager"),
         patch("subprocess.check_output", return_value=b"SystemState=running"),
         patch("modalapi.modhandler.AsyncWebSocketBridge", side_effect=RuntimeError("bridge boom")),
@@ -55,10 +56,11 @@ def test_missing_last_json_recovery(tmp_path):
         patch("requests.get") as mock_get,
         patch("requests.post") as mock_post,
         patch("pistomp.settings.Settings"),
-        patch("modalapi.pedalboard.Pedalboard.load_bundle"),
+        patch("modalapi.pedalboard.Pedalboard.read_bundle", return_value={"plugins": []}),
         patch("modalapi.wifi.WifiManager"),
         patch("subprocess.check_output", return_value=b"SystemState=running"),
         patch("modalapi.modhandler.AsyncWebSocketBridge", return_value=MagicMock()),
+        patch("modalapi.modhandler.RestWorker", InlineRestWorker),
     ):
         def get_side_effect(url, **kwargs):
             resp = MagicMock()
@@ -119,7 +121,7 @@ def test_modhandler_init_propagates_ws_bridge_start_failure(tmp_path):
         patch("requests.get"),
         patch("requests.post"),
         patch("pistomp.settings.Settings"),
-        patch("modalapi.pedalboard.Pedalboard.load_bundle"),
+        patch("modalapi.pedalboard.Pedalboard.read_bundle", return_value={"plugins": []}),
         patch("modalapi.wifi.WifiManager"),
         patch("subprocess.check_output", return_value=b"SystemState=running"),
         patch("modalapi.modhandler.AsyncWebSocketBridge", return_value=failing_bridge),
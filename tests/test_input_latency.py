@@ -0,0 +1,93 @@
+"""Input latency: a switch edge timestamp carried through Footswitch.pressed, MIDI, WebSocket and LCD."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+import pistomp.latency as latency
+from modalapi.websocket_bridge import AsyncWebSocketBridge
+from pistomp.footswitch import Footswitch
+from pistomp.gpioswitch import GpioSwitch
+
+
+class _Button:
+    is_pressed = False
+    when_pressed = None
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats():
+    latency.reset()
+    yield
+    latency.reset()
+
+
+def _footswitch():
+    return Footswitch(1, None, None, 10, 0, MagicMock(), MagicMock())
+
+
+def test_press_records_each_hop_from_the_edge():
+    fs = _footswitch()
+    sw = GpioSwitch(0, 0, None, fs.pressed, button=_Button())
+    sw.button.is_pressed = True
+    sw._gpio_down(None)
+    time.sleep(0.01)
+    sw.button.is_pressed = False
+    sw.poll()
+
+    stats = latency.stats()
+    for hop in ("pressed", "midi", "lcd"):
+        assert stats[hop]["count"] == 1
+        assert stats[hop]["max_ms"] >= 10.0  # short presses act on release
+    assert stats["pressed"]["max_ms"] <= stats["midi"]["max_ms"] <= stats["lcd"]["max_ms"]
+    assert stats["ws_queued"]["count"] == 0
+    assert latency.active() is None
+
+
+def test_untraced_calls_record_nothing():
+    _footswitch().pressed(0)  # e.g. toggled from the LCD menu
+    assert all(s["count"] == 0 for s in latency.stats().values())
+
+
+def test_param_set_traced_until_written_to_websocket():
+    bridge = AsyncWebSocketBridge(ws_url="ws://localhost/test")
+    bridge.send_parameter("amp", "volume", 0.1)  # not from a press (another port, so not coalesced)
+    with latency.tracing(time.monotonic() - 0.002):
+        bridge.send_parameter("amp", "gain", 0.5)
+    assert latency.stats()["ws_queued"]["count"] == 1
+    assert len(bridge._worker.traced) == 1
+
+    worker = bridge._worker
+    sent = []
+
+    class _Ws:
+        async def send(self, msg):
+            sent.append(msg)
+            if len(sent) == 2:
+                worker.running = False
+
+    worker.running = True
+    asyncio.run(worker._process_queue(_Ws()))
+    assert len(sent) == 2
+    stats = latency.stats()["ws_sent"]
+    assert stats["count"] == 1 and stats["max_ms"] >= 2.0
+    assert worker.traced == {}
+
+
+def test_clear_queue_drops_traces():
+    bridge = AsyncWebSocketBridge(ws_url="ws://localhost/test")
+    with latency.tracing(time.monotonic()):
+        bridge.send_parameter("amp", "gain", 0.5)
+    bridge.clear_queue()
+    assert bridge._worker.traced == {}
+
+
+def test_summary_lists_hops():
+    latency.record("midi", 0.004)
+    text = latency.summary()
+    assert "midi" in text and "4.00" in text
@@ -0,0 +1,171 @@
+"""PedalboardCache: parsed bundle data persisted across boots, keyed by .ttl mtimes."""
+
+import json
+import os
+
+import pytest
+
+import modalapi.pedalboard_cache as pedalboard_cache
+from modalapi.pedalboard import Pedalboard
+from modalapi.pedalboard_cache import PedalboardCache, bundle_signature
+
+_DATA = {
+    "plugins": [
+        {
+            "instance_id": "BigMuff",
+            "uri": "http://example.org/bigmuff",
+            "ports": [
+                {"symbol": ":bypass", "value": 0, "binding": "14:60"},
+                {"symbol": "Tone", "value": 0.25, "binding": None},
+            ],
+        }
+    ]
+}
+
+_PLUGIN_DICT = {
+    "http://example.org/bigmuff": {
+        "category": ["Distortion"],
+        "ports": {
+            "control": {
+                "input": [
+                    {"shortName": "Tone", "symbol": "Tone", "ranges": {"minimum": 0.0, "maximum": 1.0}},
+                    {"shortName": "Level", "symbol": "Level", "ranges": {"minimum": 0.0, "maximum": 1.0}},
+                ]
+            }
+        },
+    }
+}
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    b = tmp_path / "rig.pedalboard"
+    b.mkdir()
+    (b / "manifest.ttl").write_text("")
+    (b / "rig.ttl").write_text("")
+    (b / "config.yml").write_text("")
+    return b
+
+
+def _touch(path, ns):
+    os.utime(path, ns=(ns, ns))
+
+
+def test_signature_covers_only_ttl_files(bundle):
+    sig = bundle_signature(str(bundle))
+    assert sig is not None
+    assert set(sig) == {"manifest.ttl", "rig.ttl"}
+
+
+def test_signature_none_for_missing_or_empty_bundle(tmp_path):
+    assert bundle_signature(str(tmp_path / "missing.pedalboard")) is None
+    assert bundle_signature(str(tmp_path)) is None
+
+
+def test_roundtrip_through_disk(bundle, tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = PedalboardCache(path)
+    sig = bundle_signature(str(bundle))
+    cache.put(str(bundle), sig, _DATA)
+    cache.save()
+
+    reloaded = PedalboardCache(path)
+    assert reloaded.get(str(bundle), bundle_signature(str(bundle))) == _DATA
+    assert reloaded.hits == 1
+
+
+def test_ttl_mtime_change_invalidates(bundle, tmp_path):
+    cache = PedalboardCache(str(tmp_path / "cache.json"))
+    cache.put(str(bundle), bundle_signature(str(bundle)), _DATA)
+
+    _touch(bundle / "rig.ttl", 123_000_000_000)
+    assert cache.get(str(bundle), bundle_signature(str(bundle))) is None
+    assert cache.misses == 1
+
+
+def test_non_ttl_change_keeps_entry(bundle, tmp_path):
+    cache = PedalboardCache(str(tmp_path / "cache.json"))
+    cache.put(str(bundle), bundle_signature(str(bundle)), _DATA)
+
+    _touch(bundle / "config.yml", 123_000_000_000)
+    assert cache.get(str(bundle), bundle_signature(str(bundle))) == _DATA
+
+
+def test_unvalidatable_bundle_not_stored(tmp_path):
+    cache = PedalboardCache(str(tmp_path / "cache.json"))
+    cache.put("/path/to/missing.pedalboard", None, _DATA)
+    assert "/path/to/missing.pedalboard" not in cache
+    cache.save()
+    assert not (tmp_path / "cache.json").exists()
+
+
+def test_other_version_discarded(bundle, tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text(
+        json.dumps(
+            {
+                "version": pedalboard_cache.CACHE_VERSION + 1,
+                "bundles": {str(bundle): {"signature": bundle_signature(str(bundle)), "data": _DATA}},
+            }
+        )
+    )
+    cache = PedalboardCache(str(path))
+    assert str(bundle) not in cache
+
+
+def test_corrupt_file_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    cache = PedalboardCache(str(path))
+    assert cache.get("/any", {"a.ttl": 1}) is None
+
+
+def test_prune_drops_unlisted_bundles(tmp_path):
+    cache = PedalboardCache(str(tmp_path / "cache.json"))
+    cache.put("/a.pedalboard", {"a.ttl": 1}, _DATA)
+    cache.put("/b.pedalboard", {"b.ttl": 1}, _DATA)
+    cache.prune(["/a.pedalboard"])
+    assert "/a.pedalboard" in cache
+    assert "/b.pedalboard" not in cache
+
+
+def test_load_bundle_skips_parse_on_hit(bundle, tmp_path, monkeypatch):
+    cache = PedalboardCache(str(tmp_path / "cache.json"))
+    cache.put(str(bundle), bundle_signature(str(bundle)), _DATA)
+
+    def fail_parse(self, bundlepath):
+        raise AssertionError("parse_bundle should not run on a cache hit")
+
+    monkeypatch.setattr(Pedalboard, "parse_bundle", fail_parse)
+    pb = Pedalboard("Rig", str(bundle))
+    pb.load_bundle(str(bundle), dict(_PLUGIN_DICT), cache)
+
+    assert [p.instance_id for p in pb.plugins] == ["BigMuff"]
+
+
+def test_load_bundle_parses_and_stores_on_miss(bundle, tmp_path, monkeypatch):
+    cache = PedalboardCache(str(tmp_path / "cache.json"))
+    calls = []
+
+    def fake_parse(self, bundlepath):
+        calls.append(bundlepath)
+        return _DATA
+
+    monkeypatch.setattr(Pedalboard, "parse_bundle", fake_parse)
+    Pedalboard("Rig", str(bundle)).load_bundle(str(bundle), dict(_PLUGIN_DICT), cache)
+    Pedalboard("Rig", str(bundle)).load_bundle(str(bundle), dict(_PLUGIN_DICT), cache)
+
+    assert calls == [str(bundle)]
+
+
+def test_load_data_builds_plugins_and_parameters():
+    pb = Pedalboard("Rig", "/rig.pedalboard")
+    pb.load_data(_DATA, dict(_PLUGIN_DICT))
+
+    plugin = pb.plugins[0]
+    assert plugin.category == "Distortion"
+    assert set(plugin.parameters) == {":bypass", "Tone"}
+    assert plugin.parameters[":bypass"].binding == "14:60"
+    assert plugin.parameters[":bypass"].value == 0.0
+    assert plugin.parameters["Tone"].value == 0.25
+    assert plugin.parameters["Tone"].maximum == 1.0
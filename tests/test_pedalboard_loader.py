@@ -0,0 +1,325 @@
+"""PedalboardLoader: stub pedalboards, background prefetch, on-demand loading."""
+
+import os
+import threading
+
+import pytest
+
+import modalapi.pedalboard as Pedalboard
+from modalapi.pedalboard_cache import PedalboardCache
+from modalapi.pedalboard_loader import PedalboardLoader
+
+
+def _data(bundle):
+    return {"plugins": [{"instance_id": bundle.strip("/"), "uri": None, "ports": []}]}
+
+
+class _Calls(list):
+    gate = None
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Records read_bundle calls; set reads.gate to hold the background thread."""
+    calls = _Calls()
+
+    def fake_read(self, bundlepath, cache=None):
+        gate = calls.gate
+        if gate is not None and threading.current_thread().name == "PedalboardPrefetch":
+            gate.wait(5)
+        calls.append(bundlepath)
+        return _data(bundlepath)
+
+    monkeypatch.setattr(Pedalboard.Pedalboard, "read_bundle", fake_read)
+    return calls
+
+
+@pytest.fixture
+def loader(tmp_path):
+    return PedalboardLoader({}, PedalboardCache(str(tmp_path / "cache.json")))
+
+
+def _stubs(loader, n):
+    return [loader.stub("Board %d" % i, "/b%d" % i, "http://localhost/") for i in range(n)]
+
+
+def test_stub_not_loaded_until_plugins_accessed(loader, reads):
+    pb = _stubs(loader, 1)[0]
+    assert not pb.loaded
+    assert reads == []
+
+    assert [p.instance_id for p in pb.plugins] == ["b0"]
+    assert pb.loaded
+    assert loader.on_demand == 1
+    pb.plugins
+    assert reads == ["/b0"]
+
+
+def test_background_loads_remaining_stubs_once(loader, reads):
+    pbs = _stubs(loader, 5)
+    loader.load(pbs[3])
+    loader.start(pbs, "http://localhost/")
+    loader.join(5)
+
+    assert all(pb.loaded for pb in pbs)
+    assert sorted(reads) == ["/b0", "/b1", "/b2", "/b3", "/b4"]
+    assert reads[0] == "/b3"
+    assert loader.on_demand == 0
+
+
+def test_on_demand_load_ahead_of_background(loader, reads):
+    reads.gate = threading.Event()
+    pbs = _stubs(loader, 4)
+    loader.start(pbs, "http://localhost/")
+
+    # Background thread is busy with /b0 when the main thread needs /b3: it waits for
+    # that one board, then /b3 is loaded ahead of /b1 and /b2
+    threading.Timer(0.05, reads.gate.set).start()
+    assert [p.instance_id for p in pbs[3].plugins] == ["b3"]
+    assert loader.on_demand == 1
+
+    loader.join(5)
+    assert all(pb.loaded for pb in pbs)
+    assert reads[:2] == ["/b0", "/b3"]
+    assert sorted(reads) == ["/b0", "/b1", "/b2", "/b3"]
+
+
+def test_assigned_plugins_not_overwritten(loader, reads):
+    pbs = _stubs(loader, 2)
+    pbs[1].plugins = []
+    loader.start(pbs, "http://localhost/")
+    loader.join(5)
+    assert pbs[1].plugins == []
+    assert reads == ["/b0"]
+
+
+def test_lookup_by_instance_id_loads_stub_and_follows_reassignment(loader, reads, make_plugin):
+    pb = _stubs(loader, 1)[0]
+    assert pb.get_plugin("b0").instance_id == "b0"
+    assert reads == ["/b0"]
+
+    # bind_current_pedalboard reorders by assigning a new list
+    fuzz, amp = make_plugin("fuzz"), make_plugin("amp")
+    pb.plugins = [fuzz, amp]
+    pb.plugins = [amp, fuzz]
+    assert pb.get_plugin("fuzz") is fuzz
+    assert pb.get_plugin("b0") is None
+    assert pb.get_parameter("amp", ":bypass") is amp.parameters[":bypass"]
+    assert pb.get_parameter("amp", "gain") is None
+
+
+def test_stop_abandons_background_loading(loader, reads):
+    reads.gate = threading.Event()
+    pbs = _stubs(loader, 3)
+    loader.start(pbs, "http://localhost/")
+    threading.Timer(0.05, reads.gate.set).start()
+    loader.stop()
+    assert not loader.running
+    assert len(reads) <= 1
+
+
+def test_failed_load_leaves_empty_board(loader, monkeypatch):
+    def broken(self, bundlepath, cache=None):
+        raise RuntimeError("bad ttl")
+
+    monkeypatch.setattr(Pedalboard.Pedalboard, "read_bundle", broken)
+    pb = _stubs(loader, 1)[0]
+    assert pb.plugins == []
+    assert pb.loaded
+
+
+def test_background_saves_cache(tmp_path, loader, monkeypatch):
+    monkeypatch.setattr(Pedalboard.Pedalboard, "parse_bundle", lambda self, bundlepath: _data(bundlepath))
+    bundles = []
+    for i in range(2):
+        b = tmp_path / ("b%d.pedalboard" % i)
+        b.mkdir()
+        (b / "manifest.ttl").write_text("")
+        bundles.append(str(b))
+    pbs = [loader.stub("B", b, "http://localhost/") for b in bundles]
+    loader.start(pbs, "http://localhost/")
+    loader.join(5)
+
+    assert all(b in PedalboardCache(str(tmp_path / "cache.json")) for b in bundles)
+
+
+def test_background_survives_mod_host_down(tmp_path, loader, monkeypatch):
+    def refused(url, headers=None):
+        raise Pedalboard.req.ConnectionError("refused")
+
+    data = {"plugins": [{"instance_id": "fx", "uri": "http://example.org/fx", "ports": []}]}
+    monkeypatch.setattr(Pedalboard.Pedalboard, "parse_bundle", lambda self, bundlepath: data)
+    monkeypatch.setattr(Pedalboard, "fetch_plugin_info", lambda uris, root_uri, max_workers=None: {})
+    monkeypatch.setattr(Pedalboard.req, "get", refused)
+    b = tmp_path / "b.pedalboard"
+    b.mkdir()
+    (b / "manifest.ttl").write_text("")
+    pb = loader.stub("B", str(b), "http://localhost/")
+    loader.start([pb], "http://localhost/")
+    loader.join(5)
+
+    # The board loads without the plugin's registry data, and the thread goes on to save the cache
+    assert [p.instance_id for p in pb.plugins] == ["fx"]
+    assert loader.plugin_dict == {}
+    assert str(b) in PedalboardCache(str(tmp_path / "cache.json"))
+
+
+# --- parallel parsing -------------------------------------------------------
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    bundles = []
+    for i in range(10):
+        b = tmp_path / ("p%d.pedalboard" % i)
+        b.mkdir()
+        (b / "manifest.ttl").write_text("")
+        bundles.append(str(b))
+    return bundles
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    """Runs the "worker processes" as threads, with a fake parse, recording what they parsed."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    parsed = []
+
+    def fake_worker(bundlepath):
+        if "broken" in bundlepath:
+            raise RuntimeError("bad ttl")
+        parsed.append(bundlepath)
+        return {"plugins": [{"instance_id": "fx", "uri": "http://example.org/fx", "ports": []}]}
+
+    monkeypatch.setattr(Pedalboard, "parse_pool", lambda workers: ThreadPoolExecutor(workers))
+    monkeypatch.setattr(Pedalboard, "_parse_in_worker", fake_worker)
+    return parsed
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    calls = []
+
+    def fake_fetch(uris, root_uri, max_workers=Pedalboard.FETCH_WORKERS):
+        calls.append(sorted(set(uris)))
+        return {u: {} for u in uris}
+
+    monkeypatch.setattr(Pedalboard, "fetch_plugin_info", fake_fetch)
+    return calls
+
+
+def test_default_parse_workers_leaves_one_core(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    assert Pedalboard.default_parse_workers() == 3
+    monkeypatch.setattr("os.cpu_count", lambda: 1)
+    assert Pedalboard.default_parse_workers() == 1
+
+
+def test_parse_workers_setting(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    assert Pedalboard.parse_workers_setting(None) == 3
+    assert Pedalboard.parse_workers_setting("2") == 2  # settings.yml may hold it as a string
+    assert Pedalboard.parse_workers_setting(0) == 1
+    assert Pedalboard.parse_workers_setting("many") == 3
+
+
+def test_parallel_parse_feeds_cache_and_loads(tmp_path, corpus, thread_pool, fetched, monkeypatch):
+    def no_inprocess_parse(self, bundlepath):
+        raise AssertionError("%s should come from the worker pool" % bundlepath)
+
+    monkeypatch.setattr(Pedalboard.Pedalboard, "parse_bundle", no_inprocess_parse)
+    loader = PedalboardLoader({}, PedalboardCache(str(tmp_path / "cache.json")), parse_workers=3)
+    pbs = [loader.stub("B", b, "http://localhost/") for b in corpus]
+    loader.start(pbs, "http://localhost/")
+    loader.join(5)
+
+    assert sorted(thread_pool) == sorted(corpus)
+    assert fetched == [["http://example.org/fx"]]
+    assert all([p.instance_id for p in pb.plugins] == ["fx"] for pb in pbs)
+    assert loader.pedalboard_cache.hits == len(corpus)
+
+
+def test_parallel_skipped_for_few_uncached(tmp_path, corpus, thread_pool, monkeypatch):
+    monkeypatch.setattr(Pedalboard.Pedalboard, "parse_bundle", lambda self, bundlepath: _data(bundlepath))
+    loader = PedalboardLoader({}, PedalboardCache(str(tmp_path / "cache.json")), parse_workers=3)
+    few = corpus[:3]
+    loader.start([loader.stub("B", b, "http://localhost/") for b in few], "http://localhost/")
+    loader.join(5)
+    assert thread_pool == []
+
+
+def test_worker_failure_falls_back_in_process(tmp_path, corpus, thread_pool, fetched, monkeypatch):
+    broken = os.path.join(os.path.dirname(corpus[0]), "broken.pedalboard")
+    os.mkdir(broken)
+    open(os.path.join(broken, "manifest.ttl"), "w").close()
+    monkeypatch.setattr(Pedalboard.Pedalboard, "parse_bundle", lambda self, bundlepath: _data(bundlepath))
+
+    loader = PedalboardLoader({}, PedalboardCache(str(tmp_path / "cache.json")), parse_workers=3)
+    pbs = [loader.stub("B", b, "http://localhost/") for b in corpus + [broken]]
+    loader.start(pbs, "http://localhost/")
+    loader.join(5)
+
+    assert broken not in thread_pool
+    assert [p.instance_id for p in pbs[-1].plugins] == [broken.strip("/")]
+
+
+def test_parse_bundles_yields_picklable_results_in_order(tmp_path, corpus, thread_pool):
+    import pickle
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(2) as pool:
+        results = list(Pedalboard.parse_bundles(corpus[:2], pool))
+    assert [b for b, _ in results] == corpus[:2]
+    for _, data in results:
+        assert pickle.loads(pickle.dumps(data)) == data
+
+
+# --- incremental sync with pedalboard/list ----------------------------------
+
+
+def _listing(*bundles):
+    return [{"title": "Title " + b, "bundle": b} for b in bundles]
+
+
+def test_sync_adds_keeps_and_removes_in_place(loader, reads):
+    pedalboards, pedalboard_list = {}, []
+    assert loader.sync(pedalboards, pedalboard_list, _listing("/a", "/b", "/c"), "http://localhost/") == (3, 0, 0)
+    a, b = pedalboards["/a"], pedalboards["/b"]
+    a.plugins
+
+    same_list = pedalboard_list
+    assert loader.sync(pedalboards, pedalboard_list, _listing("/a", "/d", "/b"), "http://localhost/") == (1, 0, 1)
+    assert pedalboard_list is same_list
+    assert [pb.bundle for pb in pedalboard_list] == ["/a", "/d", "/b"]
+    assert set(pedalboards) == {"/a", "/d", "/b"}
+    assert pedalboards["/a"] is a and a.loaded
+    assert pedalboards["/b"] is b
+    assert reads == ["/a"]
+
+
+def test_sync_ignores_duplicate_entries(loader):
+    pedalboards, pedalboard_list = {}, []
+    loader.sync(pedalboards, pedalboard_list, _listing("/a", "/a"), "http://localhost/")
+    loader.sync(pedalboards, pedalboard_list, _listing("/a"), "http://localhost/")
+    assert len(pedalboard_list) == 1
+
+
+def test_sync_replaces_modified_loaded_pedalboard(tmp_path, loader, monkeypatch):
+    monkeypatch.setattr(Pedalboard.Pedalboard, "parse_bundle", lambda self, bundlepath: _data(bundlepath))
+    bundle = tmp_path / "rig.pedalboard"
+    bundle.mkdir()
+    (bundle / "rig.ttl").write_text("")
+    pedalboards, pedalboard_list = {}, []
+    loader.sync(pedalboards, pedalboard_list, _listing(str(bundle)), "http://localhost/")
+    old = pedalboards[str(bundle)]
+    old.plugins
+
+    assert loader.sync(pedalboards, pedalboard_list, _listing(str(bundle)), "http://localhost/") == (0, 0, 0)
+    assert pedalboards[str(bundle)] is old
+
+    os.utime(bundle / "rig.ttl", ns=(123_000_000_000, 123_000_000_000))
+    assert loader.sync(pedalboards, pedalboard_list, _listing(str(bundle)), "http://localhost/") == (0, 1, 0)
+    new = pedalboards[str(bundle)]
+    assert new is not old and not new.loaded
+    assert pedalboard_list == [new]
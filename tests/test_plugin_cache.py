@@ -0,0 +1,128 @@
+"""PluginCache: effect/get responses persisted across boots, keyed by version/builder and LV2 bundle mtimes."""
+
+import os
+
+import pytest
+
+import modalapi.pedalboard as Pedalboard
+from modalapi.plugin_cache import PluginCache, plugin_key
+
+URI = "http://example.org/bigmuff"
+
+_DATA = {
+    "plugins": [
+        {"instance_id": "BigMuff", "uri": URI, "ports": [{"symbol": "Tone", "value": 0.25, "binding": None}]}
+    ]
+}
+
+
+@pytest.fixture
+def lv2_bundle(tmp_path):
+    b = tmp_path / "bigmuff.lv2"
+    b.mkdir()
+    (b / "manifest.ttl").write_text("")
+    (b / "bigmuff.ttl").write_text("")
+    return b
+
+
+@pytest.fixture
+def info(lv2_bundle):
+    return {
+        "uri": URI,
+        "version": "1.2",
+        "builder": 3,
+        "bundles": [str(lv2_bundle)],
+        "category": ["Distortion"],
+        "ports": {"control": {"input": [{"shortName": "Tone", "symbol": "Tone", "ranges": {"minimum": 0.0, "maximum": 1.0}}]}},
+    }
+
+
+@pytest.fixture
+def fetches(monkeypatch, info):
+    """Replaces effect/get with a counter returning the current `info`."""
+    calls = []
+
+    def fake_fetch(uris, root_uri, max_workers=Pedalboard.FETCH_WORKERS):
+        calls.extend(uris)
+        return {u: dict(info) for u in uris}
+
+    monkeypatch.setattr(Pedalboard, "fetch_plugin_info", fake_fetch)
+    monkeypatch.setattr(Pedalboard.Pedalboard, "read_bundle", lambda self, bundlepath, cache=None: _DATA)
+    return calls
+
+
+def _boot(path):
+    """What load_pedalboards does with the plugin cache, minus the HTTP and lilv."""
+    cache = PluginCache(path)
+    plugin_dict = {}
+    cache.seed(plugin_dict)
+    pb = Pedalboard.Pedalboard("Rig", "/rig.pedalboard", root_uri="http://localhost/")
+    Pedalboard.load_bundles([pb], plugin_dict)
+    cache.update(plugin_dict)
+    cache.save()
+    cache.refresh_in_background(pb.root_uri, plugin_dict)
+    cache.join()
+    return cache, plugin_dict, pb
+
+
+def test_key_includes_version_builder_and_bundle_mtimes(info, lv2_bundle):
+    key = plugin_key(info)
+    assert key["version"] == "1.2"
+    assert key["builder"] == 3
+    assert set(key["bundles"][str(lv2_bundle)]) == {"manifest.ttl", "bigmuff.ttl"}
+
+
+def test_warm_restart_makes_no_requests(tmp_path, fetches):
+    path = str(tmp_path / "plugins.json")
+    _boot(path)
+    assert fetches == [URI]
+
+    cache, plugin_dict, pb = _boot(path)
+    assert fetches == [URI]
+    assert cache.stale == []
+    assert plugin_dict[URI]["version"] == "1.2"
+    assert pb.plugins[0].parameters["Tone"].maximum == 1.0
+
+
+def test_bundle_change_refreshes_in_background(tmp_path, fetches, info, lv2_bundle):
+    path = str(tmp_path / "plugins.json")
+    _boot(path)
+
+    os.utime(lv2_bundle / "bigmuff.ttl", ns=(123_000_000_000, 123_000_000_000))
+    info["version"] = "1.3"
+    info["ports"]["control"]["input"][0]["ranges"]["maximum"] = 2.0
+    cache, plugin_dict, pb = _boot(path)
+
+    # The stale description was served to the pedalboard, then refreshed
+    assert pb.plugins[0].parameters["Tone"].maximum == 1.0
+    assert fetches == [URI, URI]
+    assert plugin_dict[URI]["version"] == "1.3"
+
+    _, plugin_dict, _ = _boot(path)
+    assert fetches == [URI, URI]
+    assert plugin_dict[URI]["version"] == "1.3"
+
+
+def test_entry_without_bundles_always_refreshed(tmp_path, fetches, info):
+    del info["bundles"]
+    path = str(tmp_path / "plugins.json")
+    _boot(path)
+    _boot(path)
+    assert fetches == [URI, URI]
+
+
+def test_save_only_when_changed(tmp_path, fetches):
+    path = tmp_path / "plugins.json"
+    _boot(str(path))
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    _boot(str(path))
+    assert path.stat().st_mtime_ns == 1_000_000_000
+
+
+def test_corrupt_file_ignored(tmp_path):
+    path = tmp_path / "plugins.json"
+    path.write_text("{not json")
+    cache = PluginCache(str(path))
+    plugin_dict = {}
+    cache.seed(plugin_dict)
+    assert plugin_dict == {}
@@ -0,0 +1,143 @@
+"""Concurrent effect/get fetching during pedalboard load, against a local stand-in for mod-ui."""
+
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import modalapi.pedalboard as Pedalboard
+
+DELAY = 0.05
+
+
+def _plugin_info(uri):
+    return {
+        "category": ["Distortion"],
+        "ports": {"control": {"input": [{"shortName": "Tone", "symbol": "Tone", "ranges": {"minimum": 0.0, "maximum": 1.0}}]}},
+        "uri": uri,
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.connections = set()
+
+    @property
+    def root_uri(self):
+        return "http://127.0.0.1:%d/" % self.server_address[1]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        uri = urllib.parse.parse_qs(url.query)["uri"][0]
+        with self.server.lock:
+            self.server.requests.append(uri)
+            self.server.connections.add(self.client_address)
+        time.sleep(DELAY)
+        body = json.dumps(_plugin_info(uri)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    s = _Server()
+    t = threading.Thread(target=s.serve_forever, daemon=True)
+    t.start()
+    yield s
+    s.shutdown()
+    s.server_close()
+
+
+def _uris(n):
+    return ["http://example.org/plugin/%d" % i for i in range(n)]
+
+
+def test_each_distinct_uri_fetched_once(server):
+    uris = _uris(6)
+    plugin_dict = {}
+    added = Pedalboard.fetch_plugin_data(uris + uris[:3], plugin_dict, server.root_uri)
+
+    assert added == 6
+    assert sorted(server.requests) == sorted(uris)
+    assert plugin_dict[uris[0]]["uri"] == uris[0]
+
+
+def test_known_uris_skipped(server):
+    uris = _uris(4)
+    plugin_dict = {uris[0]: _plugin_info(uris[0]), uris[1]: _plugin_info(uris[1])}
+    Pedalboard.fetch_plugin_data(uris, plugin_dict, server.root_uri)
+
+    assert sorted(server.requests) == uris[2:]
+    assert Pedalboard.fetch_plugin_data(uris, plugin_dict, server.root_uri) == 0
+    assert len(server.requests) == 2
+
+
+def test_failed_fetch_left_out(server):
+    plugin_dict = {}
+    added = Pedalboard.fetch_plugin_data(["http://example.org/a"], plugin_dict, "http://127.0.0.1:1/")
+    assert added == 0
+    assert plugin_dict == {}
+
+
+def test_concurrent_faster_than_serial_with_bounded_connections(server):
+    uris = _uris(16)
+
+    start = time.perf_counter()
+    Pedalboard.fetch_plugin_data(uris, {}, server.root_uri, max_workers=1)
+    serial = time.perf_counter() - start
+    assert len(server.connections) == 1
+
+    server.requests.clear()
+    server.connections.clear()
+    start = time.perf_counter()
+    Pedalboard.fetch_plugin_data(uris, {}, server.root_uri, max_workers=8)
+    concurrent = time.perf_counter() - start
+
+    assert len(server.requests) == 16
+    assert len(server.connections) <= 8
+    assert concurrent * 2 < serial, "serial %.3fs, concurrent %.3fs" % (serial, concurrent)
+
+
+def test_load_bundles_fetches_before_building(server, monkeypatch):
+    uris = _uris(3)
+    datas = {
+        "/a.pedalboard": {"plugins": [{"instance_id": "A", "uri": uris[0], "ports": [{"symbol": "Tone", "value": 0.5, "binding": None}]}]},
+        "/b.pedalboard": {
+            "plugins": [
+                {"instance_id": "B1", "uri": uris[0], "ports": []},
+                {"instance_id": "B2", "uri": uris[2], "ports": []},
+            ]
+        },
+    }
+    monkeypatch.setattr(Pedalboard.Pedalboard, "read_bundle", lambda self, bundlepath, cache=None: datas[bundlepath])
+
+    def no_serial_fetch(self, uri):
+        raise AssertionError("load_data should find %s already fetched" % uri)
+
+    monkeypatch.setattr(Pedalboard.Pedalboard, "get_plugin_data", no_serial_fetch)
+
+    pbs = [Pedalboard.Pedalboard(b, b, root_uri=server.root_uri) for b in datas]
+    plugin_dict = {}
+    Pedalboard.load_bundles(pbs, plugin_dict)
+
+    assert sorted(server.requests) == [uris[0], uris[2]]
+    assert [p.instance_id for p in pbs[1].plugins] == ["B1", "B2"]
+    assert pbs[0].plugins[0].parameters["Tone"].value == 0.5
@@ -0,0 +1,111 @@
+"""RestWorker: loads run off the main thread, results arrive via poll(), and a queued load is replaced by a newer one."""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from modalapi.rest_worker import RestWorker
+
+
+class _Session:
+    """requests.Session stand-in whose GETs block until released."""
+
+    def __init__(self):
+        self.urls = []
+        self.release = threading.Event()
+        self.entered = threading.Event()
+        self.closed = False
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        self.entered.set()
+        self.release.wait(2.0)
+        return MagicMock(status_code=200, text="{}")
+
+    def post(self, url, json=None, data=None, timeout=None):
+        self.urls.append(url)
+        return MagicMock(status_code=200, text="{}")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def session():
+    return _Session()
+
+
+@pytest.fixture
+def worker(session):
+    w = RestWorker(session=session)
+    yield w
+    session.release.set()
+    w.shutdown()
+
+
+def _load(url):
+    return lambda rest: rest.get(url).status_code == 200
+
+
+def test_submit_does_not_block_and_results_arrive_on_poll(worker, session):
+    done = []
+    worker.submit("snapshot", _load("snapshot/load?id=1"), done.append)
+    assert session.entered.wait(2.0)
+    assert worker.busy()
+    worker.poll()
+    assert done == []  # still in flight
+
+    session.release.set()
+    assert worker.wait_idle(2.0)
+    assert done == []  # callbacks only run in poll()
+    worker.poll()
+    assert done == [True]
+
+
+def test_queued_load_of_same_kind_is_replaced(worker, session):
+    done = []
+    worker.submit("snapshot", _load("snapshot/load?id=1"), lambda ok: done.append(1))
+    assert session.entered.wait(2.0)
+    # Triple-tap while id=1 loads: 2 is queued, then replaced by 3
+    assert worker.submit("snapshot", _load("snapshot/load?id=2"), lambda ok: done.append(2))
+    assert not worker.submit("snapshot", _load("snapshot/load?id=3"), lambda ok: done.append(3))
+
+    session.release.set()
+    assert worker.wait_idle(2.0)
+    worker.poll()
+    assert session.urls == ["snapshot/load?id=1", "snapshot/load?id=3"]
+    assert done == [1, 3]
+    assert (worker.submitted, worker.superseded) == (3, 1)
+
+
+def test_kinds_run_in_submission_order_and_cancel(worker, session):
+    worker.submit("snapshot", _load("snapshot/load?id=1"))
+    assert session.entered.wait(2.0)
+    worker.submit("snapshot", _load("snapshot/load?id=2"))
+    worker.submit("pedalboard", lambda rest: rest.post("pedalboard/load_bundle/", data={}))
+    assert worker.cancel("snapshot")
+    assert not worker.cancel("snapshot")
+
+    session.release.set()
+    assert worker.wait_idle(2.0)
+    assert session.urls == ["snapshot/load?id=1", "pedalboard/load_bundle/"]
+
+
+def test_failures_are_logged_and_delivered(worker, session, caplog):
+    session.release.set()
+    session.get = MagicMock(side_effect=ConnectionError("refused"))
+    done = []
+    worker.submit("snapshot", _load("snapshot/load?id=1"), done.append)
+    assert worker.wait_idle(2.0)
+    worker.poll()
+    assert "REST GET failed" in caplog.text
+    assert isinstance(done[0], AttributeError)  # the job's own error, from None.status_code
+    assert "REST snapshot failed" in caplog.text
+
+
+def test_shutdown_closes_session(session):
+    worker = RestWorker(session=session)
+    worker.shutdown()
+    assert session.closed
+    assert not worker._worker.is_alive()
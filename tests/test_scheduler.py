@@ -0,0 +1,200 @@
+"""Scheduler: deadline ordering, drift, overruns, control-first polling and loop stats, on a fake clock."""
+
+import time
+
+import pytest
+
+from pistomp.handler import Handler
+from pistomp.scheduler import PRIORITY_CONTROLS, PRIORITY_LOW, PRIORITY_NORMAL, DurationWindow, Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sched(clock):
+    return Scheduler(clock=clock, sleep=clock.sleep)
+
+
+def _work(clock, log, name, seconds=0.0):
+    def fn():
+        log.append((name, round(clock.now, 6)))
+        clock.now += seconds
+    return fn
+
+
+def run_until(sched, clock, t):
+    """Run everything due up to and including time t."""
+    while True:
+        wait = sched.run_pending()
+        if clock.now + wait > t + 1e-9:
+            return
+        clock.sleep(wait)
+
+
+def test_periods_do_not_drift_with_work_time(sched, clock):
+    log = []
+    sched.add("poll", _work(clock, log, "poll", 0.004), 0.01)
+    run_until(sched, clock, 1.0)
+    starts = [t for _, t in log]
+    assert starts[:3] == [0.01, 0.02, 0.03]
+    assert len(starts) == 100  # a sleep-after-work loop would manage ~71
+
+
+def test_due_tasks_run_by_priority(sched, clock):
+    log = []
+    sched.add("lcd", _work(clock, log, "lcd"), 0.05, PRIORITY_NORMAL)
+    sched.add("wifi", _work(clock, log, "wifi"), 0.05, PRIORITY_LOW)
+    sched.add("controls", _work(clock, log, "controls"), 0.05, PRIORITY_CONTROLS)
+    clock.now = 0.05
+    sched.run_pending()
+    assert [n for n, _ in log] == ["controls", "lcd", "wifi"]
+
+
+def test_controls_polled_again_after_a_slow_task(sched, clock):
+    log = []
+    sched.add("controls", _work(clock, log, "controls", 0.001), 0.01, PRIORITY_CONTROLS)
+    sched.add("lcd", _work(clock, log, "lcd", 0.03), 0.04, PRIORITY_NORMAL)
+    sched.add("wifi", _work(clock, log, "wifi"), 0.04, PRIORITY_LOW)
+    clock.now = 0.04
+    sched.run_pending()
+    # wifi waits for the controls poll that came due during the LCD flush
+    assert [n for n, _ in log] == ["controls", "lcd", "controls", "wifi"]
+
+
+def test_fallen_behind_task_skips_missed_runs(sched, clock):
+    log = []
+    slow = sched.add("lcd", _work(clock, log, "lcd", 0.035), 0.01)
+    clock.now = 0.01
+    sched.run_pending()
+    assert slow.overruns == 1
+    assert slow.skipped == 3
+    assert slow.due == pytest.approx(0.05)
+    assert slow.max_duration == pytest.approx(0.035)
+
+
+def test_lateness_recorded(sched, clock):
+    task = sched.add("poll", lambda: None, 0.01)
+    clock.now = 0.013
+    sched.run_pending()
+    assert task.max_late == pytest.approx(0.003)
+    assert task.due == pytest.approx(0.02)
+
+
+def test_set_period_reschedules_from_last_run(sched, clock):
+    log = []
+    lcd = sched.add("lcd", _work(clock, log, "lcd"), 0.2)
+    run_until(sched, clock, 0.2)
+    sched.set_period(lcd, 0.02)
+    assert lcd.due == pytest.approx(0.22)
+    run_until(sched, clock, 0.3)
+    assert [t for _, t in log] == pytest.approx([0.2, 0.22, 0.24, 0.26, 0.28, 0.3])
+
+
+def test_delay_and_bad_period(sched, clock):
+    task = sched.add("system_info", lambda: None, 60.0, delay=0.0)
+    assert task.due == 0.0
+    assert sched.get_task("system_info") is task
+    with pytest.raises(ValueError):
+        sched.add("broken", lambda: None, 0)
+
+
+def test_run_forever_sleeps_until_deadline_and_stops(sched, clock):
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(round(seconds, 6))
+        clock.sleep(seconds)
+
+    sched._sleep = sleep
+    task = sched.add("poll", lambda: sched.stop() if task.runs >= 2 else None, 0.01)
+    sched.run_forever()
+    assert task.runs == 3
+    assert sleeps == [0.01, 0.01, 0.01]
+
+
+def test_exception_propagates_and_task_stays_scheduled(sched, clock):
+    def boom():
+        raise RuntimeError("boom")
+
+    task = sched.add("boom", boom, 0.01)
+    clock.now = 0.01
+    with pytest.raises(RuntimeError):
+        sched.run_pending()
+    assert task.runs == 1
+    assert task.due == pytest.approx(0.02)
+
+
+def test_duration_percentiles_over_recent_window():
+    window = DurationWindow(size=100)
+    assert window.percentiles()["p99"] == 0.0
+    for ms in range(1, 101):
+        window.record(ms / 1000)
+    p = window.percentiles()
+    assert (p["p50"], p["p95"], p["p99"], p["max"]) == (0.05, 0.095, 0.099, 0.1)
+    for _ in range(100):  # old samples roll out
+        window.record(0.001)
+    assert window.percentiles()["max"] == 0.001
+
+
+def test_stats_report_overruns_against_budget(sched, clock):
+    sched.add("lcd", _work(clock, [], "lcd", 0.006), 0.04, budget=0.005)
+    run_until(sched, clock, 0.2)
+    stats = sched.stats()["lcd"]
+    assert stats["runs"] == 5
+    assert stats["overruns"] == 5
+    assert stats["p99_ms"] == pytest.approx(6.0)
+    assert stats["budget_ms"] == 5.0
+    assert "lcd" in sched.summary()
+
+
+def test_instrumentation_overhead_is_microseconds():
+    sched = Scheduler()
+    for i in range(7):
+        sched.add(f"t{i}", lambda: None, 1e-6, delay=0.0)
+    passes = 2000
+    start = time.perf_counter()
+    for _ in range(passes):
+        sched.run_pending()
+    per_task = (time.perf_counter() - start) / (passes * 7)
+    assert per_task < 50e-6  # ~5 us on a desktop, including the scheduling itself
+
+
+class _Host(Handler):
+    def poll_controls(self): pass
+    def poll_indicators(self): pass
+    def poll_lcd_updates(self): pass
+    def poll_modui_changes(self): pass
+    def poll_wifi(self): pass
+    def poll_system_info(self): pass
+
+
+def test_handler_loop_stats_and_debug_summary(clock, caplog):
+    host = _Host()
+    assert host.get_loop_stats() == {}
+    sched = Scheduler(clock=clock, sleep=clock.sleep)
+    host.add_poll_tasks(sched)
+    run_until(sched, clock, 60.0)
+
+    stats = host.get_loop_stats()
+    assert list(stats) == ["controls", "ws_messages", "indicators", "rest_results", "lcd", "modui_changes", "wifi",
+                           "system_info", "loop_stats"]
+    assert stats["controls"]["runs"] == 6000
+    assert stats["system_info"]["runs"] == 1
+
+    with caplog.at_level("DEBUG"):
+        host.log_loop_stats()
+    assert "Main loop" in caplog.text and "controls" in caplog.text
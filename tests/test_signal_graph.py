@@ -0,0 +1,93 @@
+"""signal_graph.build: plugin order and adjacency from ingen arcs."""
+
+import sys
+
+from modalapi.pedalboard import Pedalboard
+from modalapi.signal_graph import SignalGraph, build
+
+
+def _board(blocks, links, inputs=("A",), outputs=()):
+    """links are (tail block, head block); inputs/outputs connect to capture_1/playback_1."""
+    port_owner = {}
+    for b in blocks:
+        port_owner[f"{b}/in"] = b
+        port_owner[f"{b}/out"] = b
+    arcs = [(f"{t}/out", f"{h}/in") for t, h in links]
+    arcs += [("capture_1", f"{b}/in") for b in inputs]
+    arcs += [(f"{b}/out", "playback_1") for b in outputs]
+    return list(blocks), port_owner, arcs
+
+
+def test_serial_chain_in_signal_order():
+    blocks, owner, arcs = _board(["C", "A", "B"], [("A", "B"), ("B", "C")], outputs=["C"])
+    g = build(blocks, owner, arcs)
+    assert g.order == ["A", "B", "C"]
+    assert g.inputs == ["A"]
+    assert g.outputs == ["C"]
+    assert g.successors("A") == ["B"]
+    assert g.predecessors("C") == ["B"]
+    assert not g.is_parallel()
+
+
+def test_parallel_branches_listed_contiguously():
+    # A splits into B1 -> B2 and C1 -> C2, merging at D
+    links = [("A", "B1"), ("B1", "B2"), ("B2", "D"), ("A", "C1"), ("C1", "C2"), ("C2", "D")]
+    blocks, owner, arcs = _board(["D", "C2", "C1", "B2", "B1", "A"], links, outputs=["D"])
+    g = build(blocks, owner, arcs)
+    assert g.order == ["A", "B1", "B2", "C1", "C2", "D"]
+    assert g.is_parallel()
+
+
+def test_unreachable_plugins_follow_reachable_ones():
+    # M feeds S but nothing from capture reaches either; X is disconnected. Sources in block order
+    blocks, owner, arcs = _board(["X", "S", "M", "A"], [("M", "S")])
+    g = build(blocks, owner, arcs)
+    assert g.order == ["A", "X", "M", "S"]
+
+
+def test_cycle_does_not_hang_or_drop_plugins():
+    blocks, owner, arcs = _board(["A", "B", "C"], [("B", "C"), ("C", "B")])
+    g = build(blocks, owner, arcs)
+    assert sorted(g.order) == ["A", "B", "C"]
+    assert g.order[0] == "A"
+
+
+def test_deep_chain_is_not_recursive():
+    n = sys.getrecursionlimit() * 2
+    blocks = [f"b{i}" for i in range(n)]
+    _, owner, arcs = _board(blocks, list(zip(blocks, blocks[1:])), inputs=["b0"])
+    g = build(list(reversed(blocks)), owner, arcs)
+    assert g.order == blocks
+
+
+def test_self_and_duplicate_links_ignored():
+    blocks, owner, arcs = _board(["A", "B"], [("A", "B"), ("A", "B"), ("B", "B")])
+    owner["A/out2"] = "A"
+    arcs.append(("A/out2", "B/in"))
+    g = build(blocks, owner, arcs)
+    assert g.edges == [("A", "B")]
+
+
+def test_data_roundtrip():
+    blocks, owner, arcs = _board(["A", "B", "C"], [("A", "B"), ("A", "C")], outputs=["B", "C"])
+    g = build(blocks, owner, arcs)
+    again = SignalGraph.from_data(g.to_data())
+    assert again.order == g.order
+    assert again.edges == g.edges
+    assert again.outputs == ["B", "C"]
+    assert SignalGraph.from_data(None) is None
+
+
+def test_pedalboard_exposes_graph():
+    blocks, owner, arcs = _board(["A", "B"], [("A", "B")])
+    data = {
+        "plugins": [{"instance_id": b, "uri": None, "ports": []} for b in ("A", "B")],
+        "graph": build(blocks, owner, arcs).to_data(),
+    }
+    pb = Pedalboard("Rig", "/rig.pedalboard")
+    pb.load_data(data, {})
+    assert pb.graph.successors("A") == ["B"]
+
+    old = Pedalboard("Old", "/old.pedalboard")
+    old.load_data({"plugins": []}, {})
+    assert old.graph is None
@@ -0,0 +1,85 @@
+"""StartupTracer: per-phase wall/CPU time, HTTP requests and file reads."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from pistomp.startup_trace import TIMELINE_FILE, StartupTracer
+
+
+class _Ok(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Ok)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}/"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_phases_count_http_requests(server):
+    trace = StartupTracer()
+    with trace.phase("list"):
+        requests.get(server + "pedalboard/list")
+        requests.post(server + "reset", data="x" * 100)
+    with trace.phase("idle"):
+        pass
+    assert [(p["name"], p["http"]) for p in trace.phases] == [("list", 2), ("idle", 0)]
+
+
+def test_phases_count_files_read_not_written(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    trace = StartupTracer()
+    with trace.phase("read"):
+        for _ in range(3):
+            with open(tmp_path / "a.json") as f:
+                f.read()
+        with open(tmp_path / "b.json", "w") as f:
+            f.write("{}")
+    assert trace.phases[0]["files"] == 3
+
+
+def test_phase_recorded_when_it_raises():
+    trace = StartupTracer()
+    with pytest.raises(ValueError):
+        with trace.phase("boom"):
+            raise ValueError()
+    assert trace.phases[0]["name"] == "boom"
+    assert trace.phases[0]["wall"] >= 0
+
+
+def test_finish_writes_timeline(tmp_path, caplog):
+    trace = StartupTracer()
+    with trace.phase("config load"):
+        pass
+    with trace.phase("load_pedalboards"):
+        pass
+    with caplog.at_level("INFO"):
+        trace.finish(str(tmp_path))
+    assert "load_pedalboards" in caplog.text
+
+    timeline = json.loads((tmp_path / TIMELINE_FILE).read_text())
+    assert [p["name"] for p in timeline["phases"]] == ["config load", "load_pedalboards"]
+    assert timeline["phases"][1]["start"] >= timeline["phases"][0]["start"]
+    assert set(timeline["phases"][0]) == {"name", "start", "wall", "cpu", "http", "files"}
+
+
+def test_write_to_missing_dir_is_not_fatal(tmp_path):
+    assert StartupTracer().write(str(tmp_path / "missing")) is None
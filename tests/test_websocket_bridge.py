@@ -2,8 +2,11 @@
 
 import asyncio
 import queue
+import threading
+import time
+from unittest.mock import MagicMock
 
-from modalapi.websocket_bridge import AsyncWebSocketBridge, WebSocketWorker
+from modalapi.websocket_bridge import PRIORITY_BACKGROUND, PRIORITY_DISCRETE, AsyncWebSocketBridge, WebSocketWorker
 
 
 # ---------------------------------------------------------------------------
@@ -231,3 +234,212 @@ def test_multiple_sends_preserve_order():
         "transport-bpm 60",
         "param_set /graph/b/y 2.0",
     ]
+
+
+# ---------------------------------------------------------------------------
+# Tier 3: outbound wakeup (worker thread asleep until a send)
+# ---------------------------------------------------------------------------
+
+
+def _wait_until(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def _start_sender(worker: WebSocketWorker, ws: _FakeWs) -> threading.Thread:
+    """Run _process_queue on its own thread and loop, as the bridge does."""
+    async def main():
+        worker._bind_loop()
+        await worker._process_queue(ws)
+
+    worker.running = True
+    thread = threading.Thread(target=lambda: asyncio.run(main()), daemon=True)
+    thread.start()
+    return thread
+
+
+def test_idle_worker_sleeps_until_a_send_wakes_it():
+    worker = _make_worker()
+    ws = _FakeWs([])
+    thread = _start_sender(worker, ws)
+    assert _wait_until(lambda: worker.waiting)
+    time.sleep(0.05)
+    assert worker.wakeups == 1  # one sleep, not one per millisecond
+
+    for i in range(3):
+        worker.command_queue.put(f"transport-bpm {i}")
+        worker.notify()
+        assert _wait_until(lambda: len(ws._sent) == i + 1)
+    assert ws._sent == ["transport-bpm 0", "transport-bpm 1", "transport-bpm 2"]
+
+    worker.running = False
+    worker.notify(force=True)
+    thread.join(timeout=1.0)
+    assert not thread.is_alive()
+
+
+def test_process_queue_binds_its_own_loop():
+    worker = _make_worker()
+    ws = _FakeWs([])
+
+    async def main():
+        worker.running = True
+        task = asyncio.ensure_future(worker._process_queue(ws))
+        await asyncio.sleep(0.01)
+        assert worker.waiting and worker.loop is asyncio.get_running_loop()
+        worker.command_queue.put("transport-bpm 90")
+        worker.notify()
+        await asyncio.sleep(0.01)
+        worker.running = False
+        worker.notify(force=True)
+        await asyncio.wait_for(task, 1.0)
+
+    asyncio.run(main())
+    assert ws._sent == ["transport-bpm 90"]
+    assert worker.wakeups == 2
+
+
+def test_notify_while_draining_does_not_touch_the_loop():
+    worker = _make_worker()
+    worker.loop = MagicMock()
+    worker.loop.is_closed.return_value = False
+    worker.wakeup = MagicMock()
+    worker.waiting = False
+    worker.notify()
+    worker.loop.call_soon_threadsafe.assert_not_called()
+    worker.waiting = True
+    worker.notify()
+    worker.loop.call_soon_threadsafe.assert_called_once_with(worker.wakeup.set)
+
+
+def test_bridge_sends_notify_the_worker():
+    bridge = _make_bridge()
+    bridge._worker.notify = MagicMock()
+    bridge.send_parameter("a", "x", 1.0)
+    bridge.send_bpm(90)
+    assert bridge._worker.notify.call_count == 2
+
+
+# ---------------------------------------------------------------------------
+# Tier 4: latest-value-wins coalescing
+# ---------------------------------------------------------------------------
+
+
+def test_queued_param_set_is_overwritten_in_place():
+    bridge = _make_bridge()
+    bridge.send_parameter("amp", "gain", 0.1)
+    bridge.send_parameter("delay", "mix", 0.5)
+    bridge.send_parameter("amp", "gain", 0.2)
+    bridge.send_parameter("amp", "gain", 0.3)
+    assert _drain(bridge) == ["param_set /graph/amp/gain 0.3", "param_set /graph/delay/mix 0.5"]
+    assert bridge.messages_coalesced == 2
+    assert bridge.get_stats()["messages_coalesced"] == 2
+
+
+def test_bpm_is_never_coalesced():
+    bridge = _make_bridge()
+    bridge.send_bpm(100)
+    bridge.send_parameter("amp", "gain", 0.1)
+    bridge.send_bpm(120)
+    bridge.send_parameter("amp", "gain", 0.2)
+    assert _drain(bridge) == ["transport-bpm 100", "param_set /graph/amp/gain 0.2", "transport-bpm 120"]
+
+
+def test_sent_values_are_not_coalesced_with_later_ones():
+    bridge = _make_bridge()
+    bridge.send_parameter("amp", "gain", 0.1)
+    assert _drain(bridge) == ["param_set /graph/amp/gain 0.1"]
+    bridge.send_parameter("amp", "gain", 0.2)
+    assert _drain(bridge) == ["param_set /graph/amp/gain 0.2"]
+    assert bridge.messages_coalesced == 0
+
+
+def test_coalesced_message_keeps_the_earlier_press_for_latency():
+    import pistomp.latency as latency
+
+    bridge = _make_bridge()
+    with latency.tracing(100.0):
+        bridge.send_parameter("amp", ":bypass", 1.0)
+    bridge.send_parameter("amp", ":bypass", 0.0)
+    msg = bridge.command_queue.get_nowait()
+    assert bridge._worker.traced == {id(msg): 100.0}
+
+
+class _SlowWs(_FakeWs):
+    """Takes 1 ms per send, like a busy mod-ui."""
+
+    async def send(self, msg: str) -> None:
+        await asyncio.sleep(0.001)
+        self._sent.append(msg)
+
+
+def test_queue_depth_stays_bounded_during_a_continuous_sweep():
+    bridge = _make_bridge()
+    ws = _SlowWs([])
+    thread = _start_sender(bridge._worker, ws)
+    ports = [("expr", "volume"), ("wah", "freq"), ("delay", "mix")]
+
+    depths = []
+    sends = 20000
+    for i in range(sends):
+        instance, symbol = ports[i % len(ports)]
+        bridge.send_parameter(instance, symbol, i)
+        depths.append(bridge.get_queue_depth())
+    assert _wait_until(lambda: bridge.get_queue_depth() == 0 and bridge._worker.waiting)
+
+    bridge._worker.running = False
+    bridge._worker.notify(force=True)
+    thread.join(timeout=1.0)
+
+    # A FIFO would have grown toward `sends`; coalesced, there is at most one message per port
+    assert max(depths) <= len(ports)
+    assert len(ws._sent) < sends / 10
+    assert bridge.messages_coalesced + len(ws._sent) == sends
+    last = {}
+    for m in ws._sent:
+        path, value = m.split(" ")[1:]
+        last[path] = float(value)
+    assert last == {"/graph/expr/volume": 19998.0, "/graph/wah/freq": 19999.0, "/graph/delay/mix": 19997.0}
+
+
+# ---------------------------------------------------------------------------
+# Tier 5: priority lanes
+# ---------------------------------------------------------------------------
+
+
+def test_bypass_jumps_ahead_of_a_queued_blend_flood():
+    bridge = _make_bridge()
+    for i in range(200):
+        bridge.send_parameter("blend", f"p{i}", 0.5)
+    bridge.send_parameter("fuzz", ":bypass", 1.0, PRIORITY_DISCRETE)
+    bridge.send_parameter("reverb", "decay", 0.2, PRIORITY_BACKGROUND)
+    sent = _drain(bridge)
+    assert sent[0] == "param_set /graph/fuzz/:bypass 1.0"
+    assert sent[-1] == "param_set /graph/reverb/decay 0.2"
+    assert len(sent) == 202
+
+
+def test_newer_value_in_another_lane_replaces_the_queued_one():
+    bridge = _make_bridge()
+    bridge.send_parameter("amp", "gain", 0.1, PRIORITY_BACKGROUND)
+    bridge.send_parameter("delay", "mix", 0.3)
+    bridge.send_parameter("amp", "gain", 0.9, PRIORITY_DISCRETE)
+    assert bridge.command_queue.lane_depths() == [1, 1, 0]
+    assert _drain(bridge) == ["param_set /graph/amp/gain 0.9", "param_set /graph/delay/mix 0.3"]
+    assert bridge.messages_coalesced == 1
+
+
+def test_backpressure_sheds_only_the_background_lane():
+    bridge = _make_bridge()
+    bridge._worker.backpressure_active = True
+    assert not bridge.send_parameter("blend", "const", 0.5, PRIORITY_BACKGROUND)
+    assert bridge.send_parameter("blend", "sweep", 0.5)
+    assert bridge.send_parameter("fuzz", ":bypass", 0.0, PRIORITY_DISCRETE)
+    assert bridge.send_bpm(120)
+    assert bridge.get_stats()["messages_shed"] == 1
+    assert _drain(bridge) == ["param_set /graph/fuzz/:bypass 0.0", "param_set /graph/blend/sweep 0.5",
+                              "transport-bpm 120"]
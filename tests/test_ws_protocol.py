@@ -14,6 +14,7 @@ from modalapi.ws_protocol import (
     TransportMessage,
     TrueBypassMessage,
     UnknownMessage,
+    coalesce_messages,
     parse_message,
 )
 
@@ -315,3 +316,30 @@ def test_malformed_pedal_snapshot_non_int():
 def test_empty_string():
     msg = parse_message("")
     assert isinstance(msg, UnknownMessage)
+
+
+# ---------------------------------------------------------------------------
+# coalesce_messages
+# ---------------------------------------------------------------------------
+
+
+def test_coalesce_keeps_last_value_per_port_and_plugin():
+    msgs = [parse_message(m) for m in (
+        "param_set /graph/amp gain 0.1",
+        "param_set /graph/amp :bypass 1",
+        "loading_end 2",
+        "param_set /graph/amp gain 0.3",
+        "param_set /graph/amp level 0.5",
+        "add amp http://uri 0.0 0.0 0 1 1",
+    )]
+    assert coalesce_messages(msgs) == [
+        LoadingEndMessage(snapshot_id=2),
+        ParamSetMessage(instance="amp", symbol="gain", value=0.3),
+        ParamSetMessage(instance="amp", symbol="level", value=0.5),
+        AddPluginMessage(instance="amp", bypassed=False),
+    ]
+
+
+def test_coalesce_leaves_other_messages_alone():
+    msgs = [parse_message(m) for m in ("loading_start 0", "loading_start 0", "pedal_snapshot 1 Lead")]
+    assert coalesce_messages(msgs) == msgs
@@ -15,7 +15,7 @@ from tests.types import SystemFixtureLegacy
 def _load_bundle_url(mock_post):
     calls = [c for c in mock_post.call_args_list if "load_bundle" in c.args[0]]
     assert calls, "no load_bundle POST found"
-    return calls[0].args[1]["bundlepath"]
+    return calls[0].kwargs["data"]["bundlepath"]
 
 
 def test_v1_pedalboard_change_loads_passed_board_not_selected_index(v1_system: SystemFixtureLegacy, get_urls):
@@ -64,3 +64,16 @@ def test_v1_universal_encoder_pedalboard_change(v1_system: SystemFixtureLegacy,
 
     assert _load_bundle_url(mock_post) == "/path/to/new.pedalboard"
     assert handler.current.pedalboard.bundle == "/path/to/new.pedalboard"
+
+
+def test_v1_loads_go_through_rest_worker(v1_system: SystemFixtureLegacy, get_urls):
+    """Snapshot and pedalboard loads are REST worker jobs, not inline calls on the main loop."""
+    handler = v1_system.handler
+
+    handler.preset_set_and_change(1)
+    assert handler.current.preset_index == 1
+    assert handler.root_uri + "snapshot/load?id=1" in get_urls(v1_system.mock_get)
+
+    handler.pedalboard_change(handler.pedalboard_list[1])
+    assert handler.rest_worker.submitted == 2
+    assert handler.current.pedalboard.bundle == "/path/to/new.pedalboard"
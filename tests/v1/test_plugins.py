@@ -9,6 +9,7 @@ from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 from modalapi.mod import Mod
+from modalapi.pedalboard import Pedalboard
 from tests.conftest import FakeWebSocketBridge
 
 
@@ -28,7 +29,9 @@ def _make_drain_handler(plugins):
     handler.wifi_manager = None
     handler.ws_bridge = FakeWebSocketBridge()
     handler.lcd = MagicMock()
-    handler.current = SimpleNamespace(pedalboard=SimpleNamespace(plugins=plugins))
+    pedalboard = Pedalboard("Rig", "/rig.pedalboard")
+    pedalboard.plugins = plugins
+    handler.current = SimpleNamespace(pedalboard=pedalboard)
     handler._is_pedalboard_loading = False
     return handler
 
@@ -139,3 +139,46 @@ def test_v3_set_current_pedalboard_clears_suppression(v3_system: SystemFixture,
     handler.set_current_pedalboard(pb)
 
     assert handler._is_pedalboard_loading is False
+
+
+def test_v3_new_pedalboard_from_modui_syncs_library(v3_system: SystemFixture, make_plugin):
+    """A board saved in the web UI is added without reloading or duplicating the known ones."""
+    handler = v3_system.handler
+    mock_get = v3_system.mock_get
+    known = dict(handler.pedalboards)
+
+    def get_side_effect(url, **kwargs):
+        resp = MagicMock()
+        resp.status_code = 200
+        if "pedalboard/list" in url:
+            resp.text = json.dumps(
+                [
+                    {"title": "Integration Rig", "bundle": "/path/to/rig.pedalboard"},
+                    {"title": "New Rig", "bundle": "/path/to/new.pedalboard"},
+                    {"title": "Saved Rig", "bundle": "/path/to/saved.pedalboard"},
+                ]
+            )
+        elif "snapshot/list" in url:
+            resp.text = json.dumps({"0": "Default"})
+        elif "snapshot/name" in url:
+            resp.text = json.dumps({"name": "Default"})
+        else:
+            resp.text = "{}"
+        return resp
+
+    mock_get.side_effect = get_side_effect
+
+    last_json = Path(handler.data_dir) / "last.json"
+    last_json.write_text(json.dumps({"pedalboard": "/path/to/saved.pedalboard"}))
+    os.utime(last_json, (9999, 9999))
+
+    handler.poll_modui_changes()
+    handler.pedalboard_loader.join()
+
+    assert [pb.bundle for pb in handler.pedalboard_list] == [
+        "/path/to/rig.pedalboard",
+        "/path/to/new.pedalboard",
+        "/path/to/saved.pedalboard",
+    ]
+    assert handler.pedalboards["/path/to/new.pedalboard"] is known["/path/to/new.pedalboard"]
+    assert handler.current.pedalboard.title == "Saved Rig"
@@ -287,6 +287,25 @@ def test_v3_parameter_midi_change(v3_system: SystemFixture, make_parameter, snap
     snapshot()
 
 
+def test_v3_accelerated_tweak_moves_several_points_in_one_change(v3_system: SystemFixture, make_parameter):
+    """A fast encoder turn arrives as several steps: the dialog moves that many points, committing once."""
+    handler = v3_system.handler
+    ws_bridge = v3_system.ws_bridge
+
+    stepped = make_parameter("Gain", "delay", value=0.0)
+    for _ in range(5):
+        handler.parameter_midi_change(stepped, 1)
+    flicked = make_parameter("Level", "delay", value=0.0)
+    handler.parameter_midi_change(flicked, 5)
+
+    assert len(ws_bridge.sent_values_for("delay", "gain")) == 5
+    assert len(ws_bridge.sent_values_for("delay", "level")) == 1
+    assert flicked.value == stepped.value > 0
+
+    handler.parameter_midi_change(flicked, 100)  # stops at the maximum
+    assert flicked.value == flicked.maximum
+
+
 # ---------------------------------------------------------------------------
 # Plugin bypass sync (inbound websocket events from mod-ui)
 # ---------------------------------------------------------------------------
@@ -307,6 +326,31 @@ def test_v3_poll_ws_messages_drains_without_file_watch(v3_system: SystemFixture,
     assert plugin.is_bypassed()
 
 
+def test_v3_bypass_burst_draws_once(v3_system: SystemFixture, make_plugin, make_parameter):
+    """A snapshot load's bypass flips, drained in one tick, are drawn in one display
+    update, and repeated param_sets for a port leave only the last value."""
+    handler = v3_system.handler
+    ws_bridge = v3_system.ws_bridge
+
+    assert handler.current
+    gain = make_parameter("Gain", "fx0")
+    plugins = [make_plugin("fx%d" % i, bypassed=False) for i in range(4)]
+    plugins[0].parameters["gain"] = gain
+    handler.current.pedalboard.plugins = plugins
+    handler.lcd.draw_plugins()
+    frames = len(v3_system.lcd.frames)
+
+    for i in range(4):
+        ws_bridge.inject("param_set /graph/fx%d :bypass 1.0" % i)
+    for value in (0.1, 0.2, 0.3):
+        ws_bridge.inject("param_set /graph/fx0 gain %s" % value)
+    handler.poll_ws_messages()
+
+    assert all(p.is_bypassed() for p in plugins)
+    assert gain.value == 0.3
+    assert len(v3_system.lcd.frames) == frames + 1
+
+
 def test_v3_add_dump_reseeds_bypass_on_reconnect(v3_system: SystemFixture, make_plugin):
     """The connect/reconnect dump carries bypass only in the `add` line (field 4);
     draining it reseeds plugin bypass without any param_set :bypass."""
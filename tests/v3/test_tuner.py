@@ -136,3 +136,20 @@ class TestTunerFactory:
         handler._tuner_factory("system:capture_1")
         handler._tuner_factory("system:capture_2")
         assert names[0] != names[1]
+
+
+class TestTunerLcdPollPeriod:
+    def test_tuner_speeds_up_lcd_task_while_open(self, v3_tuner):
+        from pistomp.scheduler import Scheduler
+
+        handler = v3_tuner.handler
+        scheduler = Scheduler()
+        handler.add_poll_tasks(scheduler)
+        lcd = scheduler.get_task("lcd")
+        idle_period = lcd.period
+        assert idle_period == handler.lcd.poll_period
+
+        handler.toggle_tuner_enable()
+        assert lcd.period == 0.02
+        handler.toggle_tuner_enable()
+        assert lcd.period == idle_period
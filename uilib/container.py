@@ -137,6 +137,21 @@ class ContainerWidget(Widget):
         if self.visible and self.parent != None:
             self.parent._compose(self, self.box, self.box)
 
+    def refresh_children(self, widgets):
+        """Redraw several children, then compose the box around them into the
+        parent once (one LCD update instead of one per child)"""
+        box = None
+        for w in widgets:
+            if not w.visible or w.box is None:
+                continue
+            image, draw, real_box = self._focus(w.box)
+            if image is None:
+                continue
+            w._do_draw(image, draw, real_box)
+            box = w.box if box is None else box.union(w.box)
+        if box is not None:
+            self._unfocus(box)
+
     def _do_draw(self, image, draw, real_box):
         # We replace the base Widget implementation because of how we deal with
         # offsets: The erase and outline aren't offsetted, the rest is
@@ -25,11 +25,16 @@ import os
 # (/run) for the current boot only. pi-stomp reads it but never creates it.
 INIT_STAMP = "/run/lcd.init"
 
+# With a bus lock, updates are written in bands of this many columns (32 x 240 px,
+# 15 KB, about 5 ms at 24 MHz), each holding the lock, so whoever else is on the
+# bus waits at most one band rather than a whole frame
+BUS_BAND_COLUMNS = 32
+
 
 class LcdIli9341(LcdBase):
     # XXX
     # TODO: Turn "flip" into all 90deg angle combinations
-    def __init__(self, spi, cs_pin, dc_pin, reset_pin, baudrate, flip=True):
+    def __init__(self, spi, cs_pin, dc_pin, reset_pin, baudrate, flip=True, bus_lock=None):
         import adafruit_rgb_display.ili9341 as ili9341
         self.disp = ili9341.ILI9341(
             spi, cs=cs_pin, dc=dc_pin, rst=reset_pin, baudrate=baudrate
@@ -39,6 +44,9 @@ class LcdIli9341(LcdBase):
         # All methods which do change the screen (eg. dist. calls) should acquire/release
         self.lock = threading.Lock()
 
+        # Shared with the other devices on the SPI bus (the ADC sampler), if given
+        self.bus_lock = bus_lock
+
         # Always reset and clear on process start so service restarts are reliable.
         # has_system_splash (INIT_STAMP) only skips the in-app splash in lcd320x240.
         self.clear()
@@ -61,13 +69,30 @@ class LcdIli9341(LcdBase):
 
     def clear(self):
         self.lock.acquire()
-        self.disp.fill(0)
+        if self.bus_lock is None:
+            self.disp.fill(0)
+        else:
+            with self.bus_lock:
+                self.disp.fill(0)
         self.lock.release()
 
     def update(self, image, box = None):
         if self.lock.locked():
             logging.debug("LCD update was locked by another thread")
         self.lock.acquire()
+        img_width, img_height = image.size
+        if box is None:
+            box = Box(0, 0, img_width, img_height)
+        if self.bus_lock is None:
+            self._write(image, box)
+        else:
+            x1, y1, x2, y2 = box.rect
+            for x in range(x1, min(x2, self.width), BUS_BAND_COLUMNS):
+                with self.bus_lock:
+                    self._write(image, Box(x, y1, min(x + BUS_BAND_COLUMNS, x2), y2))
+        self.lock.release()
+
+    def _write(self, image, box):
         # LCD coordinates
         #
         # portrait mode, connector = bottom
@@ -76,8 +101,6 @@ class LcdIli9341(LcdBase):
         #              Y=0 is "left" (out jack side)
         #
         img_width, img_height = image.size
-        if box is None:
-            box = Box(0, 0, img_width, img_height)
 
         # Check if we need to crop the image to the LCD size
         x1, y1, x2, y2 = box.rect
@@ -94,5 +117,4 @@ class LcdIli9341(LcdBase):
                 x = y1
                 y = self.width - x2
         self.disp.image(image, 270 if self.flip else 90, x, y)
-        self.lock.release()
 
@@ -19,7 +19,6 @@ from uilib.dialog import *
 from uilib.text import *
 import common.util as util
 
-import numpy as np
 import threading
 import traceback
 
@@ -42,6 +41,7 @@ class Parameterdialog(Dialog):
         self.timer = None
 
         # "graph" are the y-scaled values, "actual" are the actual non-scaled values
+        import numpy as np  # not at module level: uilib is imported before the splash, numpy is slow to load
         self.taper = taper  # 1 linear, 2 or 3 good for logarithmic
         self.points_per_actual = 4
         self.num_points = 60  # Must be a multiple of points_per_actual
@@ -84,6 +84,7 @@ class Parameterdialog(Dialog):
             self.w_value.set_text(val_text)
 
         # TODO would be nice to only redraw the lines that need changing
+        import numpy as np
         x = 0
         for i in self.graph_abscissa:
             i = int(i) - 1  # abscissa start at 1, arrays start at 0
@@ -112,11 +113,14 @@ class Parameterdialog(Dialog):
             self.timer = threading.Timer(self.timeout, self.pop)
             self.timer.start()
 
-        # Find the point on the graph for the current param_value, then get the previous or next value
+        # Find the point on the graph for the current param_value, then move `direction` points
+        # (more than one when the encoder is turned fast), stopping at either end
         value = float(self.param_value)
         i = self._find_nearest_element_index(self.actual_points, value)
-        new = i-1 if (direction != 1) else i+1
-        new_value = self.actual_points[new] if (0 <= new < self.num_actual) else value
+        new = min(max(i + direction, 0), self.num_actual - 1)
+        if new == i:
+            return
+        new_value = self.actual_points[new]
 
         if new_value > self.param_max:
             new_value = self.param_max
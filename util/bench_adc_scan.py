@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""MCP3008 read benchmark: time to read N channels, per tick.
+
+  separate  one xfer2 per channel, as each AnalogControl used to do
+  scan      AdcScanner.scan(), all channels in one SPI_IOC_MESSAGE ioctl
+
+Run on the device (spidev bus 0, CE1, where the MCP3008 is), stopping the
+pi-stomp service first so nothing else is on the bus:
+
+    sudo systemctl stop mod-ala-pi-stomp
+    python3 util/bench_adc_scan.py
+    python3 util/bench_adc_scan.py --speed 1000000 --ticks 2000
+
+--fake uses an in-process stand-in instead of the device: no syscalls and no bus
+time, and without a file descriptor the scan falls back to one xfer2 per channel,
+so it only shows the scanner's own bookkeeping.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from pistomp.adcscanner import AdcScanner, MCP3008_CHANNELS, mcp3008_command, mcp3008_value
+
+
+class FakeSpi:
+    def xfer2(self, data):
+        return [0, 2, 0]
+
+
+def open_spi(speed):
+    import spidev
+    spi = spidev.SpiDev()
+    spi.open(0, 1)  # Bus 0, CE1
+    spi.max_speed_hz = speed
+    return spi
+
+
+def time_per_tick(read, ticks):
+    read()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        read()
+    return 1e6 * (time.perf_counter() - start) / ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--speed", type=int, default=240_000, help="SPI clock in Hz (default 240000)")
+    parser.add_argument("--ticks", type=int, default=1000, help="Reads timed per row (default 1000)")
+    parser.add_argument("--fake", action="store_true", help="No device: measure the Python side only")
+    args = parser.parse_args()
+
+    spi = FakeSpi() if args.fake else open_spi(args.speed)
+    print("%8s %14s %14s %8s" % ("channels", "separate us", "scan us", "ratio"))
+    for n in range(1, MCP3008_CHANNELS + 1):
+        channels = list(range(n))
+
+        def separate():
+            for ch in channels:
+                mcp3008_value(spi.xfer2(mcp3008_command(ch)))
+
+        adc = AdcScanner(spi)
+        for ch in channels:
+            adc.add_channel(ch)
+        t_sep = time_per_tick(separate, args.ticks)
+        t_scan = time_per_tick(adc.scan, args.ticks)
+        print("%8d %14.1f %14.1f %8.2f" % (n, t_sep, t_scan, t_sep / t_scan))
+    if not args.fake:
+        spi.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Cold/warm start benchmark using the emulator.
+
+Serves a generated pedalboard library (see pedalboard_corpus.py) from a
+stand-in mod-ui on 127.0.0.1:18181, then boots the emulator headless in a
+fresh child process with a fresh HOME (cold: no caches) and boots it again
+with the same HOME (warm). Each child records its startup phases with
+pistomp.startup_trace; the table shows the median over --runs.
+
+With --baseline, the median time to main loop is compared to a previously
+saved run and the script exits 1 if it regressed by more than --tolerance.
+
+    python3 util/bench_cold_start.py
+    python3 util/bench_cold_start.py --pedalboards 200 --runs 5 --save-baseline /tmp/startup.json
+    python3 util/bench_cold_start.py --baseline /tmp/startup.json --tolerance 0.2
+
+Like the emulator itself, this needs the lilv and pygame bindings installed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pedalboard_corpus
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+PORT = 18181
+EMU_DIR = ".pistomp_emulator"
+
+
+class StandInModUi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    library: list = []
+    lv2_dir = ""
+
+    def _reply(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        if url.path == "/pedalboard/list":
+            self._reply(self.library)
+        elif url.path == "/effect/get":
+            self._reply(plugin_info(urllib.parse.parse_qs(url.query)["uri"][0], self.lv2_dir))
+        elif url.path == "/snapshot/list":
+            self._reply({"0": "Default"})
+        elif url.path == "/snapshot/name":
+            self._reply({"name": "Default"})
+        else:
+            self._reply({})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._reply({})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def plugin_info(uri, lv2_dir):
+    bundle = os.path.join(lv2_dir, str(pedalboard_corpus.PLUGIN_URIS.index(uri)) + ".lv2")
+    controls = [
+        {"shortName": f"P{c}", "symbol": f"param_{c}", "ranges": {"minimum": 0.0, "maximum": 1.0, "default": 0.5}}
+        for c in range(pedalboard_corpus.CONTROLS_PER_PLUGIN)
+    ]
+    return {"uri": uri, "version": "1.0", "builder": 1, "bundles": [bundle], "category": ["Utility"],
+            "ports": {"control": {"input": controls}}}
+
+
+def serve(root, count, plugins):
+    bundles = pedalboard_corpus.write_corpus(os.path.join(root, "pedalboards"), count, plugins)
+    StandInModUi.library = [{"title": f"Synthetic {i}", "bundle": b} for i, b in enumerate(bundles)]
+    StandInModUi.lv2_dir = os.path.join(root, "lv2")
+    for i in range(len(pedalboard_corpus.PLUGIN_URIS)):
+        lv2 = os.path.join(StandInModUi.lv2_dir, f"{i}.lv2")
+        os.makedirs(lv2, exist_ok=True)
+        open(os.path.join(lv2, "manifest.ttl"), "a").close()
+    server = ThreadingHTTPServer(("127.0.0.1", PORT), StandInModUi)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, bundles
+
+
+def run_child(version):
+    from emulator.bootstrap import bootstrap_emulator
+    from pistomp.startup_trace import StartupTracer
+
+    trace = StartupTracer()
+    handler, _ = bootstrap_emulator(version, REPO, trace)
+    with trace.phase("poll_system_info"):
+        handler.poll_system_info()
+    to_main_loop = trace.timeline()["wall"]
+    with trace.phase("(background loading)"):
+        handler.pedalboard_loader.join()
+    trace.finish(handler.data_dir)
+    timeline = trace.timeline()
+    timeline["to_main_loop"] = to_main_loop
+    print(json.dumps(timeline))
+    sys.stdout.flush()
+    os._exit(0)  # skip joining the websocket/wifi threads
+
+
+def boot(version, home, current_bundle):
+    emu = os.path.join(home, EMU_DIR)
+    os.makedirs(emu, exist_ok=True)
+    with open(os.path.join(emu, "last.json"), "w") as f:
+        json.dump({"pedalboard": current_bundle}, f)
+    env = dict(os.environ, HOME=home, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    child = subprocess.run(
+        [sys.executable, __file__, "--child", version], env=env, cwd=REPO, capture_output=True, text=True
+    )
+    if child.returncode != 0:
+        sys.exit(f"emulator failed to start:\n{child.stderr}")
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def medians(runs):
+    names = [p["name"] for p in runs[0]["phases"]]
+    rows = []
+    for i, name in enumerate(names):
+        row = {"name": name}
+        for k in ("wall", "cpu", "http", "files"):
+            row[k] = statistics.median(r["phases"][i][k] for r in runs)
+        rows.append(row)
+    return {"to_main_loop": statistics.median(r["to_main_loop"] for r in runs), "phases": rows}
+
+
+def report(label, m):
+    print(f"{label}: {m['to_main_loop']:.2f}s to main loop")
+    print(f"  {'phase':<24} {'wall ms':>9} {'cpu ms':>9} {'http':>6} {'files':>6}")
+    for p in m["phases"]:
+        print(f"  {p['name']:<24} {1000 * p['wall']:>9.1f} {1000 * p['cpu']:>9.1f} {p['http']:>6.0f} {p['files']:>6.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--version", default="emulator_v3", choices=["emulator_v1", "emulator_v2", "emulator_v3"])
+    parser.add_argument("--pedalboards", type=int, default=50)
+    parser.add_argument("--plugins", type=int, default=6, help="plugins per pedalboard")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--baseline", help="fail if slower than this saved result by more than --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", help="write the result here")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+        return
+
+    root = tempfile.mkdtemp(prefix="pistomp-coldstart-")
+    server, bundles = serve(root, args.pedalboards, args.plugins)
+    print(f"{args.pedalboards} pedalboards x {args.plugins} plugins, {args.version}, {args.runs} runs")
+    cold, warm = [], []
+    try:
+        for run in range(args.runs):
+            home = os.path.join(root, f"home{run}")
+            cold.append(boot(args.version, home, bundles[0]))
+            warm.append(boot(args.version, home, bundles[0]))
+    finally:
+        server.shutdown()
+
+    result = {"cold": medians(cold), "warm": medians(warm)}
+    report("cold", result["cold"])
+    report("warm", result["warm"])
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failed = False
+        for kind in ("cold", "warm"):
+            was, now = baseline[kind]["to_main_loop"], result[kind]["to_main_loop"]
+            if now > was * (1 + args.tolerance):
+                print(f"REGRESSION: {kind} start {now:.2f}s vs baseline {was:.2f}s")
+                failed = True
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Startup benchmark: time and resident memory to parse N pedalboard bundles.
+
+Generates a synthetic corpus (see pedalboard_corpus.py) and parses it with
+the shared BundleParser (serially), with one never-unloaded lilv World per
+bundle (the behaviour before the parser was shared), and across a pool of
+parser processes. Each run happens in a fresh child process so RSS reflects
+only that run (for "parallel", only the parent's RSS, and the time includes
+starting the pool).
+
+Requires the lilv Python bindings, so run it on the device:
+    python3 util/bench_pedalboard_parse.py
+    python3 util/bench_pedalboard_parse.py --counts 10 100 --plugins 8 --mode shared
+    python3 util/bench_pedalboard_parse.py --mode serial-vs-parallel --workers 3
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pedalboard_corpus
+
+MODES = ("shared", "per-board", "parallel")
+CHOICES = {"all": MODES, "both": ("shared", "per-board"), "serial-vs-parallel": ("shared", "parallel")}
+
+
+def rss_kb() -> int:
+    """Current resident set size in KiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_child(mode: str, bundles: list[str], workers: int) -> dict:
+    import modalapi.pedalboard as Pedalboard
+
+    rss_before = rss_kb()
+    start = time.perf_counter()
+    keep = []
+    if mode == "parallel":
+        with Pedalboard.parse_pool(workers) as pool:
+            failed = [b for b, data in Pedalboard.parse_bundles(bundles, pool) if data is None]
+        if failed:
+            raise RuntimeError(f"{len(failed)} bundles failed to parse")
+    elif mode == "shared":
+        for bundle in bundles:
+            Pedalboard.get_parser().parse(bundle)
+    else:
+        for bundle in bundles:
+            parser = Pedalboard.BundleParser()
+            parser.world.unload_bundle = lambda node: None  # every world kept its model before
+            parser.parse(bundle)
+            keep.append(parser)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "rss_kb": rss_kb(), "rss_delta_kb": rss_kb() - rss_before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--plugins", type=int, default=6, help="plugins per pedalboard")
+    parser.add_argument("--mode", choices=MODES + tuple(CHOICES), default="all")
+    parser.add_argument("--workers", type=int, default=0, help="parser processes for parallel (default: cores - 1)")
+    parser.add_argument("--dir", help="corpus directory (default: a temporary directory)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "COUNT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.workers <= 0:
+        from modalapi.pedalboard import default_parse_workers
+        args.workers = default_parse_workers()
+    root = args.dir or os.path.join(tempfile.gettempdir(), f"pistomp-corpus-{args.plugins}")
+
+    if args.child:
+        mode, count = args.child[0], int(args.child[1])
+        bundles = [os.path.join(root, pedalboard_corpus.bundle_name(i)) for i in range(count)]
+        print(json.dumps(run_child(mode, bundles, args.workers)))
+        return
+
+    pedalboard_corpus.write_corpus(root, max(args.counts), args.plugins)
+    modes = CHOICES.get(args.mode, (args.mode,))
+
+    print(f"corpus: {root} ({args.plugins} plugins per pedalboard, {args.workers} parser processes)")
+    print(f"{'bundles':>8} {'mode':>10} {'seconds':>9} {'ms/bundle':>10} {'rss MiB':>8} {'delta MiB':>10}")
+    for count in args.counts:
+        for mode in modes:
+            out = subprocess.check_output(
+                [sys.executable, __file__, "--dir", root, "--plugins", str(args.plugins), "--workers", str(args.workers),
+                 "--child", mode, str(count)]
+            )
+            r = json.loads(out.decode().strip().splitlines()[-1])
+            print(
+                f"{count:>8} {mode:>10} {r['seconds']:>9.3f} {1000 * r['seconds'] / count:>10.2f} "
+                f"{r['rss_kb'] / 1024:>8.1f} {r['rss_delta_kb'] / 1024:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
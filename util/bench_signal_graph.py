@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Benchmark: plugin ordering for a generated pedalboard (60 plugins by default).
+
+"graph" times signal_graph.build() on the board's arcs. "legacy" times a model
+of the ordering it replaced: a recursive tail chase that checked visited blocks
+with a list scan, followed by list.index() for every block. Both run on plain
+Python data, so this part works anywhere. Each also reports how many
+plugin-to-plugin connections its order puts backwards (the legacy walk follows
+only one branch of a split). With lilv installed (on the device)
+the bundle is also written to disk and fully parsed.
+
+    python3 util/bench_signal_graph.py
+    python3 util/bench_signal_graph.py --plugins 200 --serial --repeat 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import pedalboard_corpus
+import modalapi.signal_graph as SignalGraph
+
+PORTS = ("in", "out", ":bypass") + tuple(f"param_{c}" for c in range(pedalboard_corpus.CONTROLS_PER_PLUGIN))
+
+
+def board(plugins: int, parallel: bool):
+    blocks = [f"block_{b}" for b in range(plugins)]
+    port_owner = {f"{block}/{port}": block for block in blocks for port in PORTS}
+    return blocks, port_owner, pedalboard_corpus.chain_arcs(blocks, parallel)
+
+
+def legacy_index(blocks, port_owner, arcs):
+    # Stands in for the lilv model the old code queried (these lookups are indexed there too)
+    arc_by_port = {}  # tail port -> head port of an arc leaving it
+    for tail, head in arcs:
+        arc_by_port.setdefault(tail, head)
+    ports_of = {b: [] for b in blocks}
+    for port, owner in port_owner.items():
+        ports_of[owner].append(port)
+    return ports_of, arc_by_port
+
+
+def legacy_order(blocks, port_owner, ports_of, arc_by_port):
+    # What the old chase_tail amounted to: from a block's first port with an arc
+    # leaving it, follow that arc to the next block, checking visited blocks with
+    # a list scan
+
+    def chase_tail(block, conn):
+        conn.append(block)
+        for port in ports_of[block]:
+            other = arc_by_port.get(port)
+            if other is None:
+                continue
+            nxt = port_owner.get(other)
+            if nxt is not None and nxt not in conn:
+                chase_tail(nxt, conn)
+            break
+        return conn
+
+    order = chase_tail(port_owner[arc_by_port["capture_1"]], [])
+    ordered, extra = {}, []
+    for block in blocks:
+        try:
+            ordered[order.index(block)] = block
+        except ValueError:
+            extra.append(block)
+    return [ordered[i] for i in sorted(ordered)] + extra
+
+
+def out_of_order(order, graph):
+    """Plugin-to-plugin connections that run backwards in order."""
+    position = {block: i for i, block in enumerate(order)}
+    return sum(1 for tail, head in graph.edges if position[tail] > position[head])
+
+
+def timeit(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=int, default=60)
+    parser.add_argument("--serial", action="store_true", help="one serial chain instead of two parallel branches")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    parallel = not args.serial
+
+    blocks, port_owner, arcs = board(args.plugins, parallel)
+    graph = SignalGraph.build(blocks, port_owner, arcs)
+    graph_us = 1e6 * timeit(lambda: SignalGraph.build(blocks, port_owner, arcs), args.repeat)
+    print(f"{args.plugins} plugins, {len(arcs)} arcs, {'parallel' if parallel else 'serial'}")
+    print(f"  graph : {graph_us:10.1f} us, {out_of_order(graph.order, graph)} connections out of order")
+
+    index = legacy_index(blocks, port_owner, arcs)
+    try:
+        legacy = legacy_order(blocks, port_owner, *index)
+    except RecursionError:
+        print("  legacy: RecursionError")
+    else:
+        legacy_us = 1e6 * timeit(lambda: legacy_order(blocks, port_owner, *index), args.repeat)
+        print(f"  legacy: {legacy_us:10.1f} us, {out_of_order(legacy, graph)} connections out of order")
+
+    try:
+        import modalapi.pedalboard as Pedalboard
+        Pedalboard.get_parser()
+    except Exception as e:
+        print(f"  (skipping full parse: {e})")
+        return
+    root = tempfile.mkdtemp(prefix="pistomp-graph-")
+    bundle = pedalboard_corpus.write_bundle(root, 0, args.plugins, parallel)
+    parse = Pedalboard.get_parser().parse
+    print(f"  full parse of {bundle}: {1e3 * timeit(lambda: parse(bundle), max(1, args.repeat // 20)):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""AnalogVU benchmark: refresh cost, and how many short clips it catches.
+
+Refresh cost, per indicator refresh (every 20 ms):
+
+  summing  the refresh as it was, sum()/len() over both windows each time
+  running  AnalogVU.refresh(): running sums and peak hold
+
+Clip detection: --bursts clipping bursts of --burst-ms, each at a random point
+of a quiet input, and the share of them that light the clip LED:
+
+  per-tick  one reading per refresh, as the indicators poll reads without the sampler
+  sampled   AdcSampler at --rate Hz, each refresh taking the peak of its block
+
+    python3 util/bench_vu.py
+    python3 util/bench_vu.py --rate 2000 --burst-ms 1 --bursts 500
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from pistomp.adcsampler import AdcSampler
+from pistomp.adcscanner import AdcScanner
+from pistomp.analogVU import AnalogVU, VuState
+
+BASELINE = 512
+REFRESH_MS = 20
+
+
+class LevelSpi:
+    """MCP3008 stand-in: every channel reads `level`."""
+
+    def __init__(self):
+        self.level = BASELINE
+
+    def xfer2(self, data):
+        return [0, (self.level >> 8) & 3, self.level & 0xFF]
+
+
+class SummingVU(AnalogVU):
+    """The refresh as it was: average both windows with sum()/len() on every call."""
+
+    def refresh(self):
+        value = self.read()
+        value = abs(self.adc_baseline - value) + self.adc_baseline
+        self.samples.append(value)
+        self.off.append(value)
+
+        average_amplitude = sum(self.samples) / len(self.samples)
+        average_off = sum(self.off) / len(self.off)
+
+        state = self.state
+        if 500 < average_off < self.thresh_sig:
+            state = VuState.OFF
+        elif average_amplitude != self.last_avg:
+            if self.thresh_sig <= average_amplitude < self.thresh_warn:
+                state = VuState.SIG
+            elif self.thresh_warn <= average_amplitude < self.thresh_clip:
+                state = VuState.WARN
+            elif average_amplitude >= self.thresh_clip:
+                state = VuState.CLIP
+            self.last_avg = average_amplitude
+
+        if state != self.state:
+            self.state = state
+            self.change_color(state)
+
+
+def refresh_cost(vu_class, spi, refreshes):
+    vu = vu_class(AdcScanner(spi), 5, 4, MagicMock(), 5, 0, BASELINE)
+    rng = random.Random(1)
+    levels = [BASELINE + rng.randint(-40, 40) for _ in range(refreshes)]
+    elapsed = 0.0
+    for level in levels:
+        spi.level = level
+        vu.adc.scan()
+        start = time.perf_counter()
+        vu.refresh()
+        elapsed += time.perf_counter() - start
+    return 1e6 * elapsed / refreshes
+
+
+def caught(sampled, args, rng):
+    spi = LevelSpi()
+    adc = AdcScanner(spi)
+    vu = AnalogVU(adc, 5, 4, MagicMock(), 5, 0, BASELINE)
+    sampler = AdcSampler(adc, args.rate)
+    if sampled:
+        adc.sampler = sampler
+    block = sampler.window
+    burst = max(1, round(args.burst_ms * args.rate / 1000))
+    start = 5 * block + rng.randrange(block)
+    clipped = False
+    for n in range(8 * block):
+        spi.level = BASELINE + 200 if start <= n < start + burst else BASELINE + rng.randint(-1, 1)
+        if sampled:
+            sampler.sample()
+        if n % block == block - 1:
+            if not sampled:
+                adc.scan()
+            vu.refresh()
+            clipped = clipped or vu.state is VuState.CLIP
+    return clipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refreshes", type=int, default=20000, help="Refreshes timed per VU (default 20000)")
+    parser.add_argument("--rate", type=int, default=1000, help="Sampler rate in Hz (default 1000)")
+    parser.add_argument("--burst-ms", type=float, default=2.0, help="Clipping burst length (default 2)")
+    parser.add_argument("--bursts", type=int, default=200, help="Bursts tried per mode (default 200)")
+    args = parser.parse_args()
+
+    print("%-8s %12s" % ("refresh", "us/refresh"))
+    for name, vu_class in (("summing", SummingVU), ("running", AnalogVU)):
+        print("%-8s %12.2f" % (name, refresh_cost(vu_class, LevelSpi(), args.refreshes)))
+
+    print()
+    print("%.1f ms bursts, %d Hz sampler, %d ms refresh" % (args.burst_ms, args.rate, REFRESH_MS))
+    print("%-8s %8s" % ("reading", "caught"))
+    for name, sampled in (("per-tick", False), ("sampled", True)):
+        rng = random.Random(2)
+        hits = sum(caught(sampled, args, rng) for _ in range(args.bursts))
+        print("%-8s %7.0f%%" % (name, 100 * hits / args.bursts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Inbound WebSocket batch benchmark: the ws_messages tick of a snapshot switch.
+
+A snapshot switch in mod-ui arrives as one burst: pedal_snapshot, a param_set
+:bypass for every plugin whose bypass changes, and param_sets for the ports it
+moves (--dupes sends each of those more than once, as a sweep would; --no-title
+leaves out pedal_snapshot, whose title redraw refreshes the whole main panel). This
+drives a Modhandler with the real 320x240 LCD code, drawing into a stand-in
+display that counts updates and pixels, and dispatches the burst two ways:
+
+  message  one message at a time, each drawing as it goes (as before)
+  batch    poll_ws_messages: coalesced, state applied, each region drawn once
+
+and reports display updates, pixels pushed, the SPI time those pixels would take
+at --spi-mhz (16 bpp, transfer only) and the tick's CPU time here.
+
+    python3 util/bench_ws_batch.py
+    python3 util/bench_ws_batch.py --plugins 20 --params 8 --dupes 3 --no-title
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from modalapi.modhandler import Modhandler
+from modalapi.parameter import Parameter
+from modalapi.pedalboard import Pedalboard
+from modalapi.plugin import Plugin
+from modalapi.ws_protocol import parse_message
+from pistomp.lcd320x240 import Lcd
+from uilib.panel import LcdBase
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+class CountingDisplay(LcdBase):
+    """Stands in for the ILI9341: counts updates and the pixels each one pushes."""
+
+    def __init__(self):
+        self.updates = 0
+        self.pixels = 0
+
+    def dimensions(self):
+        return (320, 240)
+
+    def default_format(self):
+        return "RGB"
+
+    def clear(self):
+        pass
+
+    def update(self, image, box=None):
+        self.updates += 1
+        self.pixels += box.width * box.height if box is not None else image.width * image.height
+
+    def update_bypass(self, enabled, latched):
+        pass
+
+    @property
+    def has_system_splash(self):
+        return True
+
+
+class BurstBridge:
+    def __init__(self):
+        self.received = []
+
+    def get_received_messages(self):
+        received, self.received = self.received, []
+        return received
+
+
+def rig(plugins, params):
+    pb = Pedalboard("Bench", "/bench.pedalboard")
+    bypass = {"shortName": "bypass", "symbol": ":bypass", "ranges": {"minimum": 0, "maximum": 1}}
+    built = []
+    for i in range(plugins):
+        instance_id = "plug%d" % i
+        parameters = {":bypass": Parameter(bypass, 0.0, None, instance_id)}
+        for c in range(params):
+            info = {"shortName": "p%d" % c, "symbol": "param_%d" % c, "ranges": {"minimum": 0, "maximum": 1}}
+            parameters["param_%d" % c] = Parameter(info, 0.5, None, instance_id)
+        built.append(Plugin(instance_id, parameters, {}, "Distortion"))
+    pb.plugins = built
+    return SimpleNamespace(pedalboard=pb, presets={0: "Clean", 1: "Lead"}, preset_index=0, analog_controllers={})
+
+
+def handler_for(current):
+    display = CountingDisplay()
+    handler = Modhandler.__new__(Modhandler)
+    handler.wifi_manager = None
+    handler._hardware = SimpleNamespace(taptempo=None, footswitches=[])
+    handler.blend_modes = {}
+    handler.next_pedalboard_preset_index = None
+    handler.current = current
+    handler.ws_bridge = BurstBridge()
+    handler._lcd = Lcd(ROOT, handler=handler, display=display)
+    handler._lcd.link_data({}, current, [])
+    handler._lcd.pstack.push_panel(handler._lcd.main_panel)
+    handler._lcd.draw_title()
+    handler._lcd.draw_plugins()
+    return handler, display
+
+
+def snapshot_burst(plugins, params, dupes, snapshot, title=True):
+    lines = ["pedal_snapshot %d %s" % (snapshot, "Lead" if snapshot else "Clean")] if title else []
+    for i in range(plugins):
+        lines.append("param_set /graph/plug%d :bypass %d" % (i, (i + snapshot) % 2))
+        for d in range(dupes):
+            lines.extend("param_set /graph/plug%d param_%d %f" % (i, c, (c + d + snapshot) / (params + dupes))
+                         for c in range(params))
+    return lines
+
+
+def measure(mode, args):
+    handler, display = handler_for(rig(args.plugins, args.params))
+    updates = pixels = 0
+    cpu = 0.0
+    for n in range(args.repeat):
+        burst = snapshot_burst(args.plugins, args.params, args.dupes, (n + 1) % 2, not args.no_title)
+        u, p = display.updates, display.pixels
+        start = time.perf_counter()
+        if mode == "message":
+            for raw in burst:
+                handler._handle_ws_message(parse_message(raw))
+        else:
+            handler.ws_bridge.received = burst
+            handler.poll_ws_messages()
+        cpu += time.perf_counter() - start
+        updates += display.updates - u
+        pixels += display.pixels - p
+    return len(burst), updates / args.repeat, pixels / args.repeat, 1000 * cpu / args.repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=int, default=20, help="Plugins on the board (default 20)")
+    parser.add_argument("--params", type=int, default=4, help="Ports each plugin's snapshot moves (default 4)")
+    parser.add_argument("--dupes", type=int, default=2, help="param_sets per moved port (default 2)")
+    parser.add_argument("--no-title", action="store_true", help="Leave out pedal_snapshot (no title redraw)")
+    parser.add_argument("--spi-mhz", type=float, default=24.0, help="SPI clock for the transfer estimate (default 24)")
+    parser.add_argument("--repeat", type=int, default=20, help="Snapshot switches measured (default 20)")
+    args = parser.parse_args()
+
+    print("%-8s %9s %9s %10s %12s %12s" % ("dispatch", "messages", "updates", "pixels", "spi ms (est)", "cpu ms/tick"))
+    for mode in ("message", "batch"):
+        messages, updates, pixels, cpu_ms = measure(mode, args)
+        spi_ms = 1000 * pixels * 16 / (args.spi_mhz * 1e6)
+        print("%-8s %9d %9.0f %10.0f %12.1f %12.2f" % (mode, messages, updates, pixels, spi_ms, cpu_ms))
+
+
+if __name__ == "__main__":
+    main()
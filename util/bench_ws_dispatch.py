@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Inbound WebSocket dispatch benchmark: a mod-ui connect dump.
+
+On (re)connect and after every pedalboard load, mod-ui sends an "add" line per
+plugin and a "param_set" per control port. This builds a pedalboard of
+--plugins plugins with enough ports for --messages messages in total, parses
+the dump once, then times Modhandler._apply_ws_batch over all of it:
+
+  scan   the lookup as it was, a linear scan of pedalboard.plugins per message
+  index  Pedalboard.get_plugin, the instance_id index
+
+    python3 util/bench_ws_dispatch.py
+    python3 util/bench_ws_dispatch.py --plugins 60 --messages 5000 --repeat 50
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from modalapi.modhandler import Modhandler
+from modalapi.parameter import Parameter
+from modalapi.pedalboard import Pedalboard
+from modalapi.plugin import Plugin
+from modalapi.ws_protocol import parse_message
+
+
+class ScanningPedalboard(Pedalboard):
+    """The lookup as it was: walk the plugin list for every message."""
+
+    def get_plugin(self, instance_id):
+        for plugin in self.plugins:
+            if plugin.instance_id == instance_id:
+                return plugin
+        return None
+
+
+class NullLcd:
+    def refresh_plugin(self, plugin):
+        pass
+
+    def refresh_plugin_group(self, plugins, refresh=True):
+        pass
+
+
+def board(pedalboard_class, plugins, ports):
+    pb = pedalboard_class("Bench", "/bench.pedalboard")
+    bypass = {"shortName": "bypass", "symbol": ":bypass", "ranges": {"minimum": 0, "maximum": 1}}
+    built = []
+    for i in range(plugins):
+        instance_id = "plugin_%d" % i
+        parameters = {":bypass": Parameter(bypass, 0.0, None, instance_id)}
+        for c in range(ports):
+            info = {"shortName": "p%d" % c, "symbol": "param_%d" % c, "ranges": {"minimum": 0, "maximum": 1}}
+            parameters["param_%d" % c] = Parameter(info, 0.5, None, instance_id)
+        built.append(Plugin(instance_id, parameters, {}, "Distortion"))
+    pb.plugins = built
+    return pb
+
+
+def connect_dump(plugins, ports):
+    lines = []
+    for i in range(plugins):
+        lines.append("add /graph/plugin_%d http://bench/plugin 0.0 0.0 0 1 1" % i)
+        lines.extend("param_set /graph/plugin_%d param_%d %f" % (i, c, c / ports) for c in range(ports))
+    return [parse_message(line) for line in lines]
+
+
+def handler_for(pb):
+    handler = Modhandler.__new__(Modhandler)
+    handler.wifi_manager = None
+    handler.current = SimpleNamespace(pedalboard=pb)
+    handler._lcd = NullLcd()
+    return handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=int, default=40, help="Plugins on the board (default 40)")
+    parser.add_argument("--messages", type=int, default=2000, help="Messages in the dump (default 2000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Dumps dispatched per lookup (default 20)")
+    args = parser.parse_args()
+
+    ports = max(1, args.messages // args.plugins - 1)  # one add line plus a param_set per port
+    messages = connect_dump(args.plugins, ports)
+    print("%d plugins, %d ports each, %d messages" % (args.plugins, ports, len(messages)))
+    print("%-6s %10s %12s" % ("lookup", "ms/dump", "us/message"))
+    for name, pedalboard_class in (("scan", ScanningPedalboard), ("index", Pedalboard)):
+        handler = handler_for(board(pedalboard_class, args.plugins, ports))
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            handler._apply_ws_batch(messages)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print("%-6s %10.3f %12.3f" % (name, 1000 * best, 1e6 * best / len(messages)))
+
+
+if __name__ == "__main__":
+    main()
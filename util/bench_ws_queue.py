@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Outbound WebSocket queue benchmark: idle CPU and enqueue-to-send latency.
+
+Connects an AsyncWebSocketBridge (worker on its own thread, as in the default
+runtime) to a stand-in mod-ui on 127.0.0.1, then:
+
+  idle     leaves the connected bridge alone for --idle seconds and reports the
+           process CPU time used per second (all threads)
+  latency  sends --messages param_sets from this thread, --gap ms apart, each
+           carrying its send time; the server records arrival, and the table
+           shows p50/p99/max of arrival minus send
+
+Both run twice: "poll" reproduces the old worker, which slept 1 ms whenever the
+queue was empty, and "wakeup" is the current one, woken by the sender.
+
+    python3 util/bench_ws_queue.py
+    python3 util/bench_ws_queue.py --idle 10 --messages 500 --gap 5
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import websockets
+
+from modalapi.websocket_bridge import AsyncWebSocketBridge, WebSocketWorker
+
+
+class PollingWorker(WebSocketWorker):
+    """The worker as it was: wake every millisecond to look at the queue."""
+
+    async def _wait_for_messages(self):
+        self.wakeups += 1
+        await asyncio.sleep(0.001)
+
+
+class StandInModUi:
+    """Records when each param_set arrives, on its own thread and loop."""
+
+    def __init__(self):
+        self.arrivals: list[tuple[float, float]] = []  # (sent, received), monotonic
+        self.connected = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self.port = 0
+        threading.Thread(target=self._run, daemon=True, name="StandInModUi").start()
+        self._ready.wait()
+
+    async def _handle(self, ws):
+        self.connected.set()
+        async for msg in ws:
+            now = time.monotonic()
+            if msg.startswith("param_set "):
+                self.arrivals.append((float(msg.rsplit(" ", 1)[1]), now))
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+
+        async def serve():
+            server = await websockets.serve(self._handle, "127.0.0.1", 0)
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await asyncio.Future()
+
+        self._loop.run_until_complete(serve())
+
+
+def percentile(values, p):
+    s = sorted(values)
+    return s[math.ceil(p * len(s)) - 1]
+
+
+def measure(worker_class, server, idle, messages, gap):
+    server.connected.clear()
+    server.arrivals.clear()
+    bridge = AsyncWebSocketBridge(ws_url="ws://127.0.0.1:%d/websocket" % server.port)
+    bridge._worker = worker_class(bridge.ws_url, 8192, bridge.command_queue, bridge.received_queue)
+    bridge.start()
+    if not server.connected.wait(5.0):
+        sys.exit("Bridge did not connect to the stand-in mod-ui")
+    time.sleep(0.2)
+
+    wakeups = bridge._worker.wakeups
+    cpu, wall = time.process_time(), time.monotonic()
+    time.sleep(idle)
+    cpu_per_s = (time.process_time() - cpu) / (time.monotonic() - wall)
+    idle_wakeups = (bridge._worker.wakeups - wakeups) / idle
+
+    for _ in range(messages):
+        bridge.send_parameter("bench", "x", time.monotonic())
+        time.sleep(gap)
+    deadline = time.monotonic() + 5.0
+    while len(server.arrivals) < messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+    bridge.stop()
+
+    lat = [1000 * (received - sent) for sent, received in server.arrivals]
+    if not lat:
+        sys.exit("No messages arrived")
+    return {"cpu_ms_per_s": 1000 * cpu_per_s, "wakeups_per_s": idle_wakeups, "sent": len(lat),
+            "p50": percentile(lat, 0.50), "p99": percentile(lat, 0.99), "max": max(lat)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=float, default=5.0, help="Seconds to measure idle CPU (default 5)")
+    parser.add_argument("--messages", type=int, default=300, help="Messages sent for latency (default 300)")
+    parser.add_argument("--gap", type=float, default=10.0, help="Milliseconds between sends (default 10)")
+    args = parser.parse_args()
+
+    server = StandInModUi()
+    print("%-7s %13s %11s %6s %9s %9s %9s" % ("worker", "idle cpu ms/s", "wakeups/s", "sent", "p50 ms",
+                                             "p99 ms", "max ms"))
+    for name, worker_class in (("poll", PollingWorker), ("wakeup", WebSocketWorker)):
+        r = measure(worker_class, server, args.idle, args.messages, args.gap / 1000)
+        print("%-7s %13.2f %11.0f %6d %9.3f %9.3f %9.3f" % (name, r["cpu_ms_per_s"], r["wakeups_per_s"],
+                                                         r["sent"], r["p50"], r["p99"], r["max"]))
+
+
+if __name__ == "__main__":
+    main()
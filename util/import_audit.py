@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Import-time audit: what `import modalapistomp` costs before main() runs.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+(--runs times, keeping the fastest time per module so disk cache noise drops
+out) and reports the slowest top-level imports by cumulative time, plus the
+slowest single modules by self time.
+
+It also checks that the modules which are deliberately loaded on first use
+(DEFERRED below) don't creep back onto the startup path, and exits 1 if one
+does. Run it on the device, where lilv, rtmidi etc. are installed:
+
+    python3 util/import_audit.py
+    python3 util/import_audit.py --top 40 --output /tmp/importtime.txt
+    python3 util/import_audit.py --module modalapi.modhandler
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+REPO = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Loaded on first use, never at startup
+DEFERRED = {
+    "numpy": "tuner stack and test host",
+    "pistomp.tuner": "tuner stack",
+    "matplotlib": "LED colour names PIL doesn't know",
+    "jsonschema": "config validation, skipped when the config already passed",
+    "ui.wifi_menu": "wifi menu, created when the toolbar is first drawn",
+    "pistomp.testhost": "--host test",
+    "pistomp.generichost": "--host generic",
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse(text):
+    """Parse -X importtime output into [(module, self_us, cumulative_us, depth)] in import order."""
+    rows = []
+    for line in text.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def run(module):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=REPO, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.exit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return parse(proc.stderr)
+
+
+def fastest(runs):
+    """Per module, the fastest (self, cumulative) seen across runs; depth and order from the first run."""
+    best = {}
+    for rows in runs:
+        for name, self_us, cum_us, depth in rows:
+            if name in best:
+                s, c, d = best[name]
+                best[name] = (min(s, self_us), min(c, cum_us), d)
+            else:
+                best[name] = (self_us, cum_us, depth)
+    return best
+
+
+def deferred_loaded(names):
+    return sorted(d for d in DEFERRED if any(n == d or n.startswith(d + ".") for n in names))
+
+
+def report(module, best, top):
+    total = sum(s for s, _, _ in best.values())
+    lines = [f"import {module}: {total / 1000:.1f} ms, {len(best)} modules", ""]
+    lines.append("Top-level imports by cumulative time (ms)")
+    first_level = [(c, n) for n, (_, c, d) in best.items() if d == 1]
+    for c, n in sorted(first_level, reverse=True)[:top]:
+        lines.append(f"  {c / 1000:9.1f}  {n}")
+    lines.append("")
+    lines.append("Modules by self time (ms)")
+    for s, n in sorted(((s, n) for n, (s, _, _) in best.items()), reverse=True)[:top]:
+        lines.append(f"  {s / 1000:9.1f}  {n}")
+    lines.append("")
+    loaded = deferred_loaded(best)
+    if loaded:
+        lines.append("Deferred modules imported at startup:")
+        lines.extend(f"  {d} ({DEFERRED[d]})" for d in loaded)
+    else:
+        lines.append("Deferred modules: none imported at startup")
+    return "\n".join(lines), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="modalapistomp")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", help="also write the report here")
+    args = parser.parse_args()
+
+    best = fastest([run(args.module) for _ in range(args.runs)])
+    text, loaded = report(args.module, best, args.top)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    sys.exit(1 if loaded else 0)
+
+
+if __name__ == "__main__":
+    main()
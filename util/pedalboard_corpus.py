@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: AGPL-3.0-or-later
+#
+# This file is part of pi-stomp.
+#
+# pi-stomp is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pi-stomp is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with pi-stomp.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Generate synthetic MOD pedalboard bundles for the startup benchmarks.
+
+Each bundle mirrors what mod-ui writes: a manifest.ttl plus a <name>.ttl graph
+with ingen blocks, control ports (one MIDI-bound :bypass per block), and
+ingen arcs chaining capture_1 → block_0 → … → playback_1 (optionally through
+two parallel branches). Bundles are deterministic for a given (index, plugins)
+so benchmark runs are repeatable.
+"""
+
+import os
+
+_PREFIXES = """@prefix doap: <http://usefulinc.com/ns/doap#> .
+@prefix ingen: <http://drobilla.net/ns/ingen#> .
+@prefix lv2: <http://lv2plug.in/ns/lv2core#> .
+@prefix midi: <http://lv2plug.in/ns/ext/midi#> .
+@prefix pedal: <http://moddevices.com/ns/modpedal#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+"""
+
+PLUGIN_URIS = [
+    "http://guitarix.sourceforge.net/plugins/gx_fuzz_#fuzz_",
+    "http://calf.sourceforge.net/plugins/Compressor",
+    "http://moddevices.com/plugins/tap/reverb",
+    "http://moddevices.com/plugins/mod-devel/DS1",
+    "http://gareus.org/oss/lv2/fil4#mono",
+    "http://moddevices.com/plugins/caps/Plate",
+]
+
+CONTROLS_PER_PLUGIN = 4
+
+
+def bundle_name(index: int) -> str:
+    return f"synthetic_{index:04d}.pedalboard"
+
+
+def chain_arcs(blocks: list[str], parallel: bool = False) -> list[tuple[str, str]]:
+    """(tail, head) port pairs: a serial chain capture_1 → block_0 → … → playback_1, or
+    with parallel=True the middle blocks split into two branches between the first and last."""
+    if not parallel or len(blocks) < 4:
+        tails = ["capture_1"] + [f"{block}/out" for block in blocks]
+        heads = [f"{block}/in" for block in blocks] + ["playback_1"]
+        return list(zip(tails, heads))
+    first, last, middle = blocks[0], blocks[-1], blocks[1:-1]
+    half = len(middle) // 2
+    arcs = [("capture_1", f"{first}/in"), (f"{last}/out", "playback_1")]
+    for branch in (middle[:half], middle[half:]):
+        chain = [first] + branch + [last]
+        arcs += [(f"{a}/out", f"{b}/in") for a, b in zip(chain, chain[1:])]
+    return arcs
+
+
+def write_bundle(root: str, index: int, plugins: int = 6, parallel: bool = False) -> str:
+    """Write one pedalboard bundle under root and return its path."""
+    name = f"synthetic_{index:04d}"
+    bundle = os.path.join(root, bundle_name(index))
+    os.makedirs(bundle, exist_ok=True)
+
+    with open(os.path.join(bundle, "manifest.ttl"), "w") as f:
+        f.write(_PREFIXES)
+        f.write(
+            f"\n<{name}.ttl>\n"
+            "    lv2:prototype ingen:GraphPrototype ;\n"
+            "    a lv2:Plugin , ingen:Graph , pedal:Pedalboard ;\n"
+            f"    rdfs:seeAlso <{name}.ttl> .\n"
+        )
+
+    lines = [_PREFIXES]
+    blocks = [f"block_{b}" for b in range(plugins)]
+    for b, block in enumerate(blocks):
+        controls = [f"<{block}/param_{c}>" for c in range(CONTROLS_PER_PLUGIN)]
+        ports = [f"<{block}/:bypass>", f"<{block}/in>", f"<{block}/out>"] + controls
+        uri = PLUGIN_URIS[(index + b) % len(PLUGIN_URIS)]
+        lines.append(
+            f"<{block}>\n"
+            "    ingen:enabled true ;\n"
+            f"    lv2:port {' , '.join(ports)} ;\n"
+            f"    lv2:prototype <{uri}> ;\n"
+            f"    pedal:instanceNumber {b} ;\n"
+            "    a ingen:Block .\n"
+        )
+        lines.append(
+            f"<{block}/:bypass>\n"
+            f"    ingen:value {b % 2} ;\n"
+            f"    midi:binding [ midi:channel 13 ; midi:controllerNumber {60 + b % 4} ; a midi:Controller ] ;\n"
+            "    a lv2:ControlPort , lv2:InputPort .\n"
+        )
+        lines.append(f"<{block}/in>\n    a lv2:AudioPort , lv2:InputPort .\n")
+        lines.append(f"<{block}/out>\n    a lv2:AudioPort , lv2:OutputPort .\n")
+        for c in range(CONTROLS_PER_PLUGIN):
+            value = ((index + b + c) % 100) / 100.0
+            lines.append(f"<{block}/param_{c}>\n    ingen:value {value:.6f} ;\n    a lv2:ControlPort , lv2:InputPort .\n")
+
+    arcs = []
+    for a, (tail, head) in enumerate(chain_arcs(blocks, parallel)):
+        arcs.append(f"_:b{a}")
+        lines.append(f"_:b{a}\n    ingen:tail <{tail}> ;\n    ingen:head <{head}> .\n")
+
+    lines.append(
+        "<capture_1>\n    lv2:index 0 ;\n    lv2:symbol \"capture_1\" ;\n    a lv2:AudioPort , lv2:InputPort .\n"
+    )
+    lines.append(
+        "<playback_1>\n    lv2:index 1 ;\n    lv2:symbol \"playback_1\" ;\n    a lv2:AudioPort , lv2:OutputPort .\n"
+    )
+    lines.append(
+        "<>\n"
+        f"    doap:name \"Synthetic {index}\" ;\n"
+        f"    ingen:arc {' , '.join(arcs)} ;\n"
+        f"    ingen:block {' , '.join(f'<{block}>' for block in blocks)} ;\n"
+        "    lv2:port <capture_1> , <playback_1> ;\n"
+        "    a lv2:Plugin , ingen:Graph , pedal:Pedalboard .\n"
+    )
+    with open(os.path.join(bundle, f"{name}.ttl"), "w") as f:
+        f.write("\n".join(lines))
+    return bundle
+
+
+def write_corpus(root: str, count: int, plugins: int = 6) -> list[str]:
+    """Write count bundles under root (reusing any already there) and return their paths."""
+    return [write_bundle(root, i, plugins) for i in range(count)]